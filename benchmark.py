@@ -0,0 +1,12 @@
+"""
+Python - Game of life with tkinter
+06/06/2020
+Madipoupou
+"""
+
+import sys
+from classes.Benchmark import Benchmark
+
+# --- Benchmarks (no Tk window), JSON results --- #
+if (__name__ == '__main__'):
+    sys.exit(Benchmark.main(sys.argv[1:]))
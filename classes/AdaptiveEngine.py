@@ -0,0 +1,149 @@
+"""
+Python - Game of life with tkinter
+06/06/2020
+Madipoupou
+"""
+
+from .Engine import Engine
+from .SparseEngine import SparseEngine
+from .DenseEngine import DenseEngine, np
+from .PackedCells import PackedCells
+
+class AdaptiveEngine(Engine):
+    """
+    Engine which switches between the sparse (set) and the dense (NumPy)
+    backends depending on the density of the pattern inside its bounding box
+    Large patterns go dense at a lower density: a set costs 100+ bytes per
+    cell, the array 1 byte per cell of the bounding box
+    Without numpy it always stays sparse
+    With Generations rules the backend is only chosen when the cells are
+    loaded: the dying cells can't move from one backend to the other
+    """
+    name = 'adaptive'
+
+    def __init__(self, cells=(), rule=None, topology=None, dense_threshold=0.1,
+                 sparse_threshold=0.03, min_population=2000, check_every=16,
+                 large_population=1000000, large_dense_threshold=1 / 16,
+                 large_sparse_threshold=1 / 128):
+        """
+        AdaptiveEngine constructor
+        Goes dense above dense_threshold, back to sparse under sparse_threshold
+        (the gap avoids switching at every check), small patterns stay sparse
+        From large_population cells on, the large_ thresholds are used
+        """
+        self.dense_threshold = dense_threshold
+        self.sparse_threshold = sparse_threshold
+        self.min_population = min_population
+        self.large_population = large_population
+        self.large_dense_threshold = large_dense_threshold
+        self.large_sparse_threshold = large_sparse_threshold
+        self.check_every = check_every
+        self.generation = 0
+        self.backend = SparseEngine(rule=rule, topology=topology)
+        Engine.__init__(self, cells, rule, topology)
+
+    def load(self, cells):
+        """
+        Replaces the current state and picks the right backend for it
+        PackedCells dense enough go straight into the dense backend, without
+        any set of tuples
+        """
+        # Backend which made the last step (the current one may be newer)
+        self.stepped = None
+        if (np is not None and isinstance(cells, PackedCells) and self.rule.states == 2):
+            bbox = cells.bounding_box()
+            population = len(cells)
+            if (bbox is not None and population >= self.min_population):
+                area = (bbox[2] - bbox[0] + 1) * (bbox[3] - bbox[1] + 1)
+                if (population / area >= self.thresholds(population)[0]):
+                    self.backend = DenseEngine(cells, self.rule, self.topology)
+                    return
+        self.backend = SparseEngine(cells, self.rule, self.topology)
+        self.select_backend()
+
+    def thresholds(self, population):
+        """ Returns the (dense, sparse) thresholds for population cells """
+        if (population >= self.large_population):
+            return (self.large_dense_threshold, self.large_sparse_threshold)
+        return (self.dense_threshold, self.sparse_threshold)
+
+    def density(self):
+        """ Ratio of alive cells inside the bounding box of the pattern """
+        if (isinstance(self.backend, DenseEngine)):
+            return self.backend.density()
+        bbox = self.backend.bounding_box()
+        if (bbox is None):
+            return 0.0
+        area = (bbox[2] - bbox[0] + 1) * (bbox[3] - bbox[1] + 1)
+        return self.backend.population() / area
+
+    def select_backend(self):
+        """ Moves the cells to the other backend if the density asks for it """
+        if (np is None):
+            return
+        is_dense = isinstance(self.backend, DenseEngine)
+        population = self.backend.population()
+        if (not is_dense and population < self.min_population):
+            return
+        density = self.density()
+        dense_threshold, sparse_threshold = self.thresholds(population)
+        if (not is_dense and density >= dense_threshold):
+            self.backend = DenseEngine(self.backend.get_packed(), self.rule, self.topology)
+        elif (is_dense and (density < sparse_threshold or population < self.min_population)):
+            self.backend = SparseEngine(self.backend.get_cells(), self.rule, self.topology)
+
+    def step(self):
+        """ Computes the next generation with the current backend """
+        self.stepped = self.backend
+        self.backend.step()
+        self.generation += 1
+        if (self.generation % self.check_every == 0 and self.rule.states == 2):
+            self.select_backend()
+
+    def get_cells(self):
+        """ Returns the alive cells as a set of (x, y) tuples """
+        return self.backend.get_cells()
+
+    def get_packed(self):
+        """ Returns the alive cells as PackedCells, made by the backend """
+        return self.backend.get_packed()
+
+    def changes(self):
+        """ Returns the (born, dead) cells of the last step, None if unknown """
+        if (self.stepped is None):
+            return None
+        return self.stepped.changes()
+
+    def tracks_changes(self):
+        """ True if the current backend keeps the changes of its steps """
+        return self.backend.tracks_changes()
+
+    def toggle(self, cell):
+        """ Makes a dead cell alive and an alive cell dead """
+        self.stepped = None
+        self.backend.toggle(cell)
+
+    def toggle_all(self, cells):
+        """ Toggles each of the given (distinct) cells """
+        self.stepped = None
+        self.backend.toggle_all(cells)
+
+    def is_alive(self, cell):
+        """ True if the (x, y) cell is alive """
+        return self.backend.is_alive(cell)
+
+    def population(self):
+        """ Returns the number of alive cells """
+        return self.backend.population()
+
+    def bounding_box(self):
+        """ Returns (xmin, ymin, xmax, ymax) of the alive cells, None if empty """
+        return self.backend.bounding_box()
+
+    def window(self, xmin, ymin, width, height):
+        """ Returns the array window of the dense backend (None if sparse) """
+        return self.backend.window(xmin, ymin, width, height)
+
+    def has_window(self):
+        """ True while the backend is the dense one """
+        return self.backend.has_window()
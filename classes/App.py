@@ -4,10 +4,30 @@ Python - Game of life with tkinter
 Madipoupou
 """
 
-from tkinter import filedialog
+import itertools
+import os
+import threading
+import time
+from tkinter import filedialog, simpledialog
 from .GridCanvas import GridCanvas
+from .Brush import Brush
 from .CellGrid import CellGrid
 from .Interface import Interface
+from .PatternFile import PatternFile
+from .PatternLibrary import PatternLibrary
+from .SimulationWorker import SimulationWorker
+from .Profiler import Profiler
+from .Rule import Rule
+from .Topology import Topology
+
+# File types proposed by the import/export dialogs
+FILE_TYPES = [
+    ('Grid patterns', '*.grid'), ('Binary grid patterns', '*.gridb'),
+    ('RLE patterns', '*.rle'), ('Life 1.06 patterns', '*.lif *.life'),
+    ('Plaintext patterns', '*.cells'), ('All files', '*')
+]
+# Directory of the pattern library (PREDEFINED SHAPES)
+LIBRARY_DIR = 'example_files'
 
 class App(object):
     """ Class which manages all the application """
@@ -17,6 +37,32 @@ class App(object):
         self.anim_speed = 100
         self.is_animated = False
         self.create_mode = False
+
+        # Create mode painting: the cells under the dragged brush are
+        # collected and applied to the grid once per frame
+        self.brush_index = 0
+        self.brush = Brush(*Brush.PRESETS[0])
+        self.paint_batch = []
+        self.paint_job = None
+        self.paint_alive = None
+        self.paint_last = None
+
+        # Background simulation: the Tk loop only renders the newest generation
+        self.threaded = True
+        self.worker = None
+        self.frame_delay = 30
+        # Pending gui.after of the animation loops (main loop / threaded),
+        # cancelled when the animation stops so no frame outlives it
+        self.anim_job = None
+        self.snapshot_job = None
+        self.window_title = None
+
+        # Stage timers, None while profiling is off
+        self.profiler = None
+
+        # Pattern library, indexed in the background when first opened
+        self.library = None
+        self.library_thread = None
         
         # Initialize grid
         self.grid = CellGrid([])
@@ -26,37 +72,303 @@ class App(object):
     def main_win(self):
         """ Just a window to test my canvas and the functionalities """
         self.can = self.gui.main_win()
+        # Moving in the generations history
+        self.can.bind('<comma>', lambda event: self.step_back())
+        self.can.bind('<period>', lambda event: self.step_forward())
+        # g jumps many generations ahead
+        self.can.bind('<g>', lambda event: self.ask_jump())
+        # Profiling: p switches it, P exports the trace
+        self.can.bind('<p>', lambda event: self.switch_profiling())
+        self.can.bind('<P>', lambda event: self.export_trace())
+        # r asks for the rule of the game
+        self.can.bind('<r>', lambda event: self.ask_rule())
+        # t asks for the universe (plane, torus, Klein bottle, bounded plane)
+        self.can.bind('<t>', lambda event: self.ask_topology())
+        # b changes the brush of the create mode, v pastes a pattern file
+        self.can.bind('<b>', lambda event: self.next_brush())
+        self.can.bind('<v>', lambda event: self.paste_pattern())
+        # l opens the pattern library
+        self.can.bind('<l>', lambda event: self.open_library())
 
     def reset(self):
         """ Reset all the canvas, cleans all existing cells """
-        self.grid.reset(self.can)
-        self.gui.cycle_label.configure(text=f'CYCLE: {self.grid.cycle_num}')
+        self.pause_worker(lambda: self.grid.reset(self.can))
+        self.show_cycle(self.grid.cycle_num)
         self.anim_speed = 100
         speed = int(1/self.anim_speed * 10000)
         self.gui.speed_label.configure(text=f'SPEED: {speed}%')
+        if (self.worker):
+            self.worker.delay = self.anim_speed / 1000
+
+    def save_cells(self):
+        """ Saves the current cells (SAVE button) """
+        self.pause_worker(self.grid.save_cells)
+
+    def load_cells(self):
+        """ Comes back to the saved cells (LOAD button) """
+        self.pause_worker(lambda: self.grid.load_cells(self.can))
+        self.show_cycle(self.grid.cycle_num)
 
     def start_anim(self):
         """ Starts the animation """
         if (not self.is_animated and not self.create_mode):
+            self.cancel_jobs()
             self.is_animated = True
-            self.animate_game()
+            self.reset_counters()
+            if (self.threaded):
+                self.start_worker()
+                self.render_snapshot()
+            else:
+                self.animate_game()
             self.gui.start_anim()
 
     def stop_anim(self):
         """ Stops the animation """
         self.is_animated = False
+        self.cancel_jobs()
+        self.stop_worker()
         self.gui.stop_anim()
 
+    def cancel_jobs(self):
+        """ Cancels the pending frames of both animation loops """
+        if (self.anim_job is not None):
+            self.gui.after_cancel(self.anim_job)
+            self.anim_job = None
+        if (self.snapshot_job is not None):
+            self.gui.after_cancel(self.snapshot_job)
+            self.snapshot_job = None
+
+    def switch_threaded(self):
+        """ Switches between background and main loop simulation """
+        is_animated = self.is_animated
+        self.stop_anim()
+        self.threaded = not self.threaded
+        self.gui.thread_button.configure(text=f'THREAD: {"ON" if (self.threaded) else "OFF"}')
+        if (is_animated):
+            self.start_anim()
+
+    def start_worker(self):
+        """ Starts the simulation thread """
+        self.grid.start_snapshots(self.can)
+        self.worker = SimulationWorker(self.grid, self.anim_speed / 1000)
+        self.worker.start()
+
+    def stop_worker(self):
+        """
+        Stops the simulation thread (if any) and displays the real state of
+        the grid instead of the last snapshot
+        """
+        if (not self.worker):
+            return
+        self.worker.stop()
+        self.grid.stop_snapshots(self.can, self.worker.latest())
+        self.worker = None
+        self.show_cycle(self.grid.cycle_num)
+
+    def pause_worker(self, action):
+        """ Calls action with the simulation thread stopped, then restarts it """
+        running = self.worker is not None
+        self.stop_worker()
+        try:
+            action()
+        finally:
+            self.reset_counters()
+            if (running):
+                self.start_worker()
+
     def animate_game(self):
-        """ Manages the game animation: clean can, launch cycle, render """
-        for rect in self.grid.rectangle_ref:
-            self.can.delete(rect)
+        """
+        Manages the game animation: launch cycle, render the changes
+        Never runs beside the simulation thread, which owns the grid
+        """
+        self.anim_job = None
+        if (not self.is_animated or self.worker):
+            return
         self.grid.activate_cycle()
         self.grid.render_cells(self.can)
-        self.gui.cycle_label.configure(text=f'CYCLE: {self.grid.cycle_num}')
+        self.show_cycle(self.grid.cycle_num)
+        self.count_frame(self.grid.cycle_num)
         if (self.is_animated and not self.create_mode):
-            self.gui.after(self.anim_speed, self.animate_game)
+            self.anim_job = self.gui.after(self.anim_speed, self.animate_game)
+
+    def render_snapshot(self):
+        """
+        Threaded animation frame: renders the newest generation published by
+        the simulation thread, the ones published since the last frame are
+        simply skipped
+        """
+        self.snapshot_job = None
+        if (not self.is_animated or not self.worker):
+            return
+        snapshot = self.worker.latest()
+        if (snapshot):
+            self.grid.render_snapshot(self.can, snapshot)
+            self.show_cycle(snapshot.cycle)
+            self.count_frame(snapshot.cycle)
+        self.snapshot_job = self.gui.after(self.frame_delay, self.render_snapshot)
+
+    def show_cycle(self, cycle):
+        """ Displays generation cycle on the label and the history slider """
+        self.gui.cycle_label.configure(text=f'CYCLE: {cycle}')
+        history = self.grid.history
+        self.gui.history_scale.configure(
+            from_=history.first_generation(), to=history.last_generation()
+        )
+        self.gui.history_scale.set(cycle)
+        self.update_title()
+
+    def update_title(self):
+        """
+        Window title: the rule if it isn't Conway's, the universe if it is
+        finite, the kind of cycle found
+        """
+        parts = ['Conway\'s GAME OF LIFE']
+        rule = self.grid.engine.rule
+        if (not rule.is_life()):
+            parts.append(str(rule))
+        if (self.grid.engine.topology.finite):
+            parts.append(str(self.grid.engine.topology))
+        if (self.grid.cycle_known()):
+            parts.append(self.grid.detector.describe())
+        if (self.create_mode):
+            parts.append(f'brush: {self.brush}')
+        title = ' - '.join(parts)
+        if (title != self.window_title):
+            self.window_title = title
+            self.gui.title(title)
+
+    def step_back(self):
+        """ Goes back one generation, if it is still in the history """
+        self.stop_anim()
+        if (self.grid.seek(self.grid.cycle_num - 1, self.can)):
+            self.show_cycle(self.grid.cycle_num)
+
+    def step_forward(self):
+        """ Goes one generation forward, replayed from the history if known """
+        self.stop_anim()
+        if (not self.grid.seek(self.grid.cycle_num + 1, self.can)):
+            self.grid.activate_cycle()
+            self.grid.render_cells(self.can)
+        self.show_cycle(self.grid.cycle_num)
+
+    def ask_jump(self):
+        """
+        Asks how many generations to go ahead: looked up once the pattern
+        cycles, jumped by HashLife when the rule and the universe allow it
+        """
+        count = simpledialog.askinteger(
+            'Jump', 'Generations to go ahead:', parent=self.gui, minvalue=1
+        )
+        if (not count):
+            return
+
+        # Inner function run with the simulation thread stopped
+        def jump():
+            self.grid.advance(count)
+            self.grid.sync_history()
+            self.grid.render_cells(self.can)
+
+        self.pause_worker(jump)
+        self.show_cycle(self.grid.cycle_num)
+
+    def scrub(self, generation):
+        """ Jumps to generation, chosen on the history slider """
+        self.stop_anim()
+        self.grid.seek(generation, self.can)
+        self.show_cycle(self.grid.cycle_num)
+
+    def reset_counters(self):
+        """ Restarts the generations/frames per second counters """
+        self.counter_time = time.perf_counter()
+        self.counter_cycle = self.grid.cycle_num
+        self.counter_frames = 0
+
+    def count_frame(self, cycle):
+        """
+        Registers a rendered frame showing generation cycle, the labels are
+        updated about once per second
+        """
+        self.counter_frames += 1
+        elapsed = time.perf_counter() - self.counter_time
+        if (elapsed < 1):
+            return
+        gps = (cycle - self.counter_cycle) / elapsed
+        fps = self.counter_frames / elapsed
+        self.gui.gps_label.configure(text=f'GEN/S: {gps:.0f}')
+        self.gui.fps_label.configure(text=f'FPS: {fps:.0f}')
+        if (self.profiler):
+            self.gui.profile_label.configure(text=self.profiler.overlay_text())
+        self.counter_time = time.perf_counter()
+        self.counter_cycle = cycle
+        self.counter_frames = 0
         
+    def switch_profiling(self):
+        """ Starts (with a new profiler) or stops timing the stages """
+        if (self.profiler):
+            self.profiler = None
+            self.gui.hide_profile()
+        else:
+            self.profiler = Profiler()
+            self.gui.show_profile(self.profiler.overlay_text())
+        self.grid.profiler = self.profiler
+        self.can.profiler = self.profiler
+
+    def export_trace(self):
+        """ Saves what the profiler recorded as a Chrome trace (JSON) """
+        if (not self.profiler):
+            self.gui.top_error('ERROR - Profiling is off (press p)')
+            return
+        filename = filedialog.asksaveasfilename(
+            parent=self.gui, title='Export a trace', defaultextension='.json',
+            filetypes=[('Chrome traces', '*.json'), ('All files', '*')]
+        )
+        if (not filename):
+            return
+        try:
+            self.profiler.export_trace(filename)
+        except OSError:
+            self.gui.top_error('ERROR - Writing into the file was not possible')
+
+    def ask_rule(self):
+        """ Asks for a new rule (B/S, Generations or Larger than Life notation) """
+        text = simpledialog.askstring(
+            'Rule', 'Rule (B36/S23, 345/2/4, R5,C0,M1,S34..58,B34..45,NM, highlife...):',
+            parent=self.gui, initialvalue=str(self.grid.engine.rule)
+        )
+        if (not text):
+            return
+        try:
+            rule = Rule.parse(text)
+        except ValueError as err:
+            self.gui.top_error(f'ERROR - {err}')
+            return
+        try:
+            self.pause_worker(lambda: self.grid.set_rule(rule, self.can))
+        except ValueError as err:
+            self.gui.top_error(f'ERROR - {err}')
+            return
+        self.show_cycle(self.grid.cycle_num)
+
+    def ask_topology(self):
+        """ Asks for a new universe: plane, torus:WxH, klein:WxH or bounded:WxH """
+        text = simpledialog.askstring(
+            'Universe', 'Universe (plane, torus:200x100, klein:64x64, bounded:500x300):',
+            parent=self.gui, initialvalue=str(self.grid.engine.topology)
+        )
+        if (not text):
+            return
+        try:
+            topology = Topology.parse(text)
+        except ValueError as err:
+            self.gui.top_error(f'ERROR - {err}')
+            return
+        try:
+            self.pause_worker(lambda: self.grid.set_topology(topology, self.can))
+        except ValueError as err:
+            self.gui.top_error(f'ERROR - {err}')
+            return
+        self.show_cycle(self.grid.cycle_num)
+
     def change_speed(self, coeff):
         """ Change animation speed """
         if (coeff < 0):
@@ -65,18 +377,94 @@ class App(object):
             self.anim_speed = min(self.anim_speed + coeff, 1000)
         speed = int(1/self.anim_speed * 10000)
         self.gui.speed_label.configure(text=f'SPEED: {speed}%')
+        if (self.worker):
+            self.worker.delay = self.anim_speed / 1000
 
     def create(self):
-        """ Manage create mode """
+        """
+        Manage create mode: the left button paints (or erases when the
+        first cell clicked is alive), the right button erases
+        """
         if (self.create_mode):
+            self.flush_paint()
             self.create_mode = False
-            self.can.unbind('<Button-1>')
+            for sequence in ('<Button-1>', '<B1-Motion>', '<ButtonRelease-1>',
+                             '<Button-3>', '<B3-Motion>', '<ButtonRelease-3>'):
+                self.can.unbind(sequence)
             self.gui.create_button.configure(text='CREATE: OFF', bg='dark slate gray')
         else:
             self.stop_anim()
             self.create_mode = True
-            self.can.bind('<Button-1>', lambda event: self.grid.add_remove_cell(self.can.get_cell_click(event), self.can))
+            self.can.bind('<Button-1>', lambda event: self.start_paint(event))
+            self.can.bind('<B1-Motion>', lambda event: self.drag_paint(event))
+            self.can.bind('<ButtonRelease-1>', lambda event: self.flush_paint())
+            self.can.bind('<Button-3>', lambda event: self.start_paint(event, alive=False))
+            self.can.bind('<B3-Motion>', lambda event: self.drag_paint(event))
+            self.can.bind('<ButtonRelease-3>', lambda event: self.flush_paint())
             self.gui.create_button.configure(text='CREATE: ON', bg='red')
+        self.update_title()
+
+    def start_paint(self, event, alive=None):
+        """
+        Starts a brush stroke on the clicked cell: painting if alive is
+        True, erasing if False, else the opposite of the clicked cell state
+        (a pattern brush always pastes)
+        """
+        self.flush_paint()
+        cell = self.can.get_cell_click(event)
+        if (alive is None and self.brush.pattern):
+            alive = True
+        elif (alive is None):
+            alive = self.grid.engine.topology.normalize(cell) not in self.grid.alive_cells
+        self.paint_alive = alive
+        self.paint_last = cell
+        self.queue_paint(self.brush.stamp(cell))
+
+    def drag_paint(self, event):
+        """ Continues the brush stroke up to the cell under the cursor """
+        cell = self.can.get_cell_click(event)
+        if (self.paint_last is None or cell == self.paint_last or self.brush.pattern):
+            return
+        self.queue_paint(self.brush.stroke(self.paint_last, cell))
+        self.paint_last = cell
+
+    def queue_paint(self, cells):
+        """ Adds cells to the batch, which is applied at the next frame """
+        self.paint_batch.extend(cells)
+        if (self.paint_job is None):
+            self.paint_job = self.gui.after(self.frame_delay, self.flush_paint)
+
+    def flush_paint(self):
+        """ Applies the batch of painted cells to the grid and redraws them """
+        if (self.paint_job is not None):
+            self.gui.after_cancel(self.paint_job)
+            self.paint_job = None
+        batch, self.paint_batch = self.paint_batch, []
+        if (batch):
+            self.grid.edit_cells(batch, self.can, self.paint_alive)
+
+    def next_brush(self):
+        """ Takes the next brush of Brush.PRESETS """
+        self.brush_index = (self.brush_index + 1) % len(Brush.PRESETS)
+        self.brush = Brush(*Brush.PRESETS[self.brush_index])
+        self.update_title()
+
+    def paste_pattern(self):
+        """ Loads a pattern file as the brush: each click pastes it """
+        filename = filedialog.askopenfilename(title='Paste a pattern', filetypes=FILE_TYPES)
+        if (not filename):
+            return
+        try:
+            self.brush = Brush.from_pattern(PatternFile.read(filename), os.path.basename(filename))
+        except OSError:
+            self.gui.top_error('ERROR - Impossible to open the file')
+            return
+        except ValueError:
+            self.gui.top_error('ERROR - The file is not well formatted')
+            return
+        if (not self.create_mode):
+            self.create()
+        self.update_title()
 
     def welcome_menu(self):
         """ Displays the first menu of the application """
@@ -84,17 +472,35 @@ class App(object):
         # Inner function which closes the welcome overlay
         def close_welcome(mode):
             self.destroy_overlay(w_list)
+            self.main_win()
             if (mode == 1):
-                self.wip()
-            else:
-                self.main_win()
+                self.open_library()
         
         w_list = self.gui.welcome_menu(close_welcome)
         self.gui.mainloop()
     
-    def wip(self):
-        """ Just temporary function to display work in progress message """
-        self.gui.wip()
+    def open_library(self):
+        """
+        Opens the pattern library browser, from its saved index: the files
+        added or changed since are read (and simulated) by a background
+        thread, the browser lists them as pending until it is done
+        """
+        if (self.library is None):
+            self.library = PatternLibrary(LIBRARY_DIR)
+        if (not self.library_indexing() and self.library.pending()):
+            # No process pool under the Tk loop, python library.py builds big indexes
+            self.library_thread = threading.Thread(
+                target=self.library.update, kwargs={'jobs': 1}, daemon=True
+            )
+            self.library_thread.start()
+        if (not self.library.names() and not self.library_indexing()):
+            self.gui.top_error('ERROR - The pattern library is empty')
+            return
+        self.gui.library_menu(self.library, self.load_pattern, self.library_indexing)
+
+    def library_indexing(self):
+        """ True while the background thread updates the library index """
+        return self.library_thread is not None and self.library_thread.is_alive()
 
     def destroy_overlay(self, ref_list):
         """ Destroys ref but can be added to welcome_menu method """
@@ -106,45 +512,61 @@ class App(object):
         if (not self.grid.alive_cells):
             self.gui.top_error('ERROR - The grid is empty')
             return
-        filename = filedialog.asksaveasfile(
-            parent=self.gui, mode='w', title='Export a pattern'
+        filename = filedialog.asksaveasfilename(
+            parent=self.gui, title='Export a pattern', filetypes=FILE_TYPES
         )
         if (not filename):
             self.gui.top_error('ERROR - The pattern has not been saved')
             return
+        profiler = self.profiler
+        if (profiler):
+            start = profiler.start()
         try:
-            for cell in self.grid.alive_cells:
-                cell_str = f'{cell[0]},{cell[1]}-'
-                filename.write(cell_str)
+            self.pause_worker(lambda: self.grid.save_file(filename))
         except:
             self.gui.top_error('ERROR - Writing into the file was not possible')
-        finally:
-            filename.close()
+        if (profiler):
+            profiler.stop('io', start, file=filename)
 
     def import_from_file(self):
         """ Import a saved grid from a file, opening the explorer """
-        filename = filedialog.askopenfilename(title = "Select A File")
+        filename = filedialog.askopenfilename(title = "Select A File", filetypes=FILE_TYPES)
         if (not filename):
             return
+        self.load_pattern(filename)
+
+    def load_pattern(self, filename):
+        """
+        Replaces the grid by the pattern of the file filename, the rule
+        written in the file (RLE) becomes the rule of the grid
+        """
         try:
-            fd = open(filename, 'r')
-        except:
+            chunks = PatternFile.iter_chunks(filename)
+            rule = PatternFile.read_rule(filename)
+        except OSError:
             self.gui.top_error('ERROR - Impossible to open the file')
             return
-        file_content = fd.read()
-        cell_list = file_content.split('-')
-        final_cell_list = []
-        for cell in cell_list:
-            temp = cell.split(',')
-            try:
-                x = int(temp[0])
-                y = int(temp[1])
-            except:
-                continue
-            final_cell_list.append((x, y))
-        fd.close()
-        if (final_cell_list == []):
+        except ValueError:
             self.gui.top_error('ERROR - The file is not well formatted')
             return
         self.reset()
-        self.grid.replace_current_cells(final_cell_list, self.can)
+        if (rule is not None and rule != self.grid.engine.rule):
+            try:
+                self.pause_worker(lambda: self.grid.set_rule(rule))
+            except ValueError as err:
+                self.gui.top_error(f'ERROR - {err}')
+            self.update_title()
+        profiler = self.profiler
+        if (profiler):
+            start = profiler.start()
+        # The cells go from the parser to the engine by batches
+        try:
+            self.pause_worker(lambda: self.grid.replace_current_cells(
+                itertools.chain.from_iterable(chunks), self.can
+            ))
+        except (OSError, ValueError):
+            self.pause_worker(lambda: self.grid.reset(self.can))
+        if (profiler):
+            profiler.stop('io', start, file=filename)
+        if (not self.grid.alive_cells):
+            self.gui.top_error('ERROR - The file is not well formatted')
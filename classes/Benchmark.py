@@ -0,0 +1,357 @@
+"""
+Python - Game of life with tkinter
+06/06/2020
+Madipoupou
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from .CellGrid import CellGrid
+from .MockCanvas import MockCanvas
+from .PatternFile import PatternFile
+from .HeadlessRunner import ENGINES
+from .Rule import Rule, LIFE
+from .Topology import Topology, PLANE
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Canonical long-lived patterns (top row first) and the generations to run
+PATTERNS = {
+    'diehard': (['......O.', 'OO......', '.O...OOO'], 130),
+    'r-pentomino': (['.OO', 'OO.', '.O.'], 1103),
+    'acorn': (['.O.....', '...O...', 'OO..OOO'], 5206),
+    'gosper-glider-gun': ([
+        '........................O...........',
+        '......................O.O...........',
+        '............OO......OO............OO',
+        '...........O...O....OO............OO',
+        'OO........O.....O...OO..............',
+        'OO........O...O.OO....O.O...........',
+        '..........O.....O.......O...........',
+        '...........O...O....................',
+        '............OO......................',
+    ], 1000),
+}
+# Extensions of the formats whose import/export is timed
+IO_FORMATS = ['.grid', '.gridb', '.rle', '.lif', '.cells']
+SUITES = ['examples', 'soups', 'patterns', 'io', 'render', 'parallel']
+EXAMPLES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'example_files')
+
+class Benchmark(object):
+    """
+    Benchmark suite: generations per second and peak memory of the engines
+    on the example files, random soups and long-lived patterns, speed of the
+    pattern files and cost of the rendering (on a MockCanvas)
+    Every result has a unique name, so two runs saved as JSON can be compared
+    """
+    @staticmethod
+    def pattern_cells(rows):
+        """ Returns the cells of a pattern given by rows of '.'/'O', top first """
+        height = len(rows)
+        return [
+            (x, height - 1 - r)
+            for r, row in enumerate(rows) for x, char in enumerate(row) if (char == 'O')
+        ]
+
+    @staticmethod
+    def soup(count, density, seed=0):
+        """ Returns count random cells filling a square at the given density """
+        side = max(1, int(round(math.sqrt(count / density))))
+        count = min(count, side * side)
+        return [
+            (i % side, i // side) for i in random.Random(seed).sample(range(side * side), count)
+        ]
+
+    @staticmethod
+    def peak_memory(func):
+        """ Calls func and returns the peak of memory allocated meanwhile (bytes) """
+        tracemalloc.start()
+        try:
+            func()
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    @staticmethod
+    def bench_generations(name, cells, generations, engine_name, memory=True, rule=LIFE,
+                          topology=PLANE):
+        """
+        Times generations steps of the engine started from cells under rule
+        in topology: the engine is stepped directly, without the history and
+        the cycle lookups of a CellGrid (a pattern which stabilizes would
+        then only time the lookups)
+        The peak memory is measured on a second, shorter run (tracing the
+        allocations slows everything down)
+        """
+        def run(count):
+            engine = ENGINES[engine_name](cells, rule=rule, topology=topology)
+            start = time.perf_counter()
+            for _ in range(count):
+                engine.step()
+            elapsed = time.perf_counter() - start
+            population = engine.population()
+            engine.close()
+            return elapsed, population
+
+        elapsed, population = run(generations)
+        result = {
+            'name': (
+                f'generations/{name}/{engine_name}' + ('' if (rule.is_life()) else f'/{rule}')
+                + (f'/{topology}' if (topology.finite) else '')
+            ),
+            'suite': 'generations',
+            'engine': engine_name,
+            'rule': str(rule),
+            'topology': str(topology),
+            'cells': len(cells),
+            'generations': generations,
+            'time': elapsed,
+            'generations_per_second': generations / elapsed if (elapsed) else None,
+            'final_population': population,
+        }
+        if (memory):
+            result['peak_memory'] = Benchmark.peak_memory(lambda: run(min(generations, 10)))
+        return result
+
+    @staticmethod
+    def bench_parallel(size, generations, workers, density=0.3, seed=0):
+        """
+        Times generations steps of a ParallelEngine with the given number of
+        workers on a random square array of size cells (alive at density)
+        The engine is stepped directly (no CellGrid, no cycle detection),
+        one first step starts the workers before the timing
+        """
+        side = max(1, int(round(math.sqrt(size))))
+        alive = np.random.default_rng(seed).random((side, side)) < density
+        xs, ys = np.nonzero(alive)
+        del alive
+        engine = ENGINES['parallel'](workers=workers, min_population=0)
+        engine.load_arrays(xs, ys)
+        del xs, ys
+        engine.step()
+        start = time.perf_counter()
+        for _ in range(generations):
+            engine.step()
+        elapsed = time.perf_counter() - start
+        population = engine.population()
+        engine.close()
+        return {
+            'name': f'parallel/{side}x{side}/{workers}',
+            'suite': 'parallel',
+            'cells': side * side,
+            'density': density,
+            'workers': workers,
+            'generations': generations,
+            'time': elapsed,
+            'generations_per_second': generations / elapsed if (elapsed) else None,
+            'cells_per_second': side * side * generations / elapsed if (elapsed) else None,
+            'final_population': population,
+        }
+
+    @staticmethod
+    def bench_io(name, cells, extension, directory):
+        """ Times the export then the import of cells in the format of extension """
+        path = os.path.join(directory, f'bench{extension}')
+        start = time.perf_counter()
+        PatternFile.save(path, cells)
+        write_time = time.perf_counter() - start
+        start = time.perf_counter()
+        count = len(PatternFile.read(path))
+        read_time = time.perf_counter() - start
+        result = {
+            'name': f'io/{name}/{extension[1:]}',
+            'suite': 'io',
+            'cells': count,
+            'bytes': os.path.getsize(path),
+            'write_time': write_time,
+            'read_time': read_time,
+            'time': write_time + read_time,
+            'write_cells_per_second': count / write_time if (write_time) else None,
+            'read_cells_per_second': count / read_time if (read_time) else None,
+        }
+        os.remove(path)
+        return result
+
+    @staticmethod
+    def bench_render(name, cells, generations, cell_size):
+        """
+        Times a full render of cells then the incremental renders of the
+        next generations, on a MockCanvas zoomed to cell_size
+        """
+        grid = CellGrid(cells)
+        can = MockCanvas(cell_size=cell_size)
+        start = time.perf_counter()
+        grid.render_cells(can)
+        first_time = time.perf_counter() - start
+        first_calls = can.calls
+        render_time = 0
+        for _ in range(generations):
+            grid.activate_cycle()
+            start = time.perf_counter()
+            grid.render_cells(can)
+            render_time += time.perf_counter() - start
+        grid.engine.close()
+        return {
+            'name': f'render/{name}/{cell_size}px',
+            'suite': 'render',
+            'cells': len(cells),
+            'cell_size': cell_size,
+            'bitmap': can.bitmap_mode(),
+            'first_render_time': first_time,
+            'first_render_calls': first_calls,
+            'generations': generations,
+            'time': render_time,
+            'render_time_per_generation': render_time / generations if (generations) else None,
+            'calls_per_generation': (can.calls - first_calls) / generations if (generations) else None,
+        }
+
+    @staticmethod
+    def run(suites=SUITES, engines=('adaptive',), generations=100, sizes=(10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6),
+            densities=(0.05, 0.2, 0.5), soup_generations=10, memory=True, examples=EXAMPLES_DIR,
+            rule=LIFE, topology=PLANE, workers=None, parallel_size=10 ** 7):
+        """
+        Runs the given suites, returns the list of their results
+        workers are the worker counts of the parallel suite (default: 1 to
+        the number of cores), its speedups are relative to the first one
+        """
+        results = []
+        if ('examples' in suites):
+            for path in sorted(glob.glob(os.path.join(examples, '*.grid'))):
+                cells = PatternFile.read(path)
+                for engine_name in engines:
+                    results.append(Benchmark.bench_generations(
+                        os.path.basename(path), cells, generations, engine_name, memory, rule, topology
+                    ))
+        if ('soups' in suites):
+            for size in sizes:
+                for density in densities:
+                    cells = Benchmark.soup(size, density)
+                    for engine_name in engines:
+                        results.append(Benchmark.bench_generations(
+                            f'soup-{size}-{density}', cells, soup_generations, engine_name, memory, rule, topology
+                        ))
+        if ('patterns' in suites):
+            for name, (rows, lifetime) in PATTERNS.items():
+                cells = Benchmark.pattern_cells(rows)
+                for engine_name in engines:
+                    results.append(Benchmark.bench_generations(
+                        name, cells, lifetime, engine_name, memory, rule, topology
+                    ))
+        if ('io' in suites):
+            with tempfile.TemporaryDirectory() as directory:
+                for size in sizes:
+                    cells = Benchmark.soup(size, 0.2)
+                    for extension in IO_FORMATS:
+                        results.append(Benchmark.bench_io(f'soup-{size}', cells, extension, directory))
+        if ('render' in suites):
+            for size in sizes:
+                cells = Benchmark.soup(size, 0.2)
+                for cell_size in (20, 2):
+                    results.append(Benchmark.bench_render(
+                        f'soup-{size}', cells, soup_generations, cell_size
+                    ))
+        if ('parallel' in suites and np is not None):
+            parallel = []
+            for count in workers or range(1, (os.cpu_count() or 1) + 1):
+                parallel.append(Benchmark.bench_parallel(parallel_size, soup_generations, count))
+            for result in parallel:
+                result['speedup'] = parallel[0]['time'] / result['time'] if (result['time']) else None
+            results.extend(parallel)
+        return results
+
+    @staticmethod
+    def environment():
+        """ Describes the machine and the Python running the benchmarks """
+        return {
+            'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'numpy': np.__version__ if (np) else None,
+        }
+
+    @staticmethod
+    def compare(old_results, new_results, threshold=0.2):
+        """
+        Compares the times of the results having the same name in two runs
+        Returns the list of (name, old time, new time) slower by more than
+        threshold (0.2: 20 % slower)
+        """
+        old_times = {result['name']: result['time'] for result in old_results}
+        regressions = []
+        for result in new_results:
+            old_time = old_times.get(result['name'])
+            if (old_time and result['time'] > old_time * (1 + threshold)):
+                regressions.append((result['name'], old_time, result['time']))
+        return regressions
+
+    @staticmethod
+    def main(argv=None):
+        """ Command line entry point, returns the exit status """
+        parser = argparse.ArgumentParser(description='Benchmarks of the Game of life')
+        parser.add_argument('-s', '--suite', action='append', choices=SUITES,
+                            help='suite to run, can be repeated (default: all)')
+        parser.add_argument('-e', '--engine', action='append', choices=sorted(ENGINES),
+                            help='engine to time, can be repeated (default: adaptive)')
+        parser.add_argument('-n', '--generations', type=int, default=100,
+                            help='generations run on each example file')
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6],
+                            help='numbers of cells of the random soups (up to 10000000)')
+        parser.add_argument('--densities', type=float, nargs='+', default=[0.05, 0.2, 0.5])
+        parser.add_argument('--soup-generations', type=int, default=10,
+                            help='generations run on the soups and by the parallel suite')
+        parser.add_argument('-w', '--workers', type=int, nargs='+', default=None,
+                            help='worker counts of the parallel suite (default: 1 to the number of cores)')
+        parser.add_argument('--parallel-size', type=int, default=10 ** 7,
+                            help='cells of the array stepped by the parallel suite')
+        parser.add_argument('--no-memory', action='store_true',
+                            help='do not measure the peak memory')
+        parser.add_argument('-o', '--output', default=None,
+                            help='JSON results file (default: stdout)')
+        parser.add_argument('-c', '--compare', default=None,
+                            help='JSON results of an earlier run, slower results are reported')
+        parser.add_argument('-t', '--threshold', type=float, default=0.2,
+                            help='slowdown reported as a regression (default: 0.2 = 20 %%)')
+        parser.add_argument('-r', '--rule', default='B3/S23',
+                            help='rule of the generations suites (default: B3/S23)')
+        parser.add_argument('-T', '--topology', default='plane',
+                            help='universe of the generations suites: plane, torus:WxH, klein:WxH, bounded:WxH')
+        args = parser.parse_args(argv)
+        try:
+            rule = Rule.parse(args.rule)
+            topology = Topology.parse(args.topology)
+        except ValueError as err:
+            parser.error(str(err))
+        report = {
+            'environment': Benchmark.environment(),
+            'results': Benchmark.run(
+                args.suite or SUITES, args.engine or ['adaptive'], args.generations,
+                args.sizes, args.densities, args.soup_generations, not args.no_memory,
+                rule=rule, topology=topology, workers=args.workers, parallel_size=args.parallel_size
+            ),
+        }
+        if (args.output):
+            with open(args.output, 'w') as fd:
+                json.dump(report, fd, indent=1)
+        else:
+            json.dump(report, sys.stdout, indent=1)
+            sys.stdout.write('\n')
+        if (args.compare):
+            with open(args.compare, 'r') as fd:
+                regressions = Benchmark.compare(json.load(fd)['results'], report['results'], args.threshold)
+            for (name, old_time, new_time) in regressions:
+                sys.stderr.write(f'REGRESSION {name}: {old_time:.4f}s -> {new_time:.4f}s\n')
+            return 1 if (regressions) else 0
+        return 0
@@ -0,0 +1,97 @@
+"""
+Python - Game of life with tkinter
+06/06/2020
+Madipoupou
+"""
+
+class Brush(object):
+    """
+    Shape stamped on the grid in create mode, centred on the cell under the
+    cursor: a square, a disc or a loaded pattern (paste)
+    Dragging the mouse stamps it along the line followed by the cursor
+    """
+    # Brushes chosen in turn (b key): (shape, size)
+    PRESETS = [('square', 1), ('square', 3), ('disc', 5), ('square', 9), ('disc', 15)]
+
+    def __init__(self, shape='square', size=1):
+        """ Brush constructor, size is the width of the shape (cells) """
+        self.shape = shape
+        self.size = size
+        self.name = f'{shape} {size}'
+        # A pattern is pasted once per click, not smeared along the drag
+        self.pattern = False
+        low = -(size // 2)
+        span = range(low, low + size)
+        radius = size / 2
+        if (shape == 'square'):
+            self.offsets = [(dx, dy) for dx in span for dy in span]
+        elif (shape == 'disc'):
+            centre = low + (size - 1) / 2
+            self.offsets = [
+                (dx, dy) for dx in span for dy in span
+                if ((dx - centre) ** 2 + (dy - centre) ** 2 <= radius * radius)
+            ]
+        else:
+            raise ValueError(f'Unknown brush shape {shape!r}')
+
+    @staticmethod
+    def from_pattern(cells, name='pattern'):
+        """ Returns a brush pasting the given cells, centred on the cursor """
+        cells = list(cells)
+        if (not cells):
+            raise ValueError('Empty pattern')
+        xs = [x for (x, y) in cells]
+        ys = [y for (x, y) in cells]
+        xmid = (min(xs) + max(xs)) // 2
+        ymid = (min(ys) + max(ys)) // 2
+        brush = Brush.__new__(Brush)
+        brush.shape = 'pattern'
+        brush.size = max(max(xs) - min(xs), max(ys) - min(ys)) + 1
+        brush.name = name
+        brush.pattern = True
+        brush.offsets = [(x - xmid, y - ymid) for (x, y) in cells]
+        return brush
+
+    def __str__(self):
+        """ Brush string converter """
+        return self.name
+
+    def stamp(self, cell):
+        """ Returns the cells covered by the brush centred on cell """
+        x, y = cell
+        return [(x + dx, y + dy) for (dx, dy) in self.offsets]
+
+    @staticmethod
+    def line(start, end):
+        """ Returns the cells of the line from start (excluded) to end (Bresenham) """
+        x, y = start
+        x1, y1 = end
+        dx, dy = abs(x1 - x), -abs(y1 - y)
+        sx = 1 if (x < x1) else -1
+        sy = 1 if (y < y1) else -1
+        err = dx + dy
+        cells = []
+        while ((x, y) != (x1, y1)):
+            e2 = 2 * err
+            if (e2 >= dy):
+                err += dy
+                x += sx
+            if (e2 <= dx):
+                err += dx
+                y += sy
+            cells.append((x, y))
+        return cells
+
+    def stroke(self, start, end):
+        """
+        Returns the cells covered by the brush moved from start to end, so
+        that a fast drag leaves no hole (a pattern is only stamped on end)
+        """
+        if (self.pattern):
+            return self.stamp(end)
+        if (len(self.offsets) == 1):
+            return Brush.line(start, end)
+        cells = set()
+        for cell in Brush.line(start, end):
+            cells.update(self.stamp(cell))
+        return list(cells)
@@ -4,18 +4,72 @@ Python - Game of life with tkinter
 Madipoupou
 """
 
+from .AdaptiveEngine import AdaptiveEngine
+from .HashLife import HashLife
+from .SpatialIndex import SpatialIndex
+from .History import History
+from .PatternFile import PatternFile
+from .CycleDetector import CycleDetector
+
 class CellGrid(object):
     """
     Class which manages the cell grid
-    Registers the active cells into a list
+    Registers the active cells into a stepping engine (sparse or dense)
     Deals with lifecycle of cells
     """
-    def __init__(self, alive_cells=[]):
+    # Hidden rectangles kept on the canvas to be reused by born cells
+    POOL_SIZE = 10000
+
+    def __init__(self, alive_cells=[], engine=None):
         """ CellGrid constructor """
+        self.engine = engine if (engine) else AdaptiveEngine()
+        # Bumped each time the cells change (generation, edit, load): the
+        # engines may update their set in place, so sets can't be told
+        # apart by identity
+        self.version = 0
         self.alive_cells = alive_cells
-        self.rectangle_ref = []
+        self.rectangle_ref = {}
+        self.rectangle_pool = []
+        self.render_view = None
+        # Version drawn by the last render and (version before, version
+        # after, born, dead) of the last change: the next render only draws
+        # the changes
+        self.rendered_version = None
+        self.last_changes = None
+        self.index = SpatialIndex()
+        # Version in the index
+        self.indexed_version = None
+        # True while a simulation thread owns the engine: the index and the
+        # canvas follow the snapshots it publishes instead
+        self.showing_snapshots = False
         self.saved_cells = None
         self.cycle_num = 0
+        self.history = History()
+        self.detector = CycleDetector()
+        # States of one period once a cycle is found (moved back to the
+        # first lap), the next generations are then looked up, not computed
+        self.cycle_states = None
+        # (born, dead) from each state of an oscillator to the next one: the
+        # engine only toggles them instead of loading the whole state
+        self.cycle_deltas = None
+        # Edits made since the last generation, given to the history lazily
+        self.edited = False
+        # Generations jumped over since, the history restarts lazily
+        self.jumped = False
+        self.restart_history()
+        # Profiler timing the stages, None when profiling is off
+        self.profiler = None
+
+    @property
+    def alive_cells(self):
+        """ The alive cells as a set of (x, y) tuples, owned by the engine """
+        return self.engine.get_cells()
+
+    @alive_cells.setter
+    def alive_cells(self, cell_lst):
+        """ Loads the given cells into the engine (the iterable is copied) """
+        self.engine.load(cell_lst)
+        self.version += 1
     
     def __str__(self):
         """ CellGrid string converter """
@@ -29,9 +83,10 @@ class CellGrid(object):
         Replace the current alive cells by the given list and render
         If the reset hasn't been made we make it
         """
-        if (self.alive_cells or self.rectangle_ref):
+        if (self.engine.population() or self.rectangle_ref):
             self.reset(can)
-        self.alive_cells = cell_lst.copy()
+        self.alive_cells = cell_lst
+        self.restart_history()
         self.render_cells(can)
 
     def refresh(self, can):
@@ -41,103 +96,493 @@ class CellGrid(object):
     def activate_cycle(self):
         """
         Does one cycle -> updates the cell list from previous round to the next
+        Timed and counted when a profiler is set
+        """
+        profiler = self.profiler
+        if (not profiler):
+            self.next_generation()
+            return
+        version = self.version
+        # Without tracking (Generations rules) the changes aren't kept
+        previous = None if (self.tracked()) else self.alive_cells
+        start = profiler.start()
+        self.next_generation()
+        profiler.stop('step', start, generation=self.cycle_num)
+        last = self.last_changes
+        if (last is not None and last[0] == version and last[1] == self.version):
+            born, dead = len(last[2]), len(last[3])
+        elif (previous is not None):
+            cells = self.alive_cells
+            born, dead = len(cells - previous), len(previous - cells)
+        else:
+            born = dead = 0
+        profiler.record_generation(self.cycle_num, born, dead, self.engine.population())
+
+    def next_generation(self):
+        """
+        Computes the next generation into the engine
+        Once the pattern is known to cycle, the state is looked up instead
         """
-        new_cells = []
-        cells_to_check = self.get_cells_to_check()
-        for cell in cells_to_check:
-            if (self.check_next_status(cell)):
-                new_cells.append(cell)
-        self.alive_cells = new_cells
+        self.sync_history()
+        if (not self.tracked()):
+            self.engine.step()
+            self.cycle_num += 1
+            self.version += 1
+            return
+        if (self.cycle_known()):
+            self.cycle_num += 1
+            if (self.cycle_deltas is not None):
+                base, _ = self.detector.locate(self.cycle_num - 1)
+                delta = self.cycle_deltas[base - self.detector.start]
+                if (delta[0] or delta[1]):
+                    self.engine.toggle_all(delta[0] | delta[1])
+                    self.version += 1
+                    self.last_changes = (self.version - 1, self.version) + delta
+            else:
+                # Spaceship: every cell moves, the state is loaded
+                previous = self.alive_cells
+                cells = self.cycle_state(self.cycle_num)
+                delta = (cells - previous, previous - cells)
+                self.alive_cells = cells
+                self.last_changes = (self.version - 1, self.version) + delta
+            self.history.record(self.cycle_num, delta, self.engine.get_packed)
+            return
+        # Engines which don't keep their changes leave a new set each step
+        previous = None if (self.engine.tracks_changes()) else self.alive_cells
+        self.engine.step()
         self.cycle_num += 1
-    
-    def get_cells_to_check(self):
-        """ Returns a list of the cells which needs to be checked """
-        cells_to_check = []
-        for cell in self.alive_cells:
-            for i in range(cell[0] - 1, cell[0] + 2):
-                for j in range(cell[1] - 1, cell[1] + 2):
-                    if ((i, j) not in cells_to_check):
-                        cells_to_check.append((i, j))
-        return cells_to_check
-
-    def check_next_status(self, cell):
-        """
-        Checks the status of cell arg for the next round
-        True if alive, False if dead
-        """
-        alive_neighbor = 0
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-                if ((i, j) == cell):
-                    continue
-                elif ((i, j) in self.alive_cells):
-                    alive_neighbor += 1
-                if (alive_neighbor > 3):
-                    return False
-        if (alive_neighbor not in (2, 3)):
+        self.version += 1
+        if (previous is None):
+            delta = self.engine.changes()
+        else:
+            cells = self.alive_cells
+            delta = (cells - previous, previous - cells)
+        self.last_changes = (self.version - 1, self.version) + tuple(delta)
+        self.history.record(self.cycle_num, delta, self.engine.get_packed)
+        if (self.cycle_states is not None):
+            self.collect_cycle_state(self.alive_cells)
+        elif (self.detector.update(self.cycle_num, delta[0], delta[1])):
+            self.cycle_states = []
+            self.collect_cycle_state(self.alive_cells)
+
+    def collect_cycle_state(self, cells):
+        """
+        Keeps the state of a generation of the first period after the cycle
+        was found, moved back to the lap starting at detector.start
+        """
+        dx, dy = self.detector.displacement
+        if (dx or dy):
+            cells = {(x - dx, y - dy) for (x, y) in cells}
+        else:
+            cells = set(cells)
+        self.cycle_states.append(cells)
+        if (self.cycle_known() and not (dx or dy)):
+            states = self.cycle_states
+            following = states[1:] + states[:1]
+            self.cycle_deltas = [
+                (after - before, before - after) for (before, after) in zip(states, following)
+            ]
+
+    def cycle_known(self):
+        """ True once a cycle is found and the states of a period are known """
+        return (
+            self.cycle_states is not None
+            and len(self.cycle_states) == self.detector.period
+        )
+
+    def cycle_state(self, generation):
+        """ Returns the cells of generation by modular lookup in the cycle """
+        base, (dx, dy) = self.detector.locate(generation)
+        cells = self.cycle_states[base - self.detector.start]
+        if (dx or dy):
+            return {(x + dx, y + dy) for (x, y) in cells}
+        return cells
+
+    def advance(self, n):
+        """
+        Does n cycles, jumping straight to the end once a cycle is found,
+        otherwise by HashLife jumps when the rule and the universe allow it
+        """
+        self.sync_history()
+        if (n > 0 and not self.cycle_known() and self.can_jump()):
+            self.jump(n)
+            return
+        while (n > 0 and not self.cycle_known()):
+            self.activate_cycle()
+            n -= 1
+        if (n > 0):
+            self.cycle_num += n
+            self.alive_cells = self.cycle_state(self.cycle_num)
+            self.history.record(self.cycle_num, None, self.engine.get_packed)
+
+    def can_jump(self):
+        """ True if the generations can be jumped over by HashLife """
+        engine = self.engine
+        return engine.jumps() or (
+            self.tracked() and engine.rule.mask_table is not None
+            and not engine.topology.finite
+        )
+
+    def jump(self, n):
+        """
+        Jumps n generations ahead with HashLife: the engine itself if it is
+        one, otherwise a HashLife loaded with the cells, which are loaded back
+        The history and the cycle detection start again from the new
+        generation, only when needed: the cells of a jump far ahead may be
+        too many to be listed
+        """
+        if (self.engine.jumps()):
+            self.engine.advance(n)
+            self.version += 1
+        else:
+            hashlife = HashLife(self.alive_cells, rule=self.engine.rule)
+            hashlife.advance(n)
+            self.alive_cells = hashlife.get_cells()
+        self.cycle_num += n
+        self.last_changes = None
+        self.jumped = True
+
+    def tracked(self):
+        """
+        True if the history and the cycle detection follow the generations:
+        with Generations rules the dying cells aren't in the alive cells
+        """
+        return self.engine.rule.states == 2
+
+    def set_rule(self, rule, can=None):
+        """ Changes the rule of the engine, the history starts again """
+        self.engine.set_rule(rule)
+        self.restart_history()
+        if (can):
+            self.render_cells(can)
+
+    def set_topology(self, topology, can=None):
+        """
+        Changes the universe of the engine, the cells out of it are wrapped
+        around or removed, the history starts again
+        Raises ValueError if the engine doesn't support the topology
+        """
+        self.engine.set_topology(topology)
+        self.restart_history()
+        if (can):
+            self.render_cells(can)
+
+    def restart_history(self):
+        """
+        The current state becomes the first one of the history, given packed
+        to the history and the cycle detection (no set of the cells is made)
+        """
+        cells = self.engine.get_packed()
+        self.detector.translations = not self.engine.topology.finite
+        self.history.restart(self.cycle_num, cells)
+        self.detector.restart(self.cycle_num, cells)
+        self.cycle_states = None
+        self.cycle_deltas = None
+        self.edited = False
+        self.jumped = False
+
+    def sync_history(self):
+        """
+        Gives the edits made since the last generation to the history, or
+        restarts it after a jump
+        """
+        if (self.jumped):
+            self.restart_history()
+        elif (self.edited):
+            cells = self.engine.get_packed()
+            self.history.truncate(self.cycle_num, cells)
+            self.detector.restart(self.cycle_num, cells)
+            self.cycle_states = None
+            self.cycle_deltas = None
+            self.edited = False
+
+    def seek(self, generation, can):
+        """
+        Goes back (or forward) to a generation kept in the history and renders
+        it, returns False if the generation isn't known
+        """
+        self.sync_history()
+        cells = self.history.seek(generation) if (self.tracked()) else None
+        if (cells is None):
             return False
-        if (cell in self.alive_cells):
-            return True
-        return (alive_neighbor == 3)
+        self.alive_cells = cells
+        self.cycle_num = generation
+        self.detector.restart(generation, cells)
+        self.cycle_states = None
+        self.cycle_deltas = None
+        self.render_cells(can)
+        return True
     
-    def render_cells(self, can):
-        """ Renders the cells on the given canvas """
-        if (not can.obj):
-            can.obj = self
+    def sync_index(self):
+        """
+        Brings the spatial index up to date with the engine cells: the
+        changes of the last generation or edit are applied if the index
+        holds the version before them, otherwise the index is built again
+        While the snapshots are shown, they update the index themselves
+        """
+        if (self.showing_snapshots or self.indexed_version == self.version):
+            return
+        last = self.last_changes
+        if (last is not None and last[0] == self.indexed_version and last[1] == self.version):
+            self.index.update(last[2], last[3])
+        else:
+            self.index.rebuild(self.alive_cells)
+        self.indexed_version = self.version
+
+    def start_snapshots(self, can):
+        """
+        Called before a simulation thread takes the engine: from then on the
+        index and the canvas follow its snapshots (see render_snapshot)
+        """
+        if (self.rendered_version != self.version):
+            self.render_cells(can)
+        self.sync_index()
+        self.showing_snapshots = True
+
+    def stop_snapshots(self, can, snapshot=None):
+        """
+        Called once the simulation thread is stopped, with its last snapshot
+        not rendered yet: the index and the canvas then hold the engine cells
+        """
+        if (snapshot is not None):
+            self.render_snapshot(can, snapshot)
+        self.showing_snapshots = False
+        self.indexed_version = self.version
+        view = (can.origin, can.cell_size)
+        self.rendered_version = self.version if (view == self.render_view) else None
+
+    def render_snapshot(self, can, snapshot):
+        """
+        Renders a snapshot published by the simulation thread: only its
+        changes since the previous one are indexed and drawn, unless it holds
+        all the cells or the view moved
+        """
+        if (snapshot.cells is not None):
+            self.index.rebuild(snapshot.cells)
+            self.render_cells(can)
+            return
+        self.index.update(snapshot.born, snapshot.dead)
+        if (can.bitmap_mode() or (can.origin, can.cell_size) != self.render_view):
+            self.render_cells(can)
+            return
+        profiler = self.profiler
+        if (profiler):
+            start = profiler.start()
+        self.draw_changes(can, snapshot.born, snapshot.dead)
+        if (profiler):
+            profiler.stop('draw', start, changes=len(snapshot.born) + len(snapshot.dead))
+
+    def windowed(self):
+        """
+        True if the visible cells are read from the window of the engine:
+        the spatial index, which holds every cell, is then left empty
+        """
+        return not self.showing_snapshots and self.engine.has_window()
+
+    def get_visible_cells(self, can):
+        """ Returns the set of alive cells inside the canvas view """
         can_xstart = can.origin[0]
         can_xend = can.origin[0] + can.width // can.cell_size + 1
         can_ystart = can.origin[1]
         can_yend = can.origin[1] + can.height // can.cell_size + 1
-        cells_to_render = []
-        for cell in self.alive_cells:
-            if (cell[0] in range(can_xstart, can_xend+1) and cell[1] in range(can_ystart, can_yend)):
-                cells_to_render.append(cell)
-        # Deleting the old rectangles from canvas
-        for rect in self.rectangle_ref:
-            can.delete(rect)
-            del self.rectangle_ref
-            self.rectangle_ref = []
-        # Draw each cell
-        for cell in cells_to_render:
+        if (self.windowed()):
+            if (self.indexed_version is not None):
+                self.index.rebuild(())
+                self.indexed_version = None
+            window = self.engine.window(
+                can_xstart, can_ystart, can_xend - can_xstart + 1, can_yend - can_ystart
+            )
+            xs, ys = window.nonzero()
+            return set(zip((xs + can_xstart).tolist(), (ys + can_ystart).tolist()))
+        self.sync_index()
+        return self.index.query(can_xstart, can_ystart, can_xend, can_yend - 1)
+
+    def render_cells(self, can):
+        """
+        Renders the cells on the given canvas
+        Only the cells which changed since the last render are drawn: dead
+        cells are hidden into a pool of rectangles, born cells reuse them
+        Right after a generation only its changes are looked at, not the
+        whole view
+        """
+        if (not can.obj):
+            can.obj = self
+        profiler = self.profiler
+        if (profiler):
+            start = profiler.start()
+        if (can.bitmap_mode()):
+            self.clear_rectangles(can)
+            self.rendered_version = None
+            self.render_bitmap(can)
+            if (profiler):
+                profiler.stop('draw', start, bitmap=True)
+            return
+        can.clear_bitmap()
+        view = (can.origin, can.cell_size)
+        last = self.last_changes
+        if (view == self.render_view and not self.showing_snapshots and last is not None
+                and last[0] == self.rendered_version and last[1] == self.version):
+            self.render_changes(can, last[2], last[3])
+            if (profiler):
+                profiler.stop('draw', start, changes=len(last[2]) + len(last[3]))
+            return
+        visible = self.get_visible_cells(can)
+        self.rendered_version = None if (self.showing_snapshots) else self.version
+        if (profiler):
+            profiler.stop('cull', start, visible=len(visible))
+            start = profiler.start()
+        if (view != self.render_view):
+            # The view moved: every rectangle kept has to be placed again
+            self.render_view = view
+            for cell, rect in list(self.rectangle_ref.items()):
+                if (cell in visible):
+                    can.coords(rect, *self.cell_coords(can, cell))
+                else:
+                    self.hide_cell(can, cell)
+        else:
+            for cell in self.rectangle_ref.keys() - visible:
+                self.hide_cell(can, cell)
+        for cell in visible - self.rectangle_ref.keys():
             self.draw_cell(can, cell)
-    
-    def draw_cell(self, can, cell):
-        """ Draws a cell onto the canvas -> black square """
+        if (profiler):
+            profiler.stop('draw', start, rectangles=len(self.rectangle_ref))
+
+    def render_changes(self, can, born, dead):
+        """ Renders the born and dead cells of the last generation or edit """
+        if (not self.windowed()):
+            self.sync_index()
+        self.rendered_version = self.version
+        self.draw_changes(can, born, dead)
+
+    def draw_changes(self, can, born, dead):
+        """ Hides the squares of the dead cells, draws the born ones in the view """
+        xmin, ymin = can.origin
+        xmax = xmin + can.width // can.cell_size + 1
+        ymax = ymin + can.height // can.cell_size
+        for cell in dead:
+            if (cell in self.rectangle_ref):
+                self.hide_cell(can, cell)
+        for cell in born:
+            if (xmin <= cell[0] <= xmax and ymin <= cell[1] <= ymax):
+                self.draw_cell(can, cell)
+
+    def cell_coords(self, can, cell):
+        """ Returns the canvas coordinates of the square of cell """
         new_coord = (cell[0] - can.origin[0], cell[1] - can.origin[1])
         xstart = new_coord[0] * can.cell_size
         ystart = can.height - new_coord[1] * can.cell_size
-        self.rectangle_ref.append(can.create_rectangle(
-            xstart, ystart, xstart + can.cell_size, ystart - can.cell_size,
-            fill='black', outline='white'
-        ))
+        return (xstart, ystart, xstart + can.cell_size, ystart - can.cell_size)
     
+    def draw_cell(self, can, cell):
+        """ Draws a cell onto the canvas -> black square (pooled if possible) """
+        if (self.rectangle_pool):
+            rect = self.rectangle_pool.pop()
+            can.coords(rect, *self.cell_coords(can, cell))
+            can.itemconfigure(rect, state='normal')
+        else:
+            rect = can.create_rectangle(
+                *self.cell_coords(can, cell), fill='black', outline='white',
+                tags='cell'
+            )
+        self.rectangle_ref[cell] = rect
+
+    def hide_cell(self, can, cell):
+        """ Removes the square of cell from the canvas, keeping it for later """
+        rect = self.rectangle_ref.pop(cell)
+        if (len(self.rectangle_pool) < self.POOL_SIZE):
+            can.itemconfigure(rect, state='hidden')
+            self.rectangle_pool.append(rect)
+        else:
+            can.delete(rect)
+    
+    def clear_rectangles(self, can):
+        """ Deletes every cell rectangle (pooled ones too) from the canvas """
+        if (self.rectangle_ref or self.rectangle_pool):
+            can.delete('cell')
+        self.rectangle_ref = {}
+        self.rectangle_pool = []
+        self.render_view = None
+
+    def render_bitmap(self, can):
+        """
+        Renders the view as one image with a pixel per cell (zoomed to the
+        cell size), used when the cells are too small for rectangles
+        The dense engine gives its array window directly, otherwise the
+        visible cells are set one by one into a grayscale buffer
+        """
+        size = can.cell_size
+        cols = can.width // size + 2
+        rows = can.height // size + 1
+        window = None
+        if (not self.showing_snapshots):
+            window = self.engine.window(can.origin[0], can.origin[1], cols, rows)
+        if (window is not None):
+            # window[x, y] -> pixels[row, col] with the row 0 on top
+            pixels = (1 - window.T[::-1]) * 255
+            pixels = pixels.repeat(size, axis=0).repeat(size, axis=1)
+            can.draw_bitmap(pixels.tobytes(), cols * size, rows * size)
+            return
+        pixels = bytearray(b'\xff') * (cols * rows)
+        xorigin, yorigin = can.origin
+        for (x, y) in self.get_visible_cells(can):
+            pixels[(rows - 1 - (y - yorigin)) * cols + x - xorigin] = 0
+        can.draw_bitmap(bytes(pixels), cols, rows, zoom=size)
+
     def add_remove_cell(self, cell, can):
         """ Add or remove cell from alive_cells """
-        if (cell in self.alive_cells):
-            self.alive_cells.remove(cell)
+        self.edit_cells([cell], can)
+
+    def edit_cells(self, cells, can, alive=None):
+        """
+        Batch edit (painting, pasting): makes the given cells alive (alive
+        True), dead (alive False) or toggles them (alive None), then redraws
+        only the cells changed
+        Returns the list of the cells changed
+        """
+        normalize = self.engine.topology.normalize
+        batch = dict.fromkeys(normalize(cell) for cell in cells)
+        batch.pop(None, None)
+        is_alive = self.engine.is_alive
+        if (alive is None):
+            changed = list(batch)
         else:
-            self.alive_cells.append(cell)
+            changed = [cell for cell in batch if (is_alive(cell) != alive)]
+        if (not changed):
+            return changed
+        # Told apart before the toggles, which may change the set in place
+        born = [cell for cell in changed if (not is_alive(cell))]
+        dead = [cell for cell in changed if (is_alive(cell))]
+        self.engine.toggle_all(changed)
+        self.edited = True
+        self.version += 1
+        self.last_changes = (self.version - 1, self.version, born, dead)
         self.render_cells(can)
+        return changed
     
+    def save_file(self, path):
+        """ Saves the alive cells into the pattern file at path, with the rule of the engine """
+        PatternFile.save(path, self.engine.get_packed(), self.engine.rule)
+
     def save_cells(self):
-        """ Save current cells """
+        """ Save current cells (packed, 8 bytes per cell) """
         del self.saved_cells
-        self.saved_cells = self.alive_cells.copy()
+        self.saved_cells = self.engine.get_packed()
     
     def load_cells(self, can):
         """ Come back to saved configuration (does nothing if nothing saved """
         if (self.saved_cells):
-            del self.alive_cells
-            self.alive_cells = self.saved_cells.copy()
+            self.alive_cells = self.saved_cells
             self.cycle_num = 0
+            self.restart_history()
             self.render_cells(can)
         
     def reset(self, can):
         """
         Remove everything from the grid and deleting the element on given canvas
         """
-        for rect in self.rectangle_ref:
-            can.delete(rect)
+        self.clear_rectangles(can)
+        can.clear_bitmap()
         self.alive_cells = []
         self.cycle_num = 0
+        self.restart_history()
         self.render_cells(can)
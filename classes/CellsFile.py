@@ -0,0 +1,70 @@
+"""
+Python - Game of life with tkinter
+06/06/2020
+Madipoupou
+"""
+
+class CellsFile(object):
+    """
+    Reads and writes the plaintext .cells format: '!' comment lines, then
+    one line per row of the pattern, '.' dead and 'O' alive
+    File rows go downwards, so row r of the file becomes y = height - 1 - r
+    """
+    ALIVE = 'O*'
+
+    @staticmethod
+    def read(path):
+        """
+        Returns the list of cells saved in the .cells file at path
+        Raises OSError if the file can't be read, ValueError if it has no cell
+        """
+        cells = []
+        for chunk in CellsFile.iter_chunks(path):
+            cells.extend(chunk)
+        if (not cells):
+            raise ValueError(f'{path} is not well formatted')
+        return cells
+
+    @staticmethod
+    def iter_chunks(path, batch_size=1 << 16):
+        """
+        Yields the cells of the file at path by lists of about batch_size
+        A first pass counts the rows to know where the top of the pattern is
+        """
+        with open(path, 'r') as fd:
+            height = sum(1 for line in fd if (not line.startswith('!')))
+            fd.seek(0)
+            cells = []
+            y = height - 1
+            for line in fd:
+                if (line.startswith('!')):
+                    continue
+                for x, char in enumerate(line):
+                    if (char in CellsFile.ALIVE):
+                        cells.append((x, y))
+                    elif (char not in '.\r\n '):
+                        raise ValueError(f'Bad character {char!r} in plaintext pattern')
+                y -= 1
+                if (len(cells) >= batch_size):
+                    yield cells
+                    cells = []
+            yield cells
+
+    @staticmethod
+    def write(fd, cells):
+        """ Writes the cells into the opened text file fd, top row first """
+        rows = {}
+        for (x, y) in cells:
+            rows.setdefault(y, []).append(x)
+        if (not rows):
+            return
+        xmin = min(min(xs) for xs in rows.values())
+        for y in range(max(rows), min(rows) - 1, -1):
+            xs = rows.get(y)
+            if (not xs):
+                fd.write('\n')
+                continue
+            line = ['.'] * (max(xs) - xmin + 1)
+            for x in xs:
+                line[x - xmin] = 'O'
+            fd.write(''.join(line) + '\n')
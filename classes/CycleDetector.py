@@ -0,0 +1,145 @@
+"""
+Python - Game of life with tkinter
+06/06/2020
+Madipoupou
+"""
+
+from collections import deque
+
+class CycleDetector(object):
+    """
+    Detects when the pattern comes back to an earlier state, maybe moved:
+    still life, oscillator or spaceship
+    The state is hashed as the sum of A^x * B^y over the alive cells (modulo
+    a prime), so the hash is updated with the births/deaths of a generation
+    and a translation by (dx, dy) only multiplies it by A^dx * B^dy
+    The sums of the coordinates are updated the same way: a translation by
+    (dx, dy) adds (n dx, n dy) to them, so (sum // n) moves with the pattern
+    and is the anchor the hash is taken from, (sum % n) doesn't change
+    The hashes of the last max_period generations are kept in a table
+    Without translations (finite universes, where a pattern moved across an
+    edge isn't the same pattern moved) only exact repeats are cycles
+    """
+    MODULUS = (1 << 61) - 1
+    BASE_X = 0x2545F4914F6CDD1D % MODULUS
+    BASE_Y = 0x5851F42D4C957F2D % MODULUS
+    # Cached powers of the bases, forgotten past this size
+    POWERS_SIZE = 1 << 16
+
+    def __init__(self, max_period=256, translations=True):
+        """ CycleDetector constructor """
+        self.max_period = max_period
+        self.translations = translations
+        self.powers_x = {}
+        self.powers_y = {}
+        self.restart(0, ())
+
+    def restart(self, generation, cells):
+        """ Forgets the known states, cells is the state of generation """
+        self.table = {}
+        self.order = deque()
+        self.period = None
+        self.displacement = None
+        self.start = None
+        self.hash = 0
+        self.population = 0
+        self.sum_x = self.sum_y = 0
+        self.update(generation, cells, ())
+
+    @staticmethod
+    def bounding_box(cells):
+        """ Returns (xmin, ymin, xmax, ymax) of the cells, None if empty """
+        if (not cells):
+            return None
+        xs = [cell[0] for cell in cells]
+        ys = [cell[1] for cell in cells]
+        return (min(xs), min(ys), max(xs), max(ys))
+
+    def power(self, powers, base, n):
+        """ Returns base^n modulo MODULUS (n may be negative), cached """
+        value = powers.get(n)
+        if (value is None):
+            if (len(powers) >= self.POWERS_SIZE):
+                powers.clear()
+            value = powers[n] = pow(base, n, self.MODULUS)
+        return value
+
+    def weight(self, cells):
+        """
+        Returns the sum of the hash terms of the cells, their number and the
+        sums of their coordinates
+        """
+        powers_x, powers_y = self.powers_x, self.powers_y
+        total = sum_x = sum_y = count = 0
+        for (x, y) in cells:
+            total += (
+                self.power(powers_x, self.BASE_X, x) * self.power(powers_y, self.BASE_Y, y)
+            )
+            sum_x += x
+            sum_y += y
+            count += 1
+        return total % self.MODULUS, count, sum_x, sum_y
+
+    def update(self, generation, born, dead):
+        """
+        Registers the births/deaths leading to generation
+        Returns True when a cycle has just been found
+        """
+        born_hash, born_count, born_x, born_y = self.weight(born)
+        dead_hash, dead_count, dead_x, dead_y = self.weight(dead)
+        self.hash = (self.hash + born_hash - dead_hash) % self.MODULUS
+        self.population += born_count - dead_count
+        self.sum_x += born_x - dead_x
+        self.sum_y += born_y - dead_y
+        if (self.period):
+            return False
+        n = self.population
+        if (n == 0):
+            key = (0, 0, 0, 0)
+            x0 = y0 = 0
+        elif (not self.translations):
+            key = (self.hash, n)
+            x0 = y0 = 0
+        else:
+            x0, rest_x = divmod(self.sum_x, n)
+            y0, rest_y = divmod(self.sum_y, n)
+            # Hash of the pattern moved by (-x0, -y0), the same wherever it is
+            normalized = (
+                self.hash * self.power(self.powers_x, self.BASE_X, -x0)
+                * self.power(self.powers_y, self.BASE_Y, -y0)
+            ) % self.MODULUS
+            key = (normalized, n, rest_x, rest_y)
+        known = self.table.get(key)
+        if (known is not None):
+            first, first_x, first_y = known
+            self.start = first
+            self.period = generation - first
+            self.displacement = (x0 - first_x, y0 - first_y)
+            return True
+        self.table[key] = (generation, x0, y0)
+        self.order.append(key)
+        if (len(self.order) > self.max_period):
+            del self.table[self.order.popleft()]
+        return False
+
+    def locate(self, generation):
+        """
+        Once a cycle is found, returns (base, (dx, dy)): the state of
+        generation is the state of base moved by (dx, dy), base being one
+        of the generations start ... start + period - 1
+        """
+        laps, phase = divmod(generation - self.start, self.period)
+        dx, dy = self.displacement
+        return self.start + phase, (laps * dx, laps * dy)
+
+    def describe(self):
+        """ Describes the cycle found, None if there is none """
+        if (not self.period):
+            return None
+        if (self.population == 0):
+            return 'dead'
+        if (self.displacement != (0, 0)):
+            return f'spaceship, period {self.period}, moving by {self.displacement}'
+        if (self.period == 1):
+            return 'still life'
+        return f'oscillator, period {self.period}'
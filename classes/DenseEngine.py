@@ -0,0 +1,301 @@
+"""
+Python - Game of life with tkinter
+06/06/2020
+Madipoupou
+"""
+
+from .Engine import Engine
+from .PackedCells import PackedCells
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+def neighbor_counts(alive, rule):
+    """
+    Returns the numbers of alive neighbours of the cells of the 0/1 array
+    alive, 0 on the border of width rule.radius
+    8 shifted sums for radius 1, box sums of a summed-area table otherwise
+    """
+    r = rule.radius
+    if (r == 1):
+        count = np.zeros_like(alive)
+        count[1:-1, 1:-1] = (
+            alive[:-2, :-2] + alive[:-2, 1:-1] + alive[:-2, 2:]
+            + alive[1:-1, :-2] + alive[1:-1, 2:]
+            + alive[2:, :-2] + alive[2:, 1:-1] + alive[2:, 2:]
+        )
+        if (rule.include_center):
+            count[1:-1, 1:-1] += alive[1:-1, 1:-1]
+        return count
+    d = 2 * r + 1
+    sums = np.zeros((alive.shape[0] + 1, alive.shape[1] + 1), dtype=np.int32)
+    np.cumsum(np.cumsum(alive, axis=0, dtype=np.int32), axis=1, out=sums[1:, 1:])
+    count = np.zeros(alive.shape, dtype=np.int32)
+    count[r:-r, r:-r] = sums[d:, d:] - sums[:-d, d:] - sums[d:, :-d] + sums[:-d, :-d]
+    if (not rule.include_center):
+        count[r:-r, r:-r] -= alive[r:-r, r:-r]
+    return count
+
+class DenseEngine(Engine):
+    """
+    Stepping backend which keeps the bounding region of the alive cells as a
+    NumPy uint8 array (1 = alive, 2... = dying with Generations rules)
+    A generation counts the neighbours with shifted array sums then looks
+    the next states up with the rule, the array grows when the pattern
+    reaches its border and shrinks when it leaves too much space
+    In a finite universe the array is the universe: it is padded with the
+    neighbours across the edges by the gather index map of the topology
+    """
+    name = 'dense'
+
+    # Free cells kept around the pattern when (re)allocating the array
+    # (more for the rules with a wide neighbourhood)
+    MARGIN = 8
+    # Generations between two shrink checks
+    SHRINK_EVERY = 32
+
+    def __init__(self, cells=(), rule=None, topology=None):
+        """ DenseEngine constructor """
+        if (np is None):
+            raise ImportError('DenseEngine requires numpy')
+        self.generation = 0
+        Engine.__init__(self, cells, rule, topology)
+
+    @property
+    def margin(self):
+        """ Free cells kept around the pattern """
+        return max(self.MARGIN, 2 * self.rule.radius + 2)
+
+    def load(self, cells):
+        """
+        Replaces the current state by the given (x, y) cells, PackedCells
+        are loaded from their arrays without any tuple
+        """
+        self.cache = None
+        self.last_step = None
+        if (isinstance(cells, PackedCells) and not self.topology.finite):
+            self.load_arrays(*cells.arrays())
+            return
+        if (self.topology.finite):
+            self.origin = (0, 0)
+            self.array = self.allocate((self.topology.width, self.topology.height))
+            cells = list(self.topology.normalize_all(cells))
+            if (cells):
+                coords = np.array(cells, dtype=np.int64)
+                self.array[coords[:, 0], coords[:, 1]] = 1
+            return
+        coords = np.array(list(cells), dtype=np.int64).reshape(-1, 2)
+        self.load_arrays(coords[:, 0], coords[:, 1])
+
+    def load_arrays(self, xs, ys):
+        """ Replaces the current state by the cells given as coordinate arrays """
+        if (not xs.size):
+            self.origin = (0, 0)
+            self.array = self.allocate((2 * self.margin, 2 * self.margin))
+            return
+        xmin, xmax = int(xs.min()), int(xs.max())
+        ymin, ymax = int(ys.min()), int(ys.max())
+        self.origin = (xmin - self.margin, ymin - self.margin)
+        self.array = self.allocate(
+            (xmax - xmin + 1 + 2 * self.margin, ymax - ymin + 1 + 2 * self.margin)
+        )
+        self.array[xs - self.origin[0], ys - self.origin[1]] = 1
+
+    def allocate(self, shape):
+        """ Returns a new dead array of the given shape """
+        return np.zeros(shape, dtype=np.uint8)
+
+    def bounding_box(self):
+        """ Returns (xmin, ymin, xmax, ymax) of the alive cells, None if empty """
+        xs = np.flatnonzero(self.array.any(axis=1))
+        if (not xs.size):
+            return None
+        ys = np.flatnonzero(self.array.any(axis=0))
+        return (
+            self.origin[0] + int(xs[0]), self.origin[1] + int(ys[0]),
+            self.origin[0] + int(xs[-1]), self.origin[1] + int(ys[-1])
+        )
+
+    def resize(self, bbox):
+        """ Reallocates the array around bbox, keeping margin free cells """
+        if (bbox is None):
+            self.load(())
+            return
+        xmin, ymin, xmax, ymax = bbox
+        new_origin = (xmin - self.margin, ymin - self.margin)
+        new_array = self.allocate(
+            (xmax - xmin + 1 + 2 * self.margin, ymax - ymin + 1 + 2 * self.margin)
+        )
+        new_array[:] = self.states_window(new_origin[0], new_origin[1], *new_array.shape)
+        self.origin = new_origin
+        self.array = new_array
+
+    def window(self, xmin, ymin, width, height):
+        """
+        Returns the cells of the given rectangle as a uint8 array indexed
+        [x - xmin, y - ymin], 1 for the alive cells (a copy, cells outside
+        the array are dead)
+        """
+        res = self.states_window(xmin, ymin, width, height)
+        if (self.rule.states > 2):
+            return (res == 1).view(np.uint8)
+        return res
+
+    def has_window(self):
+        """ The array gives the windows """
+        return True
+
+    def states_window(self, xmin, ymin, width, height):
+        """ Returns the states of the cells of the given rectangle, like window """
+        res = np.zeros((width, height), dtype=np.uint8)
+        x0 = max(xmin, self.origin[0])
+        y0 = max(ymin, self.origin[1])
+        x1 = min(xmin + width, self.origin[0] + self.array.shape[0])
+        y1 = min(ymin + height, self.origin[1] + self.array.shape[1])
+        if (x0 < x1 and y0 < y1):
+            res[x0 - xmin:x1 - xmin, y0 - ymin:y1 - ymin] = \
+                self.array[x0 - self.origin[0]:x1 - self.origin[0], y0 - self.origin[1]:y1 - self.origin[1]]
+        return res
+
+    def ensure_border(self):
+        """
+        The step needs 2 * radius dead rows/columns on each side of the array,
+        otherwise we grow it
+        """
+        a = self.array
+        e = 2 * self.rule.radius
+        if (a[:e].any() or a[-e:].any() or a[:, :e].any() or a[:, -e:].any()):
+            self.resize(self.bounding_box())
+
+    def shrink(self):
+        """ Crops the array when the pattern uses much less than its size """
+        bbox = self.bounding_box()
+        if (bbox is None):
+            return
+        width = bbox[2] - bbox[0] + 1 + 2 * self.margin
+        height = bbox[3] - bbox[1] + 1 + 2 * self.margin
+        if (width * height * 2 < self.array.size):
+            self.resize(bbox)
+
+    def alive(self):
+        """ The 0/1 array of the alive cells (the array itself with 2 states) """
+        if (self.rule.states > 2):
+            return (self.array == 1).view(np.uint8)
+        return self.array
+
+    def padded(self, a):
+        """
+        Returns the array a of the finite universe padded with rule.radius
+        cells taken across the edges (dead past the edges of a bounded plane)
+        """
+        flat = np.concatenate((a.ravel(), np.zeros(1, dtype=a.dtype)))
+        return flat.take(self.topology.index_map(self.rule.radius))
+
+    def step(self):
+        """ Computes the next generation, looked up by the rule """
+        if (self.topology.finite):
+            r = self.rule.radius
+            count = neighbor_counts(self.padded(self.alive()), self.rule)[r:-r, r:-r]
+            self.keep_step(self.array, self.rule.next_states(self.array, count))
+            return
+        self.ensure_border()
+        a = self.array
+        self.keep_step(a, self.rule.next_states(a, neighbor_counts(self.alive(), self.rule)))
+        self.generation += 1
+        if (self.generation % self.SHRINK_EVERY == 0):
+            self.shrink()
+
+    def keep_step(self, old, new):
+        """
+        new becomes the array, both generations are kept (not compared yet)
+        for changes()
+        """
+        self.array = new
+        self.cache = None
+        self.last_step = (old, new, self.origin, None)
+
+    def changes(self):
+        """
+        Returns the (born, dead) cells of the last step as PackedCells, found
+        by comparing its two arrays (once), None if the cells were edited since
+        """
+        if (self.last_step is None):
+            return None
+        old, new, origin, delta = self.last_step
+        if (delta is None):
+            if (self.rule.states > 2):
+                old, new = old == 1, new == 1
+            xs, ys = np.nonzero(old != new)
+            alive = new[xs, ys] != 0
+            xs += origin[0]
+            ys += origin[1]
+            born = PackedCells.from_sorted_arrays(xs[alive], ys[alive])
+            alive = ~alive
+            dead = PackedCells.from_sorted_arrays(xs[alive], ys[alive])
+            delta = (born, dead)
+            self.last_step = (None, None, origin, delta)
+        return delta
+
+    def tracks_changes(self):
+        """ The two arrays of each step give its changes """
+        return True
+
+    def get_cells(self):
+        """ Returns the alive cells as a set of (x, y) tuples (cached) """
+        if (self.cache is None):
+            xs, ys = np.nonzero(self.alive())
+            self.cache = set(zip(
+                (xs + self.origin[0]).tolist(), (ys + self.origin[1]).tolist()
+            ))
+        return self.cache
+
+    def get_packed(self):
+        """ Returns the alive cells as PackedCells, straight from the array """
+        xs, ys = np.nonzero(self.alive())
+        return PackedCells.from_sorted_arrays(xs + self.origin[0], ys + self.origin[1])
+
+    def is_alive(self, cell):
+        """ True if the (x, y) cell is alive, read in the array """
+        cell = self.topology.normalize(cell)
+        if (cell is None):
+            return False
+        i, j = cell[0] - self.origin[0], cell[1] - self.origin[1]
+        return (
+            0 <= i < self.array.shape[0] and 0 <= j < self.array.shape[1]
+            and self.array[i, j] == 1
+        )
+
+    def toggle(self, cell):
+        """ Makes a dead cell alive and an alive cell dead """
+        cell = self.topology.normalize(cell)
+        if (cell is None):
+            return
+        i, j = cell[0] - self.origin[0], cell[1] - self.origin[1]
+        if (not (0 <= i < self.array.shape[0] and 0 <= j < self.array.shape[1])):
+            bbox = self.bounding_box() or (cell[0], cell[1], cell[0], cell[1])
+            self.resize((
+                min(bbox[0], cell[0]), min(bbox[1], cell[1]),
+                max(bbox[2], cell[0]), max(bbox[3], cell[1])
+            ))
+            i, j = cell[0] - self.origin[0], cell[1] - self.origin[1]
+        alive = self.array[i, j] != 1
+        self.array[i, j] = 1 if (alive) else 0
+        if (self.cache is not None):
+            if (alive):
+                self.cache.add(cell)
+            else:
+                self.cache.discard(cell)
+        self.last_step = None
+
+    def population(self):
+        """ Returns the number of alive cells """
+        return int(self.alive().sum(dtype=np.int64))
+
+    def density(self):
+        """ Ratio of alive cells inside the bounding box """
+        bbox = self.bounding_box()
+        if (bbox is None):
+            return 0.0
+        return self.population() / ((bbox[2] - bbox[0] + 1) * (bbox[3] - bbox[1] + 1))
@@ -0,0 +1,145 @@
+"""
+Python - Game of life with tkinter
+06/06/2020
+Madipoupou
+"""
+
+from .PackedCells import PackedCells
+from .Rule import LIFE
+from .Topology import PLANE
+
+class Engine(object):
+    """
+    Base class of the stepping backends used by CellGrid
+    An engine owns the alive cells and knows how to compute the next generation
+    with its rule (B3/S23 by default) in its topology (the unbounded plane by
+    default)
+    Cells go in and out as (x, y) tuples, with Generations rules the dying
+    cells stay inside the engine
+    """
+    name = 'base'
+
+    def __init__(self, cells=(), rule=None, topology=None):
+        """ Engine constructor """
+        self.rule = rule if (rule) else LIFE
+        self.topology = topology if (topology) else PLANE
+        self.check_rule(self.rule)
+        self.check_topology(self.topology)
+        self.load(cells)
+
+    def check_rule(self, rule):
+        """ Raises ValueError if the engine can't run rule """
+        pass
+
+    def check_topology(self, topology):
+        """ Raises ValueError if the engine can't run in topology """
+        pass
+
+    def set_topology(self, topology):
+        """ Changes the topology, the alive cells are moved into the new universe """
+        self.check_topology(topology)
+        cells = set(self.get_cells())
+        self.topology = topology
+        self.load(cells)
+
+    def set_rule(self, rule):
+        """ Changes the rule, the alive cells are kept (not the dying ones) """
+        self.check_rule(rule)
+        cells = set(self.get_cells())
+        self.rule = rule
+        self.load(cells)
+
+    def load(self, cells):
+        """ Replaces the current state by the given (x, y) cells """
+        raise NotImplementedError
+
+    def step(self):
+        """ Computes the next generation """
+        raise NotImplementedError
+
+    def advance(self, n):
+        """ Computes n generations """
+        for _ in range(n):
+            self.step()
+
+    def jumps(self):
+        """
+        True if advance(n) jumps over the generations instead of computing
+        them one by one (its cost doesn't grow with n)
+        """
+        return False
+
+    def get_cells(self):
+        """ Returns the alive cells as a set of (x, y) tuples """
+        raise NotImplementedError
+
+    def get_packed(self):
+        """ Returns the alive cells as PackedCells (a compact copy) """
+        return PackedCells(self.get_cells())
+
+    def changes(self):
+        """
+        Returns the (born, dead) cells of the last step, None if the engine
+        doesn't know them (the caller then compares the generations)
+        """
+        return None
+
+    def tracks_changes(self):
+        """
+        True if changes() gives the (born, dead) cells of the next step,
+        asked right after it. Otherwise each step leaves a new set in
+        get_cells, the previous one can be compared with it
+        """
+        return False
+
+    def toggle(self, cell):
+        """ Makes a dead cell alive and an alive cell dead """
+        cells = set(self.get_cells())
+        if (cell in cells):
+            cells.remove(cell)
+        else:
+            cells.add(cell)
+        self.load(cells)
+
+    def toggle_all(self, cells):
+        """
+        Toggles each of the given (distinct) cells, one by one
+        Engines whose toggle loads the whole state again override it
+        """
+        for cell in cells:
+            self.toggle(cell)
+
+    def is_alive(self, cell):
+        """ True if the (x, y) cell is alive """
+        return cell in self.get_cells()
+
+    def population(self):
+        """ Returns the number of alive cells """
+        return len(self.get_cells())
+
+    def bounding_box(self):
+        """ Returns (xmin, ymin, xmax, ymax) of the alive cells, None if empty """
+        cells = self.get_cells()
+        if (not cells):
+            return None
+        xs = [cell[0] for cell in cells]
+        ys = [cell[1] for cell in cells]
+        return (min(xs), min(ys), max(xs), max(ys))
+
+    def window(self, xmin, ymin, width, height):
+        """
+        Returns the cells of the given rectangle as a NumPy uint8 array
+        indexed [x - xmin, y - ymin], None if the engine has no array form
+        """
+        return None
+
+    def has_window(self):
+        """
+        True if window() gives the cells of its rectangle: the visible cells
+        can be read from it instead of an index of all the cells
+        """
+        return False
+
+    def close(self):
+        """ Frees the resources held by the engine (processes, memory...) """
+        pass
@@ -10,6 +10,9 @@ class GridCanvas(tk.Canvas):
     """
     Class which manages a specific canvas designed to be a grid
     """
+    # Up to this cell size the cells are drawn as one bitmap, without grid
+    BITMAP_CELL_SIZE = 3
+
     def __init__(self, boss, width=1000, height=600, cell_size=20):
         """ GridCanvas constructor """
         tk.Canvas.__init__(self, boss)
@@ -19,6 +22,10 @@ class GridCanvas(tk.Canvas):
         self.height = height
         self.origin = (0, 0)
         self.lines = []
+        self.bitmap = None
+        self.bitmap_ref = None
+        # Profiler timing the grid drawing, None when profiling is off
+        self.profiler = None
         self.render_grid()
         self.focus_set()
         self.obj = None # If an object is put on canvas it can be saved
@@ -30,13 +37,52 @@ class GridCanvas(tk.Canvas):
         self.bind('<Right>', lambda event: self.move(1, 0))
 
     def render_grid(self):
-        """ Draws the grid on the canvas """
-        self.delete('all')
-        for x in range(0, self.width, self.cell_size):
-            self.lines.append(self.create_line(x, 0, x, self.height))
-        for y in range(self.height, 0, -self.cell_size):
-            self.lines.append(self.create_line(0, y, self.width, y))
+        """
+        Draws the grid on the canvas, under the cells
+        (the cell rectangles are kept, their owner moves them on refresh)
+        No grid in bitmap mode: the lines would hide the cells
+        """
+        profiler = self.profiler
+        if (profiler):
+            start = profiler.start()
+        self.delete('grid')
+        self.lines = []
+        if (not self.bitmap_mode()):
+            for x in range(0, self.width, self.cell_size):
+                self.lines.append(self.create_line(x, 0, x, self.height, tags='grid'))
+            for y in range(self.height, 0, -self.cell_size):
+                self.lines.append(self.create_line(0, y, self.width, y, tags='grid'))
+            self.tag_lower('grid')
+        if (profiler):
+            profiler.stop('grid', start, lines=len(self.lines))
     
+    def bitmap_mode(self):
+        """ True if the cells are too small to be drawn as rectangles """
+        return self.cell_size <= self.BITMAP_CELL_SIZE
+
+    def draw_bitmap(self, data, width, height, zoom=1):
+        """
+        Displays data, width x height grayscale pixels (one byte each, top
+        row first), on the bottom left corner of the canvas, zoomed if asked
+        """
+        header = f'P5 {width} {height} 255\n'.encode()
+        image = tk.PhotoImage(width=width, height=height, data=header + data, format='PPM')
+        if (zoom > 1):
+            image = image.zoom(zoom)
+        if (self.bitmap_ref is None):
+            self.bitmap_ref = self.create_image(0, self.height, image=image, anchor=tk.SW)
+        else:
+            self.itemconfigure(self.bitmap_ref, image=image)
+        # Tk forgets the image if no python reference is kept
+        self.bitmap = image
+
+    def clear_bitmap(self):
+        """ Removes the bitmap of the cells from the canvas """
+        if (self.bitmap_ref is not None):
+            self.delete(self.bitmap_ref)
+            self.bitmap_ref = None
+            self.bitmap = None
+
     def zoom(self, coeff):
         """ Zoom in or zoom out in Canvas """
         # Calculating the middle cell coord
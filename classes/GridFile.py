@@ -0,0 +1,64 @@
+"""
+Python - Game of life with tkinter
+06/06/2020
+Madipoupou
+"""
+
+import re
+
+class GridFile(object):
+    """
+    Reads and writes the .grid text format: 'x,y-' for each alive cell
+    Used by the GUI import/export and by the headless runner
+    """
+    # The '-' separator is also the sign of negative coordinates
+    CELL = re.compile(r'(-?\d+),(-?\d+)-')
+    # The last cell of a file may have no separator
+    LAST_CELL = re.compile(r'(-?\d+),(-?\d+)(?:-|\s*$)')
+
+    @staticmethod
+    def parse(content):
+        """ Returns the list of (x, y) cells described by the string content """
+        return [(int(x), int(y)) for (x, y) in GridFile.LAST_CELL.findall(content)]
+
+    @staticmethod
+    def read(path):
+        """
+        Returns the list of cells saved in the file at path
+        Raises OSError if the file can't be read, ValueError if it has no cell
+        """
+        cell_list = []
+        for chunk in GridFile.iter_chunks(path):
+            cell_list.extend(chunk)
+        if (not cell_list):
+            raise ValueError(f'{path} is not well formatted')
+        return cell_list
+
+    @staticmethod
+    def iter_chunks(path, read_size=1 << 16):
+        """
+        Yields the cells of the file at path, one list per piece of the file
+        (the file is read by pieces of read_size characters)
+        """
+        with open(path, 'r') as fd:
+            carry = ''
+            while (True):
+                data = fd.read(read_size)
+                if (not data):
+                    break
+                # The last cell of the piece may be cut: it goes with the next one
+                data = carry + data
+                end = 0
+                chunk = []
+                for match in GridFile.CELL.finditer(data):
+                    chunk.append((int(match.group(1)), int(match.group(2))))
+                    end = match.end()
+                carry = data[end:]
+                yield chunk
+            yield GridFile.parse(carry)
+
+    @staticmethod
+    def write(fd, cells):
+        """ Writes the cells into the opened text file fd """
+        for cell in cells:
+            fd.write(f'{cell[0]},{cell[1]}-')
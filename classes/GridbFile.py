@@ -0,0 +1,292 @@
+"""
+Python - Game of life with tkinter
+06/06/2020
+Madipoupou
+"""
+
+import itertools
+import mmap
+import struct
+from .PackedCells import PackedCells
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class GridbFile(object):
+    """
+    Reads and writes the .gridb binary format:
+    header: magic, version, encoding, xmin, ymin, width, height, cell count
+    body, depending on the encoding:
+    - DELTA: the cells sorted by key = (y - ymin) * width + (x - xmin), each
+      key stored as the LEB128 varint of its difference with the previous one
+    - BITPLANE: width * height bits, row after row (for dense patterns)
+    The reader memory-maps the file, NumPy decodes it in bulk when available
+    """
+    MAGIC = b'GRIDB'
+    VERSION = 1
+    DELTA = 0
+    BITPLANE = 1
+    HEADER = struct.Struct('<5sBBqqQQQ')
+    # Output buffer flushed to the file when it reaches this size
+    BUFFER_SIZE = 1 << 16
+
+    @staticmethod
+    def is_gridb(path):
+        """ True if the file at path starts with the .gridb magic """
+        with open(path, 'rb') as fd:
+            return fd.read(len(GridbFile.MAGIC)) == GridbFile.MAGIC
+
+    # --- Writing --- #
+
+    @staticmethod
+    def write(fd, cells):
+        """ Writes the cells into the file fd opened in binary mode """
+        if (np is not None and isinstance(cells, PackedCells)):
+            coords = np.stack(cells.arrays(), axis=1)
+        elif (np is not None):
+            coords = np.fromiter(
+                itertools.chain.from_iterable(cells), dtype=np.int64
+            ).reshape(-1, 2)
+        else:
+            coords = cells if (isinstance(cells, (set, frozenset, list))) else list(cells)
+        if (not len(coords)):
+            fd.write(GridbFile.HEADER.pack(GridbFile.MAGIC, GridbFile.VERSION, GridbFile.DELTA, 0, 0, 0, 0, 0))
+            return
+        if (np is not None):
+            xmin, ymin = (int(v) for v in coords.min(axis=0))
+            xmax, ymax = (int(v) for v in coords.max(axis=0))
+        else:
+            xmin = min(cell[0] for cell in coords)
+            ymin = min(cell[1] for cell in coords)
+            xmax = max(cell[0] for cell in coords)
+            ymax = max(cell[1] for cell in coords)
+        width = xmax - xmin + 1
+        height = ymax - ymin + 1
+        if (np is not None):
+            keys = np.unique((coords[:, 1] - ymin) * width + (coords[:, 0] - xmin))
+        else:
+            keys = sorted({(y - ymin) * width + (x - xmin) for (x, y) in coords})
+        # About 2 bytes per cell in delta, 1 bit per cell of the box in bitplane
+        encoding = GridbFile.BITPLANE if (width * height < 16 * len(keys)) else GridbFile.DELTA
+        fd.write(GridbFile.HEADER.pack(
+            GridbFile.MAGIC, GridbFile.VERSION, encoding,
+            xmin, ymin, width, height, len(keys)
+        ))
+        if (encoding == GridbFile.BITPLANE):
+            GridbFile.write_bitplane(fd, keys, width * height)
+        else:
+            GridbFile.write_deltas(fd, keys)
+
+    @staticmethod
+    def write_deltas(fd, keys):
+        """ Streams the varint deltas of the sorted keys into fd """
+        if (np is not None):
+            deltas = np.diff(keys, prepend=0).astype(np.uint64)
+            # Number of bytes of each varint, then each byte rank at once
+            sizes = np.ones(deltas.size, dtype=np.int64)
+            for rank in range(1, 10):
+                sizes += deltas >= (1 << (7 * rank))
+            offsets = np.cumsum(sizes) - sizes
+            out = np.empty(int(sizes.sum()), dtype=np.uint8)
+            for rank in range(int(sizes.max())):
+                mask = sizes > rank
+                byte = (deltas[mask] >> np.uint64(7 * rank)) & np.uint64(0x7f)
+                byte |= np.where(sizes[mask] > rank + 1, 0x80, 0).astype(np.uint64)
+                out[offsets[mask] + rank] = byte
+            for start in range(0, out.size, GridbFile.BUFFER_SIZE):
+                fd.write(out[start:start + GridbFile.BUFFER_SIZE].tobytes())
+            return
+        buf = bytearray()
+        previous = 0
+        for key in keys:
+            delta = key - previous
+            previous = key
+            while (delta >= 0x80):
+                buf.append((delta & 0x7f) | 0x80)
+                delta >>= 7
+            buf.append(delta)
+            if (len(buf) >= GridbFile.BUFFER_SIZE):
+                fd.write(buf)
+                buf.clear()
+        fd.write(buf)
+
+    @staticmethod
+    def write_bitplane(fd, keys, size):
+        """ Writes the bits of the sorted keys (bit i of byte k is key 8k+i) """
+        if (np is not None):
+            bits = np.zeros(size, dtype=np.uint8)
+            bits[keys] = 1
+            fd.write(np.packbits(bits, bitorder='little').tobytes())
+            return
+        # Without numpy: one output chunk at a time
+        chunk_bits = GridbFile.BUFFER_SIZE * 8
+        i = 0
+        for start in range(0, size, chunk_bits):
+            end = min(start + chunk_bits, size)
+            buf = bytearray((end - start + 7) // 8)
+            while (i < len(keys) and keys[i] < end):
+                offset = keys[i] - start
+                buf[offset >> 3] |= 1 << (offset & 7)
+                i += 1
+            fd.write(buf)
+
+    # --- Reading --- #
+
+    @staticmethod
+    def read(path):
+        """
+        Returns the list of cells saved in the .gridb file at path
+        Raises OSError if the file can't be read, ValueError if it is not valid
+        """
+        cells = []
+        for chunk in GridbFile.iter_chunks(path):
+            cells.extend(chunk)
+        if (not cells):
+            raise ValueError(f'{path} is not well formatted')
+        return cells
+
+    @staticmethod
+    def read_packed(path):
+        """
+        Returns the cells saved in the .gridb file at path as PackedCells,
+        decoded in bulk without any tuple with NumPy
+        Raises OSError if the file can't be read, ValueError if it is not valid
+        """
+        if (np is None):
+            return PackedCells(GridbFile.read(path))
+        with open(path, 'rb') as fd:
+            try:
+                mm = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError(f'{path} is empty')
+            try:
+                header = GridbFile.decode_header(mm)
+                magic, version, encoding, xmin, ymin, width, height, count = header
+                chunks = list(GridbFile.decode_keys(mm, header, 1 << 20))
+                keys = np.concatenate(chunks).astype(np.int64) if (chunks) else np.zeros(0, np.int64)
+            finally:
+                try:
+                    mm.close()
+                except BufferError:
+                    pass
+        if (not keys.size):
+            raise ValueError(f'{path} is not well formatted')
+        return PackedCells.from_arrays(keys % width + xmin, keys // width + ymin)
+
+    @staticmethod
+    def iter_chunks(path, chunk_size=1 << 20):
+        """
+        Yields the cells of the .gridb file at path as lists of (x, y)
+        (one list with NumPy, lists of about chunk_size cells without it)
+        """
+        with open(path, 'rb') as fd:
+            try:
+                mm = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError(f'{path} is empty')
+            try:
+                yield from GridbFile.decode(mm, chunk_size)
+            finally:
+                try:
+                    mm.close()
+                except BufferError:
+                    # A NumPy view is still alive (in a traceback), the map
+                    # is closed when it goes away
+                    pass
+
+    @staticmethod
+    def decode_header(mm):
+        """ Returns the checked header fields of the mapped file mm """
+        if (len(mm) < GridbFile.HEADER.size):
+            raise ValueError('Truncated .gridb header')
+        header = GridbFile.HEADER.unpack_from(mm, 0)
+        if (header[0] != GridbFile.MAGIC or header[1] != GridbFile.VERSION):
+            raise ValueError('Not a .gridb file')
+        return header
+
+    @staticmethod
+    def decode_keys(mm, header, chunk_size):
+        """ Yields the chunks of keys of the mapped file mm with the given header """
+        header_size = GridbFile.HEADER.size
+        magic, version, encoding, xmin, ymin, width, height, count = header
+        if (not count):
+            return
+        if (encoding == GridbFile.BITPLANE):
+            if (len(mm) < header_size + (width * height + 7) // 8):
+                raise ValueError('Truncated .gridb bitplane')
+            yield from GridbFile.bitplane_keys(mm, header_size, width * height, chunk_size)
+        elif (encoding == GridbFile.DELTA):
+            yield from GridbFile.delta_keys(mm, header_size, chunk_size)
+        else:
+            raise ValueError(f'Unknown .gridb encoding {encoding}')
+
+    @staticmethod
+    def decode(mm, chunk_size):
+        """ Decodes the mapped file mm, see iter_chunks """
+        header = GridbFile.decode_header(mm)
+        magic, version, encoding, xmin, ymin, width, height, count = header
+        for chunk in GridbFile.decode_keys(mm, header, chunk_size):
+            if (np is not None):
+                yield list(zip(
+                    (chunk % width + xmin).tolist(), (chunk // width + ymin).tolist()
+                ))
+            else:
+                yield [(key % width + xmin, key // width + ymin) for key in chunk]
+
+    @staticmethod
+    def bitplane_keys(mm, offset, size, chunk_size):
+        """ Yields the keys of the set bits of the bitplane """
+        if (np is not None):
+            data = np.frombuffer(mm, dtype=np.uint8, count=(size + 7) // 8, offset=offset)
+            yield np.flatnonzero(np.unpackbits(data, count=size, bitorder='little'))
+            return
+        keys = []
+        for i in range(offset, offset + (size + 7) // 8):
+            byte = mm[i]
+            if (not byte):
+                continue
+            base = (i - offset) << 3
+            for bit in range(8):
+                if (byte >> bit & 1):
+                    keys.append(base + bit)
+            if (len(keys) >= chunk_size):
+                yield keys
+                keys = []
+        yield keys
+
+    @staticmethod
+    def delta_keys(mm, offset, chunk_size):
+        """ Yields the keys decoded from the varint deltas """
+        if (np is not None):
+            data = np.frombuffer(mm, dtype=np.uint8, offset=offset)
+            if (not data.size or data[-1] & 0x80):
+                raise ValueError('Truncated .gridb deltas')
+            ends = np.flatnonzero(data < 0x80)
+            starts = np.concatenate(([0], ends[:-1] + 1))
+            # Position of each byte inside its varint
+            pos = np.arange(data.size) - np.repeat(starts, ends - starts + 1)
+            values = (data & 0x7f).astype(np.uint64) << (7 * pos).astype(np.uint64)
+            yield np.cumsum(np.add.reduceat(values, starts)).astype(np.int64)
+            return
+        keys = []
+        key = 0
+        delta = 0
+        shift = 0
+        for i in range(offset, len(mm)):
+            byte = mm[i]
+            delta |= (byte & 0x7f) << shift
+            if (byte & 0x80):
+                shift += 7
+                continue
+            key += delta
+            keys.append(key)
+            delta = 0
+            shift = 0
+            if (len(keys) >= chunk_size):
+                yield keys
+                keys = []
+        if (shift):
+            raise ValueError('Truncated .gridb deltas')
+        yield keys
@@ -0,0 +1,361 @@
+"""
+Python - Game of life with tkinter
+06/06/2020
+Madipoupou
+"""
+
+from .Engine import Engine
+
+class Node(object):
+    """
+    Quadtree node of size 2^k x 2^k, nodes are hash-consed by HashLife so
+    two identical squares are always the same object
+    a b
+    c d   (x grows to the right, y grows downwards inside the node)
+    """
+    __slots__ = ('k', 'a', 'b', 'c', 'd', 'n')
+
+    def __init__(self, k, a, b, c, d, n):
+        """ Node constructor, n is the population of the square """
+        self.k = k
+        self.a = a
+        self.b = b
+        self.c = c
+        self.d = d
+        self.n = n
+
+# The two level 0 nodes (a single cell)
+OFF = Node(0, None, None, None, None, 0)
+ON = Node(0, None, None, None, None, 1)
+
+class HashLife(Engine):
+    """
+    HashLife engine: the universe is a hash-consed quadtree and the result of
+    every node (its centre advanced 2^j generations) is memoized, so
+    regular patterns can jump billions of generations at once
+    The node table is bounded: past max_nodes it is garbage collected
+    Runs the 2 states rules of radius 1 (the 4x4 base case looks the 3x3
+    neighbourhoods up in the rule mask table)
+    """
+    name = 'hashlife'
+
+    def __init__(self, cells=(), rule=None, topology=None, max_nodes=1 << 20):
+        """ HashLife constructor """
+        self.max_nodes = max_nodes
+        self.nodes = {}
+        self.memo = {}
+        self.zeros = [OFF]
+        self.generation = 0
+        Engine.__init__(self, cells, rule, topology)
+
+    def check_topology(self, topology):
+        """ Raises ValueError for the finite universes (the quadtree is unbounded) """
+        if (topology.finite):
+            raise ValueError('HashLife only runs on the unbounded plane')
+
+    def check_rule(self, rule):
+        """ Raises ValueError if the rule isn't a 2 states, radius 1 rule """
+        if (rule.mask_table is None):
+            raise ValueError(f'HashLife can\'t run the rule {rule}')
+
+    def set_rule(self, rule):
+        """ Changes the rule, the memoized results are forgotten """
+        Engine.set_rule(self, rule)
+        self.memo.clear()
+
+    # --- Node construction --- #
+
+    def join(self, a, b, c, d):
+        """ Returns the unique node made of the 4 given children """
+        key = (a, b, c, d)
+        node = self.nodes.get(key)
+        if (node is None):
+            node = Node(a.k + 1, a, b, c, d, a.n + b.n + c.n + d.n)
+            self.nodes[key] = node
+        return node
+
+    def zero(self, k):
+        """ Returns the empty node of level k """
+        while (len(self.zeros) <= k):
+            z = self.zeros[-1]
+            self.zeros.append(self.join(z, z, z, z))
+        return self.zeros[k]
+
+    def centre(self, m):
+        """ Returns a node of level k+1 with m in its centre """
+        z = self.zero(m.k - 1)
+        return self.join(
+            self.join(z, z, z, m.a), self.join(z, z, m.b, z),
+            self.join(z, m.c, z, z), self.join(m.d, z, z, z)
+        )
+
+    def inner(self, m):
+        """ Returns the centre node of level k-1 of m """
+        return self.join(m.a.d, m.b.c, m.c.b, m.d.a)
+
+    # --- Loading / exporting cells --- #
+
+    def load(self, cells):
+        """ Builds the quadtree from the given (x, y) cells """
+        cells = set(cells)
+        self.generation = 0
+        self.last_step = None
+        if (not cells):
+            self.origin = (0, 0)
+            self.root = self.zero(3)
+            return
+        xmin = min(cell[0] for cell in cells)
+        ymin = min(cell[1] for cell in cells)
+        pattern = {(x - xmin, y - ymin): ON for (x, y) in cells}
+        # Pairing the nodes level by level until only one is left
+        k = 0
+        while (len(pattern) != 1 or k < 3):
+            z = self.zero(k)
+            next_level = {}
+            while (pattern):
+                x, y = next(iter(pattern))
+                x, y = x - (x & 1), y - (y & 1)
+                a = pattern.pop((x, y), z)
+                b = pattern.pop((x + 1, y), z)
+                c = pattern.pop((x, y + 1), z)
+                d = pattern.pop((x + 1, y + 1), z)
+                next_level[(x >> 1, y >> 1)] = self.join(a, b, c, d)
+            pattern = next_level
+            k += 1
+        self.origin = (xmin, ymin)
+        self.root = pattern.popitem()[1]
+
+    def get_cells(self):
+        """ Returns the alive cells as a set of (x, y) tuples """
+        cells = set()
+        stack = [(self.root, self.origin[0], self.origin[1])]
+        while (stack):
+            node, x, y = stack.pop()
+            if (node.n == 0):
+                continue
+            if (node.k == 0):
+                cells.add((x, y))
+                continue
+            half = 1 << (node.k - 1)
+            stack.append((node.a, x, y))
+            stack.append((node.b, x + half, y))
+            stack.append((node.c, x, y + half))
+            stack.append((node.d, x + half, y + half))
+        return cells
+
+    def toggle_all(self, cells):
+        """
+        Toggles each of the given (distinct) cells: the quadtree is built
+        again once for the whole batch
+        """
+        self.load(self.get_cells() ^ set(cells))
+
+    def population(self):
+        """ Returns the number of alive cells """
+        return self.root.n
+
+    def bounding_box(self):
+        """
+        Returns (xmin, ymin, xmax, ymax) of the alive cells, None if empty
+        Found in the quadtree, without listing the cells
+        """
+        if (self.root.n == 0):
+            return None
+        xmin, xmax = self.extent(self.root, True, {})
+        ymin, ymax = self.extent(self.root, False, {})
+        return (self.origin[0] + xmin, self.origin[1] + ymin,
+                self.origin[0] + xmax, self.origin[1] + ymax)
+
+    def extent(self, node, horizontal, memo):
+        """
+        Returns the (lowest, highest) x (horizontal) or y of the alive cells of
+        the non empty node, relative to its corner (memo is shared by the calls)
+        """
+        if (node.k == 0):
+            return (0, 0)
+        res = memo.get(node)
+        if (res is not None):
+            return res
+        half = 1 << (node.k - 1)
+        if (horizontal):
+            parts = ((node.a, 0), (node.c, 0), (node.b, half), (node.d, half))
+        else:
+            parts = ((node.a, 0), (node.b, 0), (node.c, half), (node.d, half))
+        low, high = None, None
+        for (child, offset) in parts:
+            if (child.n):
+                child_low, child_high = self.extent(child, horizontal, memo)
+                if (low is None or child_low + offset < low):
+                    low = child_low + offset
+                if (high is None or child_high + offset > high):
+                    high = child_high + offset
+        res = memo[node] = (low, high)
+        return res
+
+    # --- Evolution --- #
+
+    def life_4x4(self, m):
+        """ Base case: the 2x2 centre of a 4x4 node after one generation """
+        grid = [[0] * 4 for _ in range(4)]
+        for (quad, qx, qy) in ((m.a, 0, 0), (m.b, 2, 0), (m.c, 0, 2), (m.d, 2, 2)):
+            grid[qy][qx] = quad.a.n
+            grid[qy][qx + 1] = quad.b.n
+            grid[qy + 1][qx] = quad.c.n
+            grid[qy + 1][qx + 1] = quad.d.n
+        table = self.rule.mask_table
+        res = []
+        for (x, y) in ((1, 1), (2, 1), (1, 2), (2, 2)):
+            # 3x3 neighbourhood as a 9 bits mask, the cell itself is bit 4
+            mask = (
+                grid[y - 1][x - 1] << 8 | grid[y - 1][x] << 7 | grid[y - 1][x + 1] << 6
+                | grid[y][x - 1] << 5 | grid[y][x] << 4 | grid[y][x + 1] << 3
+                | grid[y + 1][x - 1] << 2 | grid[y + 1][x] << 1 | grid[y + 1][x + 1]
+            )
+            res.append(ON if (table[mask]) else OFF)
+        return self.join(*res)
+
+    def successor(self, m, j):
+        """
+        Returns the centre of m (level k-1) advanced 2^j generations
+        j is capped to k-2, the most a level k node can compute
+        """
+        if (m.n == 0):
+            return m.a
+        j = min(j, m.k - 2)
+        key = (m, j)
+        res = self.memo.get(key)
+        if (res is not None):
+            return res
+        if (m.k == 2):
+            res = self.life_4x4(m)
+        else:
+            join = self.join
+            c1 = self.successor(m.a, j)
+            c2 = self.successor(join(m.a.b, m.b.a, m.a.d, m.b.c), j)
+            c3 = self.successor(m.b, j)
+            c4 = self.successor(join(m.a.c, m.a.d, m.c.a, m.c.b), j)
+            c5 = self.successor(join(m.a.d, m.b.c, m.c.b, m.d.a), j)
+            c6 = self.successor(join(m.b.c, m.b.d, m.d.a, m.d.b), j)
+            c7 = self.successor(m.c, j)
+            c8 = self.successor(join(m.c.b, m.d.a, m.c.d, m.d.c), j)
+            c9 = self.successor(m.d, j)
+            if (j < m.k - 2):
+                # Half speed: the 9 results are already 2^j generations ahead
+                res = join(
+                    join(c1.d, c2.c, c4.b, c5.a),
+                    join(c2.d, c3.c, c5.b, c6.a),
+                    join(c4.d, c5.c, c7.b, c8.a),
+                    join(c5.d, c6.c, c8.b, c9.a)
+                )
+            else:
+                # Full speed: a second round of successors
+                res = join(
+                    self.successor(join(c1, c2, c4, c5), j),
+                    self.successor(join(c2, c3, c5, c6), j),
+                    self.successor(join(c4, c5, c7, c8), j),
+                    self.successor(join(c5, c6, c8, c9), j)
+                )
+        self.memo[key] = res
+        return res
+
+    def step_pow2(self, j):
+        """ Advances the universe 2^j generations in one jump """
+        root = self.root
+        ox, oy = self.origin
+        # The pattern must stay in the inner half and the root must be big
+        # enough to compute 2^j generations, one more level leaves the room
+        # for the pattern to grow during the jump
+        while (root.k < j + 2 or self.inner(root).n != root.n):
+            half = 1 << (root.k - 1)
+            ox, oy = ox - half, oy - half
+            root = self.centre(root)
+        half = 1 << (root.k - 1)
+        ox, oy = ox - half, oy - half
+        root = self.centre(root)
+        # The result is the centre of the root: a quarter of its size away
+        quarter = 1 << (root.k - 2)
+        before = self.inner(root) if (j == 0) else None
+        root = self.successor(root, j)
+        ox, oy = ox + quarter, oy + quarter
+        # One generation: the inner square of the root before, at the same
+        # place as the result, gives the changes
+        self.last_step = (before, root, (ox, oy), None) if (j == 0) else None
+        # Cropping the empty border so the tree stays small
+        while (root.k > 3 and self.inner(root).n == root.n):
+            quarter = 1 << (root.k - 2)
+            ox, oy = ox + quarter, oy + quarter
+            root = self.inner(root)
+        self.root = root
+        self.origin = (ox, oy)
+        self.generation += 1 << j
+        if (len(self.nodes) > self.max_nodes):
+            self.collect()
+
+    def advance(self, n):
+        """ Advances the universe n generations, by jumps of 2^j generations """
+        j = 0
+        while (n > 0):
+            if (n & 1):
+                self.step_pow2(j)
+            n >>= 1
+            j += 1
+
+    def step(self):
+        """ Computes the next generation """
+        self.step_pow2(0)
+
+    def jumps(self):
+        """ advance(n) takes about log2(n) jumps """
+        return True
+
+    def changes(self):
+        """
+        Returns the (born, dead) cells of the last step (if it was a single
+        generation), found by comparing the quadtrees before and after it:
+        identical squares are the same node, they are skipped at once
+        """
+        if (self.last_step is None):
+            return None
+        before, after, origin, delta = self.last_step
+        if (delta is not None):
+            return delta
+        born, dead = set(), set()
+        stack = [(before, after, origin[0], origin[1])]
+        while (stack):
+            old, new, x, y = stack.pop()
+            if (old is new):
+                continue
+            if (old.k == 0):
+                (born if (new.n) else dead).add((x, y))
+                continue
+            half = 1 << (old.k - 1)
+            stack.append((old.a, new.a, x, y))
+            stack.append((old.b, new.b, x + half, y))
+            stack.append((old.c, new.c, x, y + half))
+            stack.append((old.d, new.d, x + half, y + half))
+        delta = (born, dead)
+        self.last_step = (None, None, origin, delta)
+        return delta
+
+    def tracks_changes(self):
+        """ Each single generation step keeps the quadtrees to compare """
+        return True
+
+    def collect(self):
+        """
+        Garbage collection: forgets the memoized results and keeps only the
+        nodes reachable from the root (and the empty nodes)
+        """
+        self.memo.clear()
+        nodes = {}
+        stack = [self.root] + self.zeros
+        while (stack):
+            node = stack.pop()
+            if (node.k == 0):
+                continue
+            key = (node.a, node.b, node.c, node.d)
+            if (key in nodes):
+                continue
+            nodes[key] = node
+            stack.extend(key)
+        self.nodes = nodes
@@ -0,0 +1,245 @@
+"""
+Python - Game of life with tkinter
+06/06/2020
+Madipoupou
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+from .CellGrid import CellGrid
+from .CycleDetector import CycleDetector
+from .PatternFile import PatternFile
+from .Rule import Rule
+from .Topology import Topology
+from .SparseEngine import SparseEngine
+from .DenseEngine import DenseEngine
+from .AdaptiveEngine import AdaptiveEngine
+from .HashLife import HashLife
+from .TileEngine import TileEngine
+from .ParallelEngine import ParallelEngine
+
+# Engines which can be chosen from the command line
+ENGINES = {
+    'sparse': SparseEngine,
+    'dense': DenseEngine,
+    'adaptive': AdaptiveEngine,
+    'hashlife': HashLife,
+    'tile': TileEngine,
+    'parallel': ParallelEngine,
+}
+
+def run_task(task):
+    """ Pool entry point: runs one HeadlessRunner task, see HeadlessRunner.run_file """
+    return HeadlessRunner.run_file(*task)
+
+class HeadlessRunner(object):
+    """
+    Runs simulations without any Tk window
+    Loads .grid files, runs N generations on a CellGrid and reports the final
+    state and per-generation statistics, several files run in a process pool
+    Once the pattern cycles the remaining generations are looked up, an
+    engine which jumps over the generations (HashLife) goes straight to the last
+    """
+    @staticmethod
+    def run_file(path, generations, engine_name='adaptive', output_dir=None, output_format='grid',
+                 rule='B3/S23', topology='plane', output_name=None, expand_cycle=False):
+        """
+        Runs generations cycles on the pattern saved at path with the rule,
+        in the universe described by topology
+        Returns a dict with the statistics of every generation computed: up
+        to the cycle found (then the statistics of each of its phases, or of
+        every generation if expand_cycle), only the last one when the engine
+        jumps over them (HashLife)
+        The final state is saved into output_dir if given, as
+        output_name.output_format (the name of the file by default)
+        """
+        result = {
+            'file': path, 'engine': engine_name, 'rule': rule, 'topology': topology,
+            'generations': [],
+        }
+        try:
+            cells = PatternFile.read_packed(path)
+            engine = ENGINES[engine_name](rule=Rule.parse(rule), topology=Topology.parse(topology))
+        except (OSError, UnicodeDecodeError, ValueError, OverflowError) as err:
+            result['error'] = str(err)
+            return result
+        grid = CellGrid(cells, engine=engine)
+        start = time.perf_counter()
+        if (engine.jumps()):
+            grid.advance(generations)
+            result['generations'].append({
+                'cycle': grid.cycle_num,
+                'population': engine.population(),
+                'bounding_box': engine.bounding_box(),
+                'time': time.perf_counter() - start,
+            })
+        while (grid.cycle_num < generations and not grid.cycle_known()):
+            gen_start = time.perf_counter()
+            grid.activate_cycle()
+            gen_time = time.perf_counter() - gen_start
+            result['generations'].append({
+                'cycle': grid.cycle_num,
+                'population': grid.engine.population(),
+                'bounding_box': grid.engine.bounding_box(),
+                'time': gen_time,
+            })
+        if (grid.cycle_known()):
+            detector = grid.detector
+            result['cycle'] = {
+                'kind': detector.describe(),
+                'start': detector.start,
+                'period': detector.period,
+                'displacement': detector.displacement,
+                'phases': HeadlessRunner.cycle_phases(grid),
+            }
+            if (expand_cycle):
+                HeadlessRunner.add_cycle_statistics(grid, generations, result['generations'])
+            grid.advance(generations - grid.cycle_num)
+        result['total_time'] = time.perf_counter() - start
+        result['population'] = grid.engine.population()
+        result['bounding_box'] = grid.engine.bounding_box()
+        if (output_dir):
+            name = output_name or os.path.splitext(os.path.basename(path))[0]
+            result['output'] = os.path.join(output_dir, f'{name}.{output_format}')
+            grid.save_file(result['output'])
+        grid.engine.close()
+        return result
+
+    @staticmethod
+    def cycle_phases(grid):
+        """
+        Returns the statistics of the generations of the first period of the
+        cycle found by grid: the others are the same, moved by the
+        displacement of each period
+        """
+        start = grid.detector.start
+        return [
+            {
+                'cycle': start + phase,
+                'population': len(cells),
+                'bounding_box': CycleDetector.bounding_box(cells),
+            }
+            for phase, cells in enumerate(grid.cycle_states)
+        ]
+
+    @staticmethod
+    def add_cycle_statistics(grid, generations, statistics):
+        """
+        Adds the statistics of the generations up to generations to the list
+        statistics, looked up in the cycle found by grid instead of computed
+        """
+        phases = [
+            (len(cells), CycleDetector.bounding_box(cells)) for cells in grid.cycle_states
+        ]
+        for cycle in range(grid.cycle_num + 1, generations + 1):
+            base, (dx, dy) = grid.detector.locate(cycle)
+            population, bbox = phases[base - grid.detector.start]
+            if (bbox is not None):
+                bbox = (bbox[0] + dx, bbox[1] + dy, bbox[2] + dx, bbox[3] + dy)
+            statistics.append({
+                'cycle': cycle,
+                'population': population,
+                'bounding_box': bbox,
+                'time': 0,
+            })
+
+    @staticmethod
+    def expand_paths(paths):
+        """
+        Replaces each directory of paths by the pattern files it contains
+        (known extensions, hidden files skipped)
+        """
+        files = []
+        for path in paths:
+            if (os.path.isdir(path)):
+                for name in sorted(os.listdir(path)):
+                    if (PatternFile.is_pattern_name(name) and os.path.isfile(os.path.join(path, name))):
+                        files.append(os.path.join(path, name))
+            else:
+                files.append(path)
+        return files
+
+    @staticmethod
+    def output_names(paths):
+        """
+        Returns the (path, output name) of the files: the file name without
+        extension, numbered when several files have the same one
+        """
+        used = set()
+        res = []
+        for path in paths:
+            base = name = os.path.splitext(os.path.basename(path))[0]
+            number = 1
+            while (name in used):
+                number += 1
+                name = f'{base}-{number}'
+            used.add(name)
+            res.append((path, name))
+        return res
+
+    @staticmethod
+    def run(paths, generations, engine_name='adaptive', output_dir=None, jobs=None,
+            output_format='grid', rule='B3/S23', topology='plane', expand_cycle=False):
+        """ Runs every file of paths, in parallel when there are several """
+        tasks = [
+            (path, generations, engine_name, output_dir, output_format, rule, topology, name,
+             expand_cycle)
+            for path, name in HeadlessRunner.output_names(HeadlessRunner.expand_paths(paths))
+        ]
+        jobs = min(jobs or os.cpu_count() or 1, len(tasks))
+        if (engine_name == 'parallel'):
+            # The engine already uses all the cores (and pool processes
+            # can't start their own workers)
+            jobs = 1
+        if (jobs <= 1):
+            return [run_task(task) for task in tasks]
+        with Pool(jobs) as pool:
+            return pool.map(run_task, tasks)
+
+    @staticmethod
+    def main(argv=None):
+        """ Command line entry point, returns the exit status """
+        parser = argparse.ArgumentParser(
+            description='Runs Game of life patterns without GUI'
+        )
+        parser.add_argument('files', nargs='+', help='pattern files or directories')
+        parser.add_argument('-n', '--generations', type=int, default=100)
+        parser.add_argument('-e', '--engine', choices=sorted(ENGINES), default='adaptive')
+        parser.add_argument('-j', '--jobs', type=int, default=None,
+                            help='number of processes (default: all the cores)')
+        parser.add_argument('-o', '--output-dir', default=None,
+                            help='directory where the final states are saved')
+        parser.add_argument('-f', '--format', choices=['grid', 'gridb', 'rle', 'lif', 'cells'], default='grid',
+                            help='format of the saved final states')
+        parser.add_argument('-s', '--stats', default=None,
+                            help='JSON statistics file (default: stdout)')
+        parser.add_argument('-r', '--rule', default='B3/S23',
+                            help='rule: B36/S23, 345/2/4 (Generations), R5,C0,M1,S34..58,B34..45,NM...')
+        parser.add_argument('-T', '--topology', default='plane',
+                            help='universe: plane, torus:200x100, klein:64x64, bounded:500x300')
+        parser.add_argument('--expand-cycle', action='store_true',
+                            help='statistics of every generation after the cycle found (one per '
+                                 'generation, looked up), not only of its phases')
+        args = parser.parse_args(argv)
+        try:
+            Rule.parse(args.rule)
+            Topology.parse(args.topology)
+        except ValueError as err:
+            parser.error(str(err))
+        if (args.output_dir):
+            os.makedirs(args.output_dir, exist_ok=True)
+        results = HeadlessRunner.run(
+            args.files, args.generations, args.engine, args.output_dir, args.jobs,
+            args.format, args.rule, args.topology, args.expand_cycle
+        )
+        if (args.stats):
+            with open(args.stats, 'w') as fd:
+                json.dump(results, fd, indent=1)
+        else:
+            json.dump(results, sys.stdout, indent=1)
+            sys.stdout.write('\n')
+        return 1 if (any('error' in res for res in results)) else 0
@@ -0,0 +1,148 @@
+"""
+Python - Game of life with tkinter
+06/06/2020
+Madipoupou
+"""
+
+from collections import deque
+from .PackedCells import PackedCells
+
+class History(object):
+    """
+    Bounded history of the generations, stored as segments: a full keyframe
+    followed by the births/deaths of the next generations
+    When the memory budget is exceeded the oldest segments are dropped
+    A generation is restored from the keyframe before it plus its deltas
+    The keyframes are packed (8 bytes per cell), so are the deltas of more
+    than PACK_CELLS cells, the smaller ones are kept as tuples
+    A new keyframe is only taken once the deltas of the segment hold as many
+    cells as its keyframe: restoring a generation then costs at most twice
+    its keyframe, and a mostly still pattern takes few keyframes
+    """
+    # Rough memory cost of a cell stored in a tuple delta (bytes)
+    CELL_BYTES = 80
+    # Cells from which the born or dead cells of a delta are packed
+    PACK_CELLS = 256
+    # Cells of delta allowed in a segment whatever the size of its keyframe
+    MIN_SEGMENT_CELLS = 1024
+
+    def __init__(self, memory_budget=64 * 1024 * 1024):
+        """ History constructor """
+        self.memory_budget = memory_budget
+        self.restart(0, ())
+
+    def restart(self, generation, cells):
+        """
+        Forgets everything, generation becomes the first known one
+        cells can be given packed (PackedCells are not copied)
+        """
+        # Each segment: [first generation, keyframe cells, [(born, dead), ...],
+        # number of cells in the deltas, memory of the deltas]
+        self.segments = deque()
+        self.memory = 0
+        self.add_keyframe(generation, cells)
+
+    def add_keyframe(self, generation, cells):
+        """ Starts a new segment with the full cells of generation """
+        keyframe = PackedCells(cells)
+        self.segments.append([generation, keyframe, [], 0, 0])
+        self.memory += keyframe.nbytes
+        self.evict()
+
+    def first_generation(self):
+        """ Oldest generation which can be restored """
+        return self.segments[0][0]
+
+    def last_generation(self):
+        """ Newest generation which can be restored """
+        return self.segments[-1][0] + len(self.segments[-1][2])
+
+    def record(self, generation, delta, state):
+        """
+        Registers generation (the one after the last) by delta, its (born,
+        dead) cells from the previous generation (None if unknown)
+        state is called for the full cells of generation (PackedCells
+        preferably) only when a keyframe is needed
+        Generations already known (after a seek) are kept as they are
+        """
+        if (generation <= self.last_generation()):
+            return
+        if (generation != self.last_generation() + 1):
+            self.restart(generation, state())
+            return
+        segment = self.segments[-1]
+        if (delta is None):
+            self.add_keyframe(generation, state())
+            return
+        # A delta costs about one cell even when nothing changed
+        size = len(delta[0]) + len(delta[1]) + 1
+        if (segment[3] + size > max(len(segment[1]), self.MIN_SEGMENT_CELLS)):
+            self.add_keyframe(generation, state())
+            return
+        delta = (self.stored(delta[0]), self.stored(delta[1]))
+        memory = self.delta_memory(delta)
+        segment[2].append(delta)
+        segment[3] += size
+        segment[4] += memory
+        self.memory += memory
+        self.evict()
+
+    def stored(self, cells):
+        """ Returns the form in which the cells of a delta are kept """
+        if (isinstance(cells, PackedCells) or len(cells) > self.PACK_CELLS):
+            return PackedCells(cells)
+        return tuple(cells)
+
+    def delta_memory(self, delta):
+        """ Estimated memory of a stored delta (a delta costs at least one cell) """
+        memory = self.CELL_BYTES
+        for cells in delta:
+            if (isinstance(cells, PackedCells)):
+                memory += cells.nbytes
+            else:
+                memory += len(cells) * self.CELL_BYTES
+        return memory
+
+    def truncate(self, generation, cells):
+        """
+        Forgets the generations from generation on and records cells as the new
+        state of generation (after an edit of the grid)
+        """
+        while (self.segments and self.segments[-1][0] >= generation):
+            self.memory -= self.segment_memory(self.segments.pop())
+        if (not self.segments):
+            self.restart(generation, cells)
+            return
+        segment = self.segments[-1]
+        first, keyframe, deltas = segment[:3]
+        while (first + len(deltas) >= generation):
+            delta = deltas.pop()
+            memory = self.delta_memory(delta)
+            segment[3] -= len(delta[0]) + len(delta[1]) + 1
+            segment[4] -= memory
+            self.memory -= memory
+        self.add_keyframe(generation, cells)
+
+    def segment_memory(self, segment):
+        """ Estimated memory of a segment """
+        return segment[1].nbytes + segment[4]
+
+    def evict(self):
+        """ Drops the oldest segments while over budget (the newest is kept) """
+        while (self.memory > self.memory_budget and len(self.segments) > 1):
+            self.memory -= self.segment_memory(self.segments.popleft())
+
+    def seek(self, generation):
+        """
+        Returns the set of cells of generation, None if it isn't in the history
+        """
+        if (not self.first_generation() <= generation <= self.last_generation()):
+            return None
+        for (first, keyframe, deltas, size, memory) in reversed(self.segments):
+            if (first <= generation):
+                break
+        cells = set(keyframe)
+        for (born, dead) in deltas[:generation - first]:
+            cells.difference_update(dead)
+            cells.update(born)
+        return cells
@@ -66,18 +66,120 @@ class Interface(tk.Tk):
         self.w_but_mode2.pack(padx=15, pady=10)
         return [self.w_frame, self.w_but_mode1, self.w_but_mode2]
     
-    def wip(self):
-        """ Just temporary function to display work in progress message """
-        self.wip_frame = tk.Frame(
-            self, bg='slate gray',
-            highlightbackground="black", highlightthickness=2
+    def library_menu(self, library, load_func, indexing=None):
+        """
+        Pattern library browser: the patterns of the index on the left, the
+        thumbnail and what is known of the selected one on the right
+        load_func is called with the path of the pattern to load
+        indexing returns True while the index is updated in the background:
+        the files not indexed yet are listed as pending (they can already be
+        loaded) and the list is refreshed once it returns False
+        """
+        win = tk.Toplevel(self)
+        win.geometry('600x420')
+        win.geometry('+100+100')
+        win.iconphoto(False, self.icon)
+        win.resizable(False, False)
+        win.title('PATTERN LIBRARY')
+        win.configure(bg='slate gray')
+        win.bind('<Escape>', lambda event: win.destroy())
+        names = []
+        pending = set()
+
+        list_frame = tk.Frame(win, bg='slate gray')
+        list_frame.grid(row=0, column=0, padx=10, pady=10, sticky='NS')
+        scrollbar = tk.Scrollbar(list_frame)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        listbox = tk.Listbox(
+            list_frame, width=28, height=20, yscrollcommand=scrollbar.set,
+            bg='dark slate gray', fg='white', selectbackground='midnight blue',
+            highlightthickness=0, exportselection=False
         )
-        self.wip_frame.place(relx=0.5, rely=0.5, anchor=tk.CENTER)
-        self.wip_label = tk.Label(
-            self.wip_frame, text="Work in progress...",
-            font=self.my_font, fg='white', bg='slate gray'
+        listbox.pack(side=tk.LEFT, fill=tk.BOTH)
+        scrollbar.configure(command=listbox.yview)
+
+        preview_frame = tk.Frame(win, bg='slate gray')
+        preview_frame.grid(row=0, column=1, padx=10, pady=10, sticky='N')
+        thumbnail_label = tk.Label(preview_frame, bg='white', width=160, height=160)
+        thumbnail_label.pack(padx=5, pady=5)
+        info_label = tk.Label(
+            preview_frame, justify=tk.LEFT, anchor='w', wraplength=300,
+            font=font.Font(family='courier', size=10), bg='slate gray', fg='white'
         )
-        self.wip_label.pack(padx=55, pady=20)
+        info_label.pack(padx=5, pady=5, fill=tk.X)
+
+        def selected():
+            """ Name of the selected pattern, None if there is none """
+            selection = listbox.curselection()
+            return names[selection[0]] if (selection) else None
+
+        def show(event=None):
+            """ Displays the thumbnail and the description of the selection """
+            name = selected()
+            if (name is None):
+                return
+            entry = library.entry(name)
+            if (name in pending or entry is None):
+                thumbnail_label.configure(image='')
+                thumbnail_label.image = None
+                info_label.configure(text=f'{name}\nIndexing...')
+                return
+            thumbnail = entry['thumbnail']
+            image = ''
+            if (thumbnail):
+                width, height = thumbnail['width'], thumbnail['height']
+                header = f'P5 {width} {height} 255\n'.encode()
+                image = tk.PhotoImage(
+                    width=width, height=height, format='PPM',
+                    data=header + library.thumbnail_pixels(thumbnail)
+                )
+                zoom = max(1, 160 // max(width, height))
+                if (zoom > 1):
+                    image = image.zoom(zoom)
+            thumbnail_label.configure(image=image)
+            # Tk forgets the image if no python reference is kept
+            thumbnail_label.image = image
+            info_label.configure(text=f'{name}\n{library.describe(name)}')
+
+        def load(event=None):
+            """ Loads the selected pattern into the grid, closes the browser """
+            name = selected()
+            if (name is not None):
+                win.destroy()
+                load_func(library.path(name))
+
+        def fill():
+            """ Lists the indexed patterns and the pending ones, keeps the selection """
+            name = selected()
+            pending.clear()
+            if (indexing is not None and indexing()):
+                pending.update(library.pending())
+            names[:] = sorted(set(library.names()) | pending)
+            listbox.delete(0, tk.END)
+            for other in names:
+                listbox.insert(tk.END, f'{other} (indexing)' if (other in pending) else other)
+            if (names):
+                listbox.selection_set(names.index(name) if (name in names) else 0)
+                show()
+
+        def poll():
+            """ Refreshes the list once the background indexing is over """
+            if (not win.winfo_exists()):
+                return
+            if (indexing()):
+                win.after(200, poll)
+            else:
+                fill()
+
+        listbox.bind('<<ListboxSelect>>', show)
+        listbox.bind('<Double-Button-1>', load)
+        listbox.bind('<Return>', load)
+        self.default_button(preview_frame, 'LOAD', load, width=20).pack(padx=5, pady=5)
+        fill()
+        if (indexing is not None and indexing()):
+            win.after(200, poll)
+        listbox.focus_set()
+        return win
     
     def main_win(self):
         """ Just a window to test my canvas and the functionalities """
@@ -101,28 +203,35 @@ class Interface(tk.Tk):
         self.start_button = self.default_button(
             self.right_frame, 'START', self.app.start_anim, width=60
         )
-        self.start_button.grid(row=0, padx=5, pady=10)
+        self.start_button.grid(row=0, padx=5, pady=5)
 
         # Adding create button
         self.create_button = self.default_button(
             self.right_frame, 'CREATE: OFF', self.app.create, width=60
         )
-        self.create_button.grid(row=1, padx=5, pady=10)
+        self.create_button.grid(row=1, padx=5, pady=5)
 
         # Adding save/reload buttons
         self.default_button(
-            self.right_frame, 'SAVE', self.app.grid.save_cells, width=60
-        ).grid(row=2, padx=5, pady=10)
+            self.right_frame, 'SAVE', self.app.save_cells, width=60
+        ).grid(row=2, padx=5, pady=5)
         self.default_button(
-            self.right_frame, 'LOAD', lambda: self.app.grid.load_cells(self.can) or self.cycle_label.configure(text=f'CYCLE: {self.app.grid.cycle_num}'), width=60
-        ).grid(row=3, padx=5, pady=10)
+            self.right_frame, 'LOAD', self.app.load_cells, width=60
+        ).grid(row=3, padx=5, pady=5)
+
+        # Adding background simulation button
+        self.thread_button = self.default_button(
+            self.right_frame, f'THREAD: {"ON" if (self.app.threaded) else "OFF"}',
+            self.app.switch_threaded, width=60
+        )
+        self.thread_button.grid(row=4, padx=5, pady=5)
 
         # Adding speed frame and buttons
         self.speed_frame = tk.Frame(
             self.right_frame, bg='dark slate gray',
             width=170, height=80,
         )
-        self.speed_frame.grid(row=4, padx=5, pady=10)
+        self.speed_frame.grid(row=5, padx=5, pady=5)
         self.speed_frame.grid_propagate(0)
         self.speed_frame.columnconfigure(0, weight=1)
         tk.Label(
@@ -141,12 +250,24 @@ class Interface(tk.Tk):
             self.right_frame, text='SPEED: 100%',
             bg='slate gray', fg='midnight blue', font=self.my_font
         )
-        self.speed_label.grid(row=5, padx=5, pady=(60, 5))
+        self.speed_label.grid(row=6, padx=5, pady=(20, 5))
         self.cycle_label = tk.Label(
             self.right_frame, text='CYCLE: 0',
             bg='slate gray', fg='midnight blue', font=self.my_font
         )
-        self.cycle_label.grid(row=6, padx=5, pady=5)
+        self.cycle_label.grid(row=7, padx=5, pady=5)
+
+        # Simulation and display rates (they differ in threaded mode)
+        self.gps_label = tk.Label(
+            self.right_frame, text='GEN/S: 0',
+            bg='slate gray', fg='midnight blue', font=self.my_font
+        )
+        self.gps_label.grid(row=8, padx=5, pady=5)
+        self.fps_label = tk.Label(
+            self.right_frame, text='FPS: 0',
+            bg='slate gray', fg='midnight blue', font=self.my_font
+        )
+        self.fps_label.grid(row=9, padx=5, pady=5)
 
         # Bottom panel
         self.bottom_frame = tk.Frame(self.container)
@@ -166,6 +287,18 @@ class Interface(tk.Tk):
         self.default_button(
             self.bottom_frame, 'EXIT', self.destroy, bg='gray23'
         ).grid(row=0, column=4, padx=5, pady=15)
+
+        # History slider: released on a generation, the grid goes back to it
+        # (not a command, set by the app at each generation)
+        self.history_scale = tk.Scale(
+            self.bottom_frame, label='HISTORY', from_=0, to=0,
+            orient=tk.HORIZONTAL, length=150, showvalue=False,
+            bg='slate gray', fg='white', highlightthickness=0
+        )
+        self.history_scale.grid(row=0, column=5, padx=5, pady=15)
+        self.history_scale.bind(
+            '<ButtonRelease-1>', lambda event: self.app.scrub(self.history_scale.get())
+        )
         return self.can
     
     def default_button(self, parent, text, command_func, bg='dark slate gray', width=15, height=2):
@@ -181,6 +314,18 @@ class Interface(tk.Tk):
             text=text, command=command_func
         ))
 
+    def show_profile(self, text):
+        """ Displays the profiling overlay at the bottom of the right panel """
+        self.profile_label = tk.Label(
+            self.right_frame, text=text, justify=tk.LEFT, anchor='w',
+            font=font.Font(family='courier', size=9), bg='gray23', fg='white'
+        )
+        self.profile_label.place(relx=0, rely=1, relwidth=1, anchor=tk.SW)
+
+    def hide_profile(self):
+        """ Removes the profiling overlay """
+        self.profile_label.destroy()
+
     def start_anim(self):
         """ Starts the animation """
         self.start_button.configure(
@@ -0,0 +1,50 @@
+"""
+Python - Game of life with tkinter
+06/06/2020
+Madipoupou
+"""
+
+class Life106File(object):
+    """
+    Reads and writes the Life 1.06 format: a '#Life 1.06' line then one
+    'x y' line per alive cell, y going downwards (so y is negated here)
+    """
+    MAGIC = '#Life 1.06'
+
+    @staticmethod
+    def read(path):
+        """
+        Returns the list of cells saved in the Life 1.06 file at path
+        Raises OSError if the file can't be read, ValueError if it has no cell
+        """
+        cells = []
+        for chunk in Life106File.iter_chunks(path):
+            cells.extend(chunk)
+        if (not cells):
+            raise ValueError(f'{path} is not well formatted')
+        return cells
+
+    @staticmethod
+    def iter_chunks(path, batch_size=1 << 16):
+        """ Yields the cells of the file at path by lists of about batch_size """
+        with open(path, 'r') as fd:
+            cells = []
+            for line in fd:
+                if (line.startswith('#') or not line.strip()):
+                    continue
+                temp = line.split()
+                try:
+                    cells.append((int(temp[0]), -int(temp[1])))
+                except (ValueError, IndexError):
+                    raise ValueError(f'Bad Life 1.06 line: {line.strip()}')
+                if (len(cells) >= batch_size):
+                    yield cells
+                    cells = []
+            yield cells
+
+    @staticmethod
+    def write(fd, cells):
+        """ Writes the cells into the opened text file fd """
+        fd.write(Life106File.MAGIC + '\n')
+        for (x, y) in cells:
+            fd.write(f'{x} {-y}\n')
@@ -0,0 +1,55 @@
+"""
+Python - Game of life with tkinter
+06/06/2020
+Madipoupou
+"""
+
+class MockCanvas(object):
+    """
+    Stand-in for GridCanvas without any Tk window, for benchmarks
+    Offers what CellGrid uses to render and counts the item operations,
+    which are what costs time on a real canvas
+    """
+    BITMAP_CELL_SIZE = 3
+
+    def __init__(self, width=1000, height=600, cell_size=20):
+        """ MockCanvas constructor """
+        self.width = width
+        self.height = height
+        self.cell_size = cell_size
+        self.origin = (0, 0)
+        self.obj = None
+        self.items = 0
+        self.calls = 0
+        self.bitmap = None
+
+    def create_rectangle(self, *coords, **options):
+        """ Counts a new rectangle, returns its id """
+        self.calls += 1
+        self.items += 1
+        return self.items
+
+    def coords(self, item, *coords):
+        """ Counts a move of an item """
+        self.calls += 1
+
+    def itemconfigure(self, item, **options):
+        """ Counts a change of an item """
+        self.calls += 1
+
+    def delete(self, item):
+        """ Counts a deletion """
+        self.calls += 1
+
+    def bitmap_mode(self):
+        """ True if the cells are too small to be drawn as rectangles """
+        return self.cell_size <= self.BITMAP_CELL_SIZE
+
+    def draw_bitmap(self, data, width, height, zoom=1):
+        """ Keeps the size of the bitmap which would be displayed """
+        self.calls += 1
+        self.bitmap = (width * zoom, height * zoom)
+
+    def clear_bitmap(self):
+        """ Forgets the bitmap """
+        self.bitmap = None
@@ -0,0 +1,173 @@
+"""
+Python - Game of life with tkinter
+06/06/2020
+Madipoupou
+"""
+
+import bisect
+import itertools
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class PackedCells(object):
+    """
+    Compact immutable set of cells: each (x, y) is packed into the 64 bits
+    key (x << 32) + (y + 2^31), the keys are kept sorted (so ordered by x
+    then y) in a NumPy int64 buffer, an array('q') without NumPy
+    8 bytes per cell instead of 100+ for a set of tuples
+    It still looks like a set of (x, y) tuples to the existing callers:
+    iteration, len, in (binary search)
+    The coordinates must fit in 32 bits signed integers
+    Used for the stored states (saved grid, history, .gridb files) and the
+    changes of the dense engine, which steps on its own array
+    """
+    OFFSET = 1 << 31
+    LOW_MASK = (1 << 32) - 1
+    # Tuples made at once when iterating
+    CHUNK_SIZE = 1 << 16
+
+    def __init__(self, cells=()):
+        """
+        PackedCells constructor, cells is an iterable of (x, y) tuples
+        Raises OverflowError if a coordinate doesn't fit in 32 bits
+        """
+        if (isinstance(cells, PackedCells)):
+            self.keys = cells.keys
+            return
+        if (np is not None):
+            coords = np.fromiter(
+                itertools.chain.from_iterable(cells), dtype=np.int64
+            ).reshape(-1, 2)
+            self.keys = PackedCells.pack_arrays(coords[:, 0], coords[:, 1])
+        else:
+            self.keys = array('q', sorted({PackedCells.pack(x, y) for (x, y) in cells}))
+
+    @staticmethod
+    def pack(x, y):
+        """ Returns the key of the cell (x, y) """
+        if (not (-PackedCells.OFFSET <= x < PackedCells.OFFSET
+                 and -PackedCells.OFFSET <= y < PackedCells.OFFSET)):
+            raise OverflowError(f'Cell {(x, y)} out of the 32 bits coordinates')
+        return (x << 32) + y + PackedCells.OFFSET
+
+    @staticmethod
+    def unpack(key):
+        """ Returns the cell (x, y) of key """
+        return (key >> 32, (key & PackedCells.LOW_MASK) - PackedCells.OFFSET)
+
+    @staticmethod
+    def pack_arrays(xs, ys):
+        """ Returns the sorted unique keys of the cells given as NumPy coordinate arrays """
+        xs = np.asarray(xs, dtype=np.int64)
+        ys = np.asarray(ys, dtype=np.int64)
+        if (xs.size and (
+                xs.min() < -PackedCells.OFFSET or xs.max() >= PackedCells.OFFSET
+                or ys.min() < -PackedCells.OFFSET or ys.max() >= PackedCells.OFFSET)):
+            raise OverflowError('Cells out of the 32 bits coordinates')
+        return np.unique((xs << 32) + (ys + PackedCells.OFFSET))
+
+    @staticmethod
+    def unpack_arrays(keys):
+        """ Returns the (xs, ys) NumPy int64 arrays of the cells of the keys """
+        keys = np.asarray(keys, dtype=np.int64)
+        return keys >> 32, (keys & PackedCells.LOW_MASK) - PackedCells.OFFSET
+
+    @staticmethod
+    def from_keys(keys):
+        """ Returns the PackedCells of already sorted unique keys (not copied) """
+        packed = PackedCells.__new__(PackedCells)
+        packed.keys = keys
+        return packed
+
+    @staticmethod
+    def from_arrays(xs, ys):
+        """ Returns the PackedCells of the cells given as NumPy coordinate arrays """
+        return PackedCells.from_keys(PackedCells.pack_arrays(xs, ys))
+
+    @staticmethod
+    def from_sorted_arrays(xs, ys):
+        """
+        Returns the PackedCells of distinct cells given as NumPy coordinate
+        arrays already in key order (by x then y, like the np.nonzero of an
+        array indexed [x, y]): no sort needed
+        """
+        xs = np.asarray(xs, dtype=np.int64)
+        ys = np.asarray(ys, dtype=np.int64)
+        if (xs.size and (
+                xs[0] < -PackedCells.OFFSET or xs[-1] >= PackedCells.OFFSET
+                or ys.min() < -PackedCells.OFFSET or ys.max() >= PackedCells.OFFSET)):
+            raise OverflowError('Cells out of the 32 bits coordinates')
+        keys = xs << 32
+        keys += ys
+        keys += PackedCells.OFFSET
+        return PackedCells.from_keys(keys)
+
+    def arrays(self):
+        """ Returns the (xs, ys) NumPy int64 arrays of the cells, sorted by key """
+        return PackedCells.unpack_arrays(self.keys)
+
+    @property
+    def nbytes(self):
+        """ Memory used by the keys (bytes) """
+        return len(self.keys) * 8
+
+    def __len__(self):
+        """ Number of cells """
+        return len(self.keys)
+
+    def __bool__(self):
+        """ True if there is a cell """
+        return len(self.keys) > 0
+
+    def __iter__(self):
+        """ Yields the cells as (x, y) tuples, in key order """
+        unpack = PackedCells.unpack
+        for start in range(0, len(self.keys), self.CHUNK_SIZE):
+            chunk = self.keys[start:start + self.CHUNK_SIZE]
+            if (np is not None):
+                xs, ys = PackedCells.unpack_arrays(chunk)
+                yield from zip(xs.tolist(), ys.tolist())
+            else:
+                yield from (unpack(key) for key in chunk)
+
+    def __contains__(self, cell):
+        """ True if the (x, y) cell is in the set (binary search) """
+        try:
+            key = PackedCells.pack(*cell)
+        except OverflowError:
+            return False
+        if (np is not None):
+            i = int(np.searchsorted(self.keys, key))
+        else:
+            i = bisect.bisect_left(self.keys, key)
+        return i < len(self.keys) and self.keys[i] == key
+
+    def __eq__(self, other):
+        """ Same cells as other (a PackedCells or a set of tuples) """
+        if (isinstance(other, PackedCells)):
+            if (np is not None):
+                return bool(np.array_equal(self.keys, other.keys))
+            return self.keys == other.keys
+        if (isinstance(other, (set, frozenset))):
+            return len(self) == len(other) and all(cell in other for cell in self)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        """ PackedCells representation """
+        return f'PackedCells({len(self)} cells)'
+
+    def bounding_box(self):
+        """ Returns (xmin, ymin, xmax, ymax) of the cells, None if empty """
+        if (not len(self.keys)):
+            return None
+        if (np is not None):
+            xs, ys = self.arrays()
+            return (int(xs[0]), int(ys.min()), int(xs[-1]), int(ys.max()))
+        ys = [PackedCells.unpack(key)[1] for key in self.keys]
+        return (self.keys[0] >> 32, min(ys), self.keys[-1] >> 32, max(ys))
@@ -0,0 +1,170 @@
+"""
+Python - Game of life with tkinter
+06/06/2020
+Madipoupou
+"""
+
+import os
+import weakref
+from multiprocessing import Pipe, Process
+from .DenseEngine import DenseEngine, neighbor_counts, np
+
+try:
+    from multiprocessing.shared_memory import SharedMemory
+except ImportError:
+    SharedMemory = None
+
+def step_rows(src, dst, r0, r1, rule):
+    """
+    Writes into dst[r0:r1] the next generation of src[r0:r1] under rule
+    The rule.radius rows around them are the halo read from the neighbour strips
+    """
+    r = rule.radius
+    a = src[r0 - r:r1 + r]
+    alive = a if (rule.states == 2) else (a == 1).view(np.uint8)
+    count = neighbor_counts(alive, rule)
+    dst[r0:r1] = rule.next_states(a[r:-r], count[r:-r])
+
+def strip_worker(conn):
+    """
+    Worker process loop: receives (shm name, shape, source buffer, r0, r1,
+    rule), steps its strip inside the shared memory and answers when it is done
+    None stops the worker
+    """
+    shm = None
+    name = None
+    while (True):
+        msg = conn.recv()
+        if (msg is None):
+            break
+        shm_name, shape, src, r0, r1, rule = msg
+        if (shm_name != name):
+            if (shm):
+                del buffers
+                shm.close()
+            shm = SharedMemory(name=shm_name)
+            name = shm_name
+            buffers = np.ndarray((2,) + shape, dtype=np.uint8, buffer=shm.buf)
+        step_rows(buffers[src], buffers[1 - src], r0, r1, rule)
+        conn.send(True)
+    if (shm):
+        del buffers
+        shm.close()
+    conn.close()
+
+def release(workers, blocks):
+    """ Stops the workers and frees the shared memory blocks """
+    for (process, conn) in workers:
+        conn.send(None)
+        process.join()
+        conn.close()
+    workers.clear()
+    for shm in blocks:
+        shm.close()
+        shm.unlink()
+    blocks.clear()
+
+class ParallelEngine(DenseEngine):
+    """
+    Dense engine which splits the array into horizontal strips, each one
+    stepped by a worker process
+    Both generations live in one shared memory block, workers read the halo
+    rows of their neighbours straight from it so only a tiny message goes
+    through the pipes each generation
+    Patterns under min_population are stepped in the main process
+    """
+    name = 'parallel'
+
+    def __init__(self, cells=(), rule=None, topology=None, workers=None, min_population=50000):
+        """ ParallelEngine constructor """
+        if (SharedMemory is None):
+            raise ImportError('ParallelEngine requires multiprocessing.shared_memory')
+        self.worker_count = workers or os.cpu_count() or 1
+        self.min_population = min_population
+        self.workers = []
+        self.blocks = []
+        self.finalizer = weakref.finalize(self, release, self.workers, self.blocks)
+        DenseEngine.__init__(self, cells, rule, topology)
+
+    def check_topology(self, topology):
+        """ Raises ValueError for the finite universes (the strips don't wrap) """
+        if (topology.finite):
+            raise ValueError('ParallelEngine only runs on the unbounded plane')
+
+    def allocate(self, shape):
+        """
+        Returns a new dead array of the given shape, the first of the two
+        generation buffers of a new shared memory block
+        """
+        size = shape[0] * shape[1]
+        shm = SharedMemory(create=True, size=max(2 * size, 1))
+        self.blocks.append(shm)
+        self.buffers = np.ndarray((2,) + tuple(shape), dtype=np.uint8, buffer=shm.buf)
+        self.buffers[:] = 0
+        self.current = 0
+        return self.buffers[0]
+
+    def release_old_blocks(self):
+        """ Frees the blocks left behind by a resize """
+        while (len(self.blocks) > 1):
+            shm = self.blocks.pop(0)
+            shm.close()
+            shm.unlink()
+
+    def start_workers(self):
+        """ Starts the worker processes (once) """
+        while (len(self.workers) < self.worker_count):
+            parent_conn, child_conn = Pipe()
+            process = Process(target=strip_worker, args=(child_conn,), daemon=True)
+            process.start()
+            child_conn.close()
+            self.workers.append((process, parent_conn))
+
+    def step(self):
+        """ Computes the next generation, in parallel for big patterns """
+        self.ensure_border()
+        # The last step may still see the buffers of a block to be freed
+        self.last_step = None
+        self.release_old_blocks()
+        src, dst = self.current, 1 - self.current
+        height = self.array.shape[0]
+        r = self.rule.radius
+        strips = min(self.worker_count, height - 2 * r)
+        if (strips <= 1 or self.population() < self.min_population):
+            step_rows(self.buffers[src], self.buffers[dst], r, height - r, self.rule)
+        else:
+            self.start_workers()
+            name = self.blocks[-1].name
+            shape = self.array.shape
+            bounds = [r + (height - 2 * r) * i // strips for i in range(strips + 1)]
+            for i in range(strips):
+                self.workers[i][1].send((name, shape, src, bounds[i], bounds[i + 1], self.rule))
+            for i in range(strips):
+                self.workers[i][1].recv()
+        self.buffers[dst, :r] = 0
+        self.buffers[dst, -r:] = 0
+        self.current = dst
+        self.keep_step(self.buffers[src], self.buffers[dst])
+        self.generation += 1
+        if (self.generation % self.SHRINK_EVERY == 0):
+            self.shrink()
+            if (len(self.blocks) > 1):
+                # Compared before the block of both generations is freed
+                self.changes()
+                self.release_old_blocks()
+
+    def load(self, cells):
+        """ Replaces the current state by the given (x, y) cells """
+        DenseEngine.load(self, cells)
+        self.release_old_blocks()
+
+    def close(self):
+        """
+        Stops the workers and frees the shared memory
+        The cells are copied out first so they can still be read, but the
+        engine can't step anymore
+        """
+        self.array = np.array(self.array)
+        self.buffers = None
+        self.last_step = None
+        self.finalizer()
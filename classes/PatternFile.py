@@ -0,0 +1,114 @@
+"""
+Python - Game of life with tkinter
+06/06/2020
+Madipoupou
+"""
+
+import os
+import re
+from .GridFile import GridFile
+from .GridbFile import GridbFile
+from .RleFile import RleFile
+from .Life106File import Life106File
+from .CellsFile import CellsFile
+from .PackedCells import PackedCells
+from .Rule import LIFE
+
+class PatternFile(object):
+    """
+    Entry point of the pattern files: detects the format of a file to read
+    it and picks the format of a file to write from its extension
+    """
+    # Format used to save a file, by extension (.grid otherwise)
+    EXTENSIONS = {
+        '.gridb': GridbFile,
+        '.rle': RleFile,
+        '.lif': Life106File,
+        '.life': Life106File,
+        '.cells': CellsFile,
+    }
+    PLAINTEXT_ROW = re.compile(r'[.O*]+$')
+
+    @staticmethod
+    def detect(path):
+        """ Returns the class of the format of the file at path, from its beginning """
+        if (GridbFile.is_gridb(path)):
+            return GridbFile
+        with open(path, 'r') as fd:
+            for line in fd:
+                line = line.strip()
+                if (not line):
+                    continue
+                if (line.startswith(Life106File.MAGIC)):
+                    return Life106File
+                if (line.startswith('#')):
+                    # RLE comments
+                    continue
+                if (RleFile.HEADER.match(line)):
+                    return RleFile
+                if (line.startswith('!') or PatternFile.PLAINTEXT_ROW.match(line)):
+                    return CellsFile
+                return GridFile
+        return GridFile
+
+    @staticmethod
+    def iter_chunks(path):
+        """
+        Yields the cells of the file at path by lists, whatever its format
+        Raises OSError if the file can't be read, ValueError if it is not valid
+        """
+        return PatternFile.detect(path).iter_chunks(path)
+
+    @staticmethod
+    def read(path):
+        """
+        Returns the list of cells saved in the file at path, whatever its format
+        Raises OSError if the file can't be read, ValueError if it has no cell
+        """
+        return PatternFile.detect(path).read(path)
+
+    @staticmethod
+    def read_packed(path):
+        """
+        Returns the cells saved in the file at path as PackedCells (decoded
+        straight into the packed form for .gridb files)
+        Raises OSError if the file can't be read, ValueError if it has no cell
+        """
+        file_format = PatternFile.detect(path)
+        if (file_format is GridbFile):
+            return GridbFile.read_packed(path)
+        return PackedCells(file_format.read(path))
+
+    @staticmethod
+    def is_pattern_name(name):
+        """ True if name has the extension of a pattern format (not a hidden file) """
+        extension = os.path.splitext(name)[1].lower()
+        return not name.startswith('.') and (extension == '.grid' or extension in PatternFile.EXTENSIONS)
+
+    @staticmethod
+    def read_rule(path):
+        """
+        Returns the Rule written in the file at path (RLE header), None if
+        the format doesn't keep one or the rule isn't known
+        Raises OSError if the file can't be read
+        """
+        if (PatternFile.detect(path) is not RleFile):
+            return None
+        return RleFile.read_rule(path)
+
+    @staticmethod
+    def save(path, cells, rule=None):
+        """
+        Saves the cells into path, the extension gives the format
+        rule (a Rule, B3/S23 if None) is written by the formats which keep one (RLE)
+        """
+        file_format = PatternFile.EXTENSIONS.get(os.path.splitext(path)[1].lower(), GridFile)
+        if (file_format is GridbFile):
+            with open(path, 'wb') as fd:
+                GridbFile.write(fd, cells)
+        elif (file_format is RleFile):
+            with open(path, 'w') as fd:
+                RleFile.write(fd, cells, str(rule or LIFE))
+        else:
+            with open(path, 'w') as fd:
+                file_format.write(fd, cells)
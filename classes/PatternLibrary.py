@@ -0,0 +1,283 @@
+"""
+Python - Game of life with tkinter
+06/06/2020
+Madipoupou
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+from .CellGrid import CellGrid
+from .CycleDetector import CycleDetector
+from .PatternFile import PatternFile
+from .SparseEngine import SparseEngine
+
+def index_task(task):
+    """ Pool entry point: indexes one file, see PatternLibrary.index_file """
+    return PatternLibrary.index_file(*task)
+
+class PatternLibrary(object):
+    """
+    Index of a directory of pattern files, saved as JSON next to them
+    Each file gets its population, bounding box, content hash, a thumbnail
+    and how it ends: the cycle found (still life, oscillator, spaceship),
+    the generation it starts and the final population
+    An entry is kept while the file keeps its modification time and size,
+    or its content hash, so opening the library only reads the changed files
+    """
+    # Bumped when the entries change, older indexes are rebuilt
+    VERSION = 1
+    INDEX_NAME = '.library.json'
+    # Largest side of the thumbnails (pixels)
+    THUMBNAIL_SIZE = 64
+    # Growing patterns are not run further than this population (or 4 times
+    # their first population if bigger)
+    MAX_POPULATION = 10000
+
+    def __init__(self, directory, index_path=None, generations=1000):
+        """
+        PatternLibrary constructor, generations is how long a pattern is run
+        to find how it ends
+        """
+        self.directory = directory
+        self.index_path = index_path or os.path.join(directory, self.INDEX_NAME)
+        self.generations = generations
+        self.entries = {}
+        self.load()
+
+    def load(self):
+        """ Reads the saved index, if any and made with the same settings """
+        try:
+            with open(self.index_path, 'r') as fd:
+                index = json.load(fd)
+        except (OSError, ValueError):
+            return
+        if (index.get('version') == self.VERSION and index.get('generations') == self.generations):
+            self.entries = index.get('entries', {})
+
+    def save(self):
+        """ Writes the index (replaced at once), returns False if not possible """
+        index = {'version': self.VERSION, 'generations': self.generations, 'entries': self.entries}
+        temp_path = self.index_path + '.tmp'
+        try:
+            with open(temp_path, 'w') as fd:
+                json.dump(index, fd)
+            os.replace(temp_path, self.index_path)
+        except OSError:
+            return False
+        return True
+
+    def scan(self):
+        """ Returns the relative paths of the pattern files of the directory """
+        names = []
+        for root, dirs, files in os.walk(self.directory):
+            dirs[:] = sorted(name for name in dirs if (not name.startswith('.')))
+            for name in sorted(files):
+                if (PatternFile.is_pattern_name(name)):
+                    names.append(os.path.relpath(os.path.join(root, name), self.directory))
+        return names
+
+    @staticmethod
+    def file_hash(path):
+        """ Returns the SHA-1 of the content of the file at path """
+        digest = hashlib.sha1()
+        with open(path, 'rb') as fd:
+            for block in iter(lambda: fd.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def update(self, jobs=None):
+        """
+        Brings the index up to date with the directory: new and changed
+        files are indexed (in a process pool when there are several), the
+        entries of removed files are dropped
+        Returns the number of files indexed, the index is saved if it changed
+        """
+        entries = {}
+        tasks = []
+        changed = False
+        for name in self.scan():
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entry = self.entries.get(name)
+            if (entry is not None and (entry['mtime'], entry['size']) != (stat.st_mtime, stat.st_size)):
+                # Touched or copied: the content may still be the same
+                try:
+                    same = entry['hash'] == PatternLibrary.file_hash(path)
+                except OSError:
+                    same = False
+                if (same):
+                    entry['mtime'], entry['size'] = stat.st_mtime, stat.st_size
+                    changed = True
+                else:
+                    entry = None
+            if (entry is None):
+                tasks.append((path, self.generations))
+            else:
+                entries[name] = entry
+        changed = changed or len(entries) != len(self.entries) or bool(tasks)
+        jobs = min(jobs or os.cpu_count() or 1, len(tasks))
+        if (jobs <= 1):
+            results = [index_task(task) for task in tasks]
+        else:
+            with Pool(jobs) as pool:
+                results = pool.map(index_task, tasks)
+        for (path, _), entry in zip(tasks, results):
+            entries[os.path.relpath(path, self.directory)] = entry
+        self.entries = dict(sorted(entries.items()))
+        if (changed):
+            self.save()
+        return len(tasks)
+
+    @staticmethod
+    def index_file(path, generations):
+        """ Returns the entry of the file at path, with an 'error' if it can't be read """
+        entry = {'mtime': None, 'size': None}
+        try:
+            stat = os.stat(path)
+            entry['mtime'], entry['size'] = stat.st_mtime, stat.st_size
+            entry['hash'] = PatternLibrary.file_hash(path)
+            cells = set(PatternFile.read(path))
+        except (OSError, UnicodeDecodeError, ValueError) as err:
+            entry.setdefault('hash', None)
+            entry['error'] = str(err)
+            return entry
+        entry['population'] = len(cells)
+        entry['bounding_box'] = CycleDetector.bounding_box(cells)
+        entry['thumbnail'] = PatternLibrary.thumbnail(cells)
+        entry['result'] = PatternLibrary.simulate(cells, generations)
+        return entry
+
+    @staticmethod
+    def thumbnail(cells, size=THUMBNAIL_SIZE):
+        """
+        Returns the thumbnail of the cells: {'width', 'height', 'scale', 'data'}, data
+        being base64 grayscale pixels (top row first, black if a cell of the
+        pixel is alive), each pixel covering scale x scale cells
+        """
+        if (not cells):
+            return None
+        xmin, ymin, xmax, ymax = CycleDetector.bounding_box(cells)
+        scale = max(1, -(-max(xmax - xmin + 1, ymax - ymin + 1) // size))
+        width = (xmax - xmin) // scale + 1
+        height = (ymax - ymin) // scale + 1
+        pixels = bytearray(b'\xff') * (width * height)
+        for (x, y) in cells:
+            pixels[(height - 1 - (y - ymin) // scale) * width + (x - xmin) // scale] = 0
+        return {
+            'width': width, 'height': height, 'scale': scale,
+            'data': base64.b64encode(bytes(pixels)).decode('ascii'),
+        }
+
+    @staticmethod
+    def thumbnail_pixels(thumbnail):
+        """ Returns the grayscale pixels (bytes) of a thumbnail made by thumbnail """
+        return base64.b64decode(thumbnail['data'])
+
+    @staticmethod
+    def simulate(cells, generations, max_population=MAX_POPULATION):
+        """
+        Runs the cells until they cycle, up to generations or max_population
+        Returns the cycle found (kind, period, displacement, generation it
+        starts, None if there isn't any), the generations run and the final
+        population
+        """
+        grid = CellGrid(cells, engine=SparseEngine())
+        max_population = max(max_population, 4 * len(cells))
+        while (grid.cycle_num < generations and not grid.cycle_known()
+               and grid.engine.population() <= max_population):
+            grid.activate_cycle()
+        result = {
+            'kind': None, 'period': None, 'displacement': None, 'stabilization': None,
+            'generations': grid.cycle_num, 'population': grid.engine.population(),
+        }
+        if (grid.cycle_known()):
+            detector = grid.detector
+            result.update(
+                kind=detector.describe(), period=detector.period,
+                displacement=detector.displacement, stabilization=detector.start,
+                population=detector.population,
+            )
+        return result
+
+    def entry(self, name):
+        """ Returns the entry of the file name (relative path), None if unknown """
+        return self.entries.get(name)
+
+    def path(self, name):
+        """ Returns the path of the file name of the library """
+        return os.path.join(self.directory, name)
+
+    def names(self):
+        """ Returns the names of the readable patterns of the library """
+        return [name for name, entry in self.entries.items() if ('error' not in entry)]
+
+    def pending(self):
+        """
+        Returns the names of the pattern files whose entry is missing or out
+        of date (what update would read again, unless only touched)
+        """
+        names = []
+        for name in self.scan():
+            entry = self.entries.get(name)
+            try:
+                stat = os.stat(self.path(name))
+            except OSError:
+                continue
+            if (entry is None or (entry['mtime'], entry['size']) != (stat.st_mtime, stat.st_size)):
+                names.append(name)
+        return names
+
+    def describe(self, name):
+        """ Returns a short text about the pattern name: population, size, how it ends """
+        entry = self.entries[name]
+        if ('error' in entry):
+            return f'Unreadable: {entry["error"]}'
+        lines = [f'Population: {entry["population"]}']
+        bbox = entry['bounding_box']
+        if (bbox):
+            lines.append(f'Size: {bbox[2] - bbox[0] + 1} x {bbox[3] - bbox[1] + 1}')
+        result = entry['result']
+        if (result['kind'] is None):
+            lines.append(f'No cycle after {result["generations"]} generations')
+            lines.append(f'Population then: {result["population"]}')
+        else:
+            lines.append(result['kind'].capitalize())
+            lines.append(f'Stable from generation {result["stabilization"]}')
+            lines.append(f'Final population: {result["population"]}')
+        return '\n'.join(lines)
+
+    @staticmethod
+    def main(argv=None):
+        """ Command line entry point: builds the index of a directory, returns the exit status """
+        parser = argparse.ArgumentParser(
+            description='Builds (or updates) the index of a pattern library'
+        )
+        parser.add_argument('directory', help='directory of pattern files')
+        parser.add_argument('-n', '--generations', type=int, default=1000,
+                            help='generations run to find how each pattern ends')
+        parser.add_argument('-j', '--jobs', type=int, default=None,
+                            help='number of processes (default: all the cores)')
+        parser.add_argument('-i', '--index', default=None,
+                            help=f'index file (default: DIRECTORY/{PatternLibrary.INDEX_NAME})')
+        args = parser.parse_args(argv)
+        if (not os.path.isdir(args.directory)):
+            parser.error(f'{args.directory} is not a directory')
+        start = time.perf_counter()
+        library = PatternLibrary(args.directory, args.index, args.generations)
+        indexed = library.update(args.jobs)
+        json.dump({
+            'index': library.index_path, 'patterns': len(library.entries), 'indexed': indexed,
+            'errors': len(library.entries) - len(library.names()),
+            'time': time.perf_counter() - start,
+        }, sys.stdout, indent=1)
+        sys.stdout.write('\n')
+        return 0
@@ -0,0 +1,91 @@
+"""
+Python - Game of life with tkinter
+06/06/2020
+Madipoupou
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+
+class Profiler(object):
+    """
+    Timers and counters of the stages of the game (step, cull, draw, grid,
+    io) and births/deaths/population of each generation
+    The owners (CellGrid, GridCanvas, App) hold it in a profiler attribute
+    which is None while profiling is off: then a stage only costs the test
+    The last events are kept to be exported as a Chrome trace
+    (chrome://tracing or https://ui.perfetto.dev)
+    """
+    STAGES = ['step', 'cull', 'draw', 'grid', 'io']
+
+    def __init__(self, max_events=100000):
+        """ Profiler constructor """
+        self.events = deque(maxlen=max_events)
+        self.generations = deque(maxlen=max_events)
+        self.origin = time.perf_counter()
+        self.totals = {}
+        self.window = {}
+        self.births = self.deaths = self.population = 0
+
+    @staticmethod
+    def start():
+        """ Returns the start time of a stage, given back to stop """
+        return time.perf_counter()
+
+    def stop(self, stage, start, **args):
+        """ Ends the stage begun at start, args are kept in the trace """
+        end = time.perf_counter()
+        self.events.append((stage, start, end - start, threading.get_ident(), args))
+        for table in (self.totals, self.window):
+            count, total = table.get(stage, (0, 0))
+            table[stage] = (count + 1, total + end - start)
+
+    def record_generation(self, generation, born, dead, population):
+        """ Registers the numbers of births and deaths leading to generation """
+        self.generations.append((time.perf_counter(), generation, born, dead, population))
+        self.births, self.deaths, self.population = born, dead, population
+
+    def take_window(self):
+        """
+        Returns {stage: (count, mean time)} of the stages ended since the
+        last call, then starts a new window
+        """
+        window, self.window = self.window, {}
+        return {stage: (count, total / count) for stage, (count, total) in window.items()}
+
+    def overlay_text(self):
+        """ Text of the live overlay: mean time of each stage since the last call """
+        window = self.take_window()
+        lines = []
+        for stage in self.STAGES:
+            count, mean = window.get(stage, (0, 0))
+            lines.append(f'{stage.upper():5}{mean * 1000:7.2f}ms x{count}')
+        lines.append(f'BORN {self.births} DEAD {self.deaths}')
+        lines.append(f'POP {self.population}')
+        return '\n'.join(lines)
+
+    def trace(self):
+        """ Returns the recorded events in the Chrome trace event format """
+        pid = os.getpid()
+        events = [
+            {
+                'name': stage, 'cat': 'life', 'ph': 'X', 'pid': pid, 'tid': tid,
+                'ts': (start - self.origin) * 1e6, 'dur': duration * 1e6, 'args': args,
+            }
+            for (stage, start, duration, tid, args) in list(self.events)
+        ]
+        for (moment, generation, born, dead, population) in list(self.generations):
+            events.append({
+                'name': 'cells', 'cat': 'life', 'ph': 'C', 'pid': pid,
+                'ts': (moment - self.origin) * 1e6,
+                'args': {'births': born, 'deaths': dead, 'population': population},
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export_trace(self, path):
+        """ Writes the trace into path as JSON """
+        with open(path, 'w') as fd:
+            json.dump(self.trace(), fd)
@@ -0,0 +1,158 @@
+"""
+Python - Game of life with tkinter
+06/06/2020
+Madipoupou
+"""
+
+import itertools
+import re
+from .Rule import Rule
+
+class RleFile(object):
+    """
+    Reads and writes the RLE format used by most public pattern collections:
+    '#' comment lines, a 'x = width, y = height, rule = ...' header, then
+    runs like '3o2b$' (b dead, o alive, $ end of row, ! end of pattern)
+    File rows go downwards, so row r of the file becomes y = height - 1 - r
+    """
+    HEADER = re.compile(r'\s*x\s*=\s*(\d+)\s*,\s*y\s*=\s*(\d+)(?:\s*,\s*rule\s*=\s*(\S+))?')
+    TOKEN = re.compile(r'(\d*)([^\d\s])')
+    TRAILING_DIGITS = re.compile(r'\d+$')
+    # Line breaks may fall anywhere in the body, even inside a run count
+    WHITESPACE = re.compile(r'\s+')
+    # Size of the pieces of the body read at once
+    READ_SIZE = 1 << 16
+    # Maximum length of a written line
+    LINE_LENGTH = 70
+
+    @staticmethod
+    def read(path):
+        """
+        Returns the list of cells saved in the RLE file at path
+        Raises OSError if the file can't be read, ValueError if it has no cell
+        """
+        cells = []
+        for chunk in RleFile.iter_chunks(path):
+            cells.extend(chunk)
+        if (not cells):
+            raise ValueError(f'{path} is not well formatted')
+        return cells
+
+    @staticmethod
+    def read_header(fd):
+        """ Reads the lines up to the header one, returns (width, height, rule) """
+        for line in fd:
+            if (line.startswith('#') or not line.strip()):
+                continue
+            match = RleFile.HEADER.match(line)
+            if (not match):
+                raise ValueError('RLE header line not found')
+            return int(match.group(1)), int(match.group(2)), match.group(3)
+        raise ValueError('RLE header line not found')
+
+    @staticmethod
+    def read_rule(path):
+        """
+        Returns the Rule of the header of the RLE file at path, None if it has
+        none or it isn't known
+        """
+        with open(path, 'r') as fd:
+            try:
+                width, height, rule = RleFile.read_header(fd)
+                return Rule.parse(rule) if (rule) else None
+            except ValueError:
+                return None
+
+    @staticmethod
+    def iter_chunks(path, batch_size=1 << 16):
+        """
+        Yields the cells of the RLE file at path by lists of about batch_size
+        The body is read by pieces, never as one string
+        """
+        with open(path, 'r') as fd:
+            width, height, rule = RleFile.read_header(fd)
+            x = 0
+            y = height - 1
+            cells = []
+            carry = ''
+            while (True):
+                data = fd.read(RleFile.READ_SIZE)
+                if (not data):
+                    break
+                data = carry + RleFile.WHITESPACE.sub('', data)
+                # A run count cut at the end of the piece goes with the next one
+                match = RleFile.TRAILING_DIGITS.search(data)
+                carry = match.group(0) if (match) else ''
+                if (carry):
+                    data = data[:match.start()]
+                finished = False
+                for count, tag in RleFile.TOKEN.findall(data):
+                    n = int(count) if (count) else 1
+                    if (tag == 'b' or tag == '.'):
+                        x += n
+                    elif (tag == '$'):
+                        x = 0
+                        y -= n
+                    elif (tag == '!'):
+                        finished = True
+                        break
+                    else:
+                        cells.extend(zip(range(x, x + n), itertools.repeat(y, n)))
+                        x += n
+                if (len(cells) >= batch_size):
+                    yield cells
+                    cells = []
+                if (finished):
+                    break
+            yield cells
+
+    @staticmethod
+    def write(fd, cells, rule='B3/S23'):
+        """ Writes the cells into the opened text file fd, runs compressed """
+        rows = {}
+        for (x, y) in cells:
+            rows.setdefault(y, []).append(x)
+        if (not rows):
+            fd.write(f'x = 0, y = 0, rule = {rule}\n!\n')
+            return
+        xmin = min(min(xs) for xs in rows.values())
+        xmax = max(max(xs) for xs in rows.values())
+        ymin, ymax = min(rows), max(rows)
+        fd.write(f'x = {xmax - xmin + 1}, y = {ymax - ymin + 1}, rule = {rule}\n')
+        line = []
+        line_length = 0
+
+        def emit(token):
+            """ Adds a token to the current line, flushed when full """
+            nonlocal line_length
+            if (line_length + len(token) > RleFile.LINE_LENGTH):
+                fd.write(''.join(line) + '\n')
+                line.clear()
+                line_length = 0
+            line.append(token)
+            line_length += len(token)
+
+        def run(count, tag):
+            """ Returns the token of count times tag """
+            return f'{count}{tag}' if (count > 1) else tag
+
+        previous_y = ymax
+        for y in sorted(rows, reverse=True):
+            if (y != previous_y):
+                emit(run(previous_y - y, '$'))
+                previous_y = y
+            cursor = xmin
+            xs = sorted(rows[y])
+            i = 0
+            while (i < len(xs)):
+                # Looking for the end of the alive run starting at xs[i]
+                j = i
+                while (j + 1 < len(xs) and xs[j + 1] == xs[j] + 1):
+                    j += 1
+                if (xs[i] > cursor):
+                    emit(run(xs[i] - cursor, 'b'))
+                emit(run(j - i + 1, 'o'))
+                cursor = xs[j] + 1
+                i = j + 1
+        emit('!')
+        fd.write(''.join(line) + '\n')
@@ -0,0 +1,223 @@
+"""
+Python - Game of life with tkinter
+06/06/2020
+Madipoupou
+"""
+
+import re
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class Rule(object):
+    """
+    Outer totalistic rule: a dead cell is born with a neighbour count in
+    birth, an alive one survives with a count in survive
+    With more than 2 states (Generations rules) a cell which doesn't survive
+    goes through the dying states 2 ... states-1 before being dead, only
+    the alive cells (state 1) count as neighbours
+    The neighbourhood is the (2*radius+1)^2 square (Larger than Life when
+    radius > 1), the cell itself included if include_center
+    The rule is compiled into tables, the engines only look the next state up:
+    table[state][count], mask_table (radius 1, 2 states) indexed by the 3x3
+    neighbourhood as a 9 bits mask and next_states for whole NumPy arrays
+    """
+    # Up to this number of count comparisons NumPy compares, past it looks up
+    MAX_TESTS = 10
+    # Well known rules which can be given by name
+    NAMES = {
+        'life': 'B3/S23',
+        'conway': 'B3/S23',
+        'highlife': 'B36/S23',
+        'day&night': 'B3678/S34678',
+        'seeds': 'B2/S',
+        'brian': 'B2/S/C3',
+        'bugs': 'R5,C0,M1,S34..58,B34..45,NM',
+    }
+    BS = re.compile(r'B(\d*)/S(\d*)(?:/C?(\d+))?$', re.IGNORECASE)
+    SB = re.compile(r'S(\d*)/B(\d*)(?:/C?(\d+))?$', re.IGNORECASE)
+    # Old notation survive/birth(/states): '23/3', '345/2/4'
+    LEGACY = re.compile(r'(\d*)/(\d*)(?:/(\d+))?$')
+    # Larger than Life, Golly notation: 'R5,C0,M1,S34..58,B34..45,NM'
+    LTL = re.compile(
+        r'R(\d+),C(\d+),M([01]),S(\d+)\.\.(-?\d+),B(\d+)\.\.(-?\d+)(?:,N([A-Z]))?$', re.IGNORECASE
+    )
+
+    def __init__(self, birth, survive, states=2, radius=1, include_center=False):
+        """
+        Rule constructor
+        Raises ValueError if the rule can't run on an unbounded grid
+        """
+        self.birth = frozenset(birth)
+        self.survive = frozenset(survive)
+        self.states = states
+        self.radius = radius
+        self.include_center = include_center
+        self.max_count = (2 * radius + 1) ** 2 - (0 if (include_center) else 1)
+        if (states < 2 or radius < 1):
+            raise ValueError('A rule needs at least 2 states and a radius of 1')
+        if (0 in self.birth):
+            raise ValueError('B0 rules would fill the whole unbounded grid')
+        if (max(self.birth | self.survive, default=0) > self.max_count):
+            raise ValueError('Neighbour count out of the neighbourhood')
+        self.offsets = tuple(
+            (dx, dy)
+            for dx in range(-radius, radius + 1) for dy in range(-radius, radius + 1)
+            if (dx or dy or include_center)
+        )
+        # Offsets + radius: indexes of the coordinate tables of a topology
+        self.shifted_offsets = tuple((dx + radius, dy + radius) for (dx, dy) in self.offsets)
+        self.compile()
+
+    @staticmethod
+    def parse(text):
+        """
+        Returns the Rule described by text: a name, 'B36/S23', 'S23/B36',
+        '23/36', Generations 'B2/S/C3' or '345/2/4', Larger than Life
+        'R5,C0,M1,S34..58,B34..45,NM'
+        Raises ValueError if text isn't a valid rule
+        """
+        text = text.strip()
+        text = Rule.NAMES.get(text.lower(), text)
+        match = Rule.BS.match(text)
+        if (match):
+            birth, survive, states = match.groups()
+        else:
+            match = Rule.SB.match(text) or Rule.LEGACY.match(text)
+            if (match):
+                survive, birth, states = match.groups()
+        if (match):
+            return Rule(
+                [int(n) for n in birth], [int(n) for n in survive], int(states or 2)
+            )
+        match = Rule.LTL.match(text)
+        if (not match):
+            raise ValueError(f'Unknown rule {text!r}')
+        radius, states, center, smin, smax, bmin, bmax, neighbourhood = match.groups()
+        if (neighbourhood and neighbourhood.upper() != 'M'):
+            raise ValueError('Only the Moore (NM) neighbourhood is supported')
+        return Rule(
+            range(int(bmin), int(bmax) + 1), range(int(smin), int(smax) + 1),
+            max(int(states), 2), int(radius), center == '1'
+        )
+
+    def compile(self):
+        """ Builds the lookup tables of the rule """
+        counts = range(self.max_count + 1)
+        table = [
+            tuple(1 if (n in self.birth) else 0 for n in counts),
+            tuple(1 if (n in self.survive) else 2 % self.states for n in counts),
+        ]
+        for state in range(2, self.states):
+            table.append(((state + 1) % self.states,) * len(counts))
+        self.table = tuple(table)
+        # Counts giving an alive cell whatever the state / only if alive /
+        # only if dead (2 states rules)
+        self.always = self.birth & self.survive
+        self.only_survive = self.survive - self.birth
+        self.only_birth = self.birth - self.survive
+        self.tests = None
+        self.bits = None
+        tests = tuple(
+            Rule.runs(counts)
+            for counts in (self.always, self.only_survive, self.only_birth)
+        )
+        comparisons = sum(1 if (lo == hi) else 2 for runs in tests for (lo, hi) in runs)
+        if (self.states == 2 and comparisons <= self.MAX_TESTS):
+            self.tests = tests
+        elif (self.states == 2 and 2 * len(counts) <= 64):
+            # Bit (state * len(counts) + count) of bits is the next state
+            self.bits = sum(1 << (state * len(counts) + n) for state in (0, 1) for n in counts if (table[state][n]))
+        if (np):
+            self.flat = np.array(self.table, dtype=np.uint8).ravel()
+        self.mask_table = None
+        if (self.radius == 1 and self.states == 2):
+            mask_table = []
+            for mask in range(512):
+                center = (mask >> 4) & 1
+                count = bin(mask & ~16).count('1') + (center if (self.include_center) else 0)
+                mask_table.append(self.table[center][count])
+            self.mask_table = bytes(mask_table)
+
+    @staticmethod
+    def runs(counts):
+        """ Returns the sorted counts as (first, last) runs of consecutive counts """
+        runs = []
+        for n in sorted(counts):
+            if (runs and runs[-1][1] == n - 1):
+                runs[-1] = (runs[-1][0], n)
+            else:
+                runs.append((n, n))
+        return tuple(runs)
+
+    @staticmethod
+    def in_runs(count, runs):
+        """ Boolean array: count inside one of the runs """
+        res = None
+        for (lo, hi) in runs:
+            test = (count == lo) if (lo == hi) else ((count >= lo) & (count <= hi))
+            res = test if (res is None) else (res | test)
+        return res
+
+    def next_states(self, a, count):
+        """
+        Returns the next states (uint8 array) of the states a given the
+        neighbour counts of the cells, with comparisons when the rule has
+        few counts, else with a lookup
+        """
+        if (self.tests):
+            always, only_survive, only_birth = self.tests
+            res = np.zeros(a.shape, dtype=bool)
+            if (always):
+                res |= Rule.in_runs(count, always)
+            if (only_survive):
+                res |= Rule.in_runs(count, only_survive) & (a == 1)
+            if (only_birth):
+                res |= Rule.in_runs(count, only_birth) & (a == 0)
+            return res.view(np.uint8)
+        width = self.max_count + 1
+        if (self.bits is not None):
+            dtype = np.uint32 if (2 * width <= 32) else np.uint64
+            index = a.astype(dtype)
+            index *= dtype(width)
+            index += count
+            return ((dtype(self.bits) >> index) & dtype(1)).astype(np.uint8)
+        index = a.astype(np.intp) * width
+        index += count
+        return self.flat.take(index)
+
+    def is_life(self):
+        """ True for Conway's B3/S23 """
+        return (
+            self.birth == {3} and self.survive == {2, 3} and self.states == 2
+            and self.radius == 1 and not self.include_center
+        )
+
+    def __eq__(self, other):
+        """ Two rules are equal if they give the same next states """
+        return isinstance(other, Rule) and str(self) == str(other)
+
+    def __hash__(self):
+        """ Hash consistent with __eq__ """
+        return hash(str(self))
+
+    def __str__(self):
+        """ Rule string converter (B/S notation, Golly notation for LtL) """
+        if (self.radius == 1 and not self.include_center):
+            text = 'B' + ''.join(map(str, sorted(self.birth)))
+            text += '/S' + ''.join(map(str, sorted(self.survive)))
+            return text + (f'/C{self.states}' if (self.states > 2) else '')
+
+        def span(counts):
+            """ 'min..max' of a set of counts (LtL rules use ranges) """
+            return f'{min(counts)}..{max(counts)}' if (counts) else '0..-1'
+
+        return (
+            f'R{self.radius},C{self.states if (self.states > 2) else 0},'
+            f'M{int(self.include_center)},S{span(self.survive)},B{span(self.birth)},NM'
+        )
+
+# The default rule
+LIFE = Rule.parse('B3/S23')
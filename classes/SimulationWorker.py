@@ -0,0 +1,105 @@
+"""
+Python - Game of life with tkinter
+06/06/2020
+Madipoupou
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+# What the simulation thread publishes: the (born, dead) cells since the
+# previous snapshot taken, or all the alive cells (born and dead None) when
+# the changes of a generation aren't known
+Snapshot = namedtuple('Snapshot', ['cycle', 'born', 'dead', 'cells'])
+
+class SimulationWorker(threading.Thread):
+    """
+    Thread which steps a CellGrid in the background and publishes the
+    changes of the generations
+    The changes not taken yet are merged into one snapshot: the GUI only
+    gets the newest generation, and the cost of a generation stays the
+    number of cells it changes, not the population
+    While the thread runs nobody else may touch the grid engine
+    """
+    def __init__(self, grid, delay=0.0):
+        """
+        SimulationWorker constructor
+        delay is the minimal time (in seconds) between two generations
+        """
+        threading.Thread.__init__(self, daemon=True)
+        self.grid = grid
+        self.delay = delay
+        # Snapshot not taken yet, built under the lock
+        self.lock = threading.Lock()
+        self.cycle = None
+        self.born = None
+        self.dead = None
+        self.cells = None
+        self.stop_event = threading.Event()
+
+    def run(self):
+        """ Thread loop: step, publish, wait for the rest of the delay """
+        grid = self.grid
+        while (not self.stop_event.is_set()):
+            start = time.perf_counter()
+            version = grid.version
+            grid.activate_cycle()
+            last = grid.last_changes
+            if (grid.version == version):
+                # Looked up in a still cycle: nothing changed
+                self.publish(grid.cycle_num, (), ())
+            elif (last is not None and last[0] == version and last[1] == grid.version):
+                self.publish(grid.cycle_num, last[2], last[3])
+            else:
+                self.publish_cells(grid.cycle_num, frozenset(grid.alive_cells))
+            wait = self.delay - (time.perf_counter() - start)
+            if (wait > 0):
+                self.stop_event.wait(wait)
+
+    def publish(self, cycle, born, dead):
+        """ Merges the (born, dead) cells of generation cycle into the snapshot """
+        with self.lock:
+            self.cycle = cycle
+            if (self.cells is not None):
+                self.cells = (self.cells - frozenset(dead)) | frozenset(born)
+            elif (self.born is None):
+                self.born, self.dead = set(born), set(dead)
+            else:
+                # A cell born then dead (or the reverse) since the last
+                # snapshot didn't change
+                acc_born, acc_dead = self.born, self.dead
+                for cell in dead:
+                    if (cell in acc_born):
+                        acc_born.remove(cell)
+                    else:
+                        acc_dead.add(cell)
+                for cell in born:
+                    if (cell in acc_dead):
+                        acc_dead.remove(cell)
+                    else:
+                        acc_born.add(cell)
+
+    def publish_cells(self, cycle, cells):
+        """ Replaces the snapshot by all the alive cells of generation cycle """
+        with self.lock:
+            self.cycle = cycle
+            self.born = self.dead = None
+            self.cells = cells
+
+    def latest(self):
+        """
+        Returns the snapshot of the newest generation, with the changes since
+        the previous one taken, None if there isn't any new generation
+        """
+        with self.lock:
+            if (self.cycle is None):
+                return None
+            snapshot = Snapshot(self.cycle, self.born, self.dead, self.cells)
+            self.cycle = self.born = self.dead = self.cells = None
+        return snapshot
+
+    def stop(self):
+        """ Stops the thread and waits for the current generation to end """
+        self.stop_event.set()
+        self.join()
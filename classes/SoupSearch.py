@@ -0,0 +1,407 @@
+"""
+Python - Game of life with tkinter
+06/06/2020
+Madipoupou
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import OrderedDict
+from multiprocessing import Pool
+from .PatternFile import PatternFile
+from .Rule import Rule
+from .SparseEngine import SparseEngine
+from .HeadlessRunner import ENGINES
+
+# Digits of the extended Wechsler notation: a column of 5 cells, then the
+# length - 4 of a run of 4 to 39 empty columns
+WECHSLER_DIGITS = '0123456789abcdefghijklmnopqrstuv'
+RUN_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+# The 8 rotations/reflections of the plane
+SYMMETRIES = (
+    lambda x, y: (x, y), lambda x, y: (-x, y), lambda x, y: (x, -y), lambda x, y: (-x, -y),
+    lambda x, y: (y, x), lambda x, y: (-y, x), lambda x, y: (y, -x), lambda x, y: (-y, -x),
+)
+
+def run_task(task):
+    """ Pool entry point: runs a chunk of soups, see SoupSearch.run_chunk """
+    return SoupSearch.run_chunk(*task)
+
+class SoupSearch(object):
+    """
+    Soup search: runs seeded random soups until they stabilize (in a process
+    pool) and counts the objects left, the census
+    A soup is stable once its population is periodic and every object of
+    its ash comes back to itself alone: still life, oscillator or spaceship
+    The objects are named by their apgcode (xs4_33 block, xp2_7 blinker,
+    xq4_153 glider...), the same whatever their phase and orientation
+    The soup 'seed:index' is always the same, so any find can be rebuilt
+    """
+    # Objects already identified: (rule, cells moved to (0, 0)) -> (code, description)
+    MEMO = OrderedDict()
+    MAX_MEMO = 1 << 14
+
+    @staticmethod
+    def soup(seed, index, width=16, height=16, density=0.5):
+        """ Returns the cells of the soup number index of seed """
+        rng = random.Random(f'{seed}:{index}')
+        return [
+            (x, y) for y in range(height) for x in range(width) if (rng.random() < density)
+        ]
+
+    @staticmethod
+    def parse_soup_id(text):
+        """ Returns (seed, index) of a soup id 'seed:index', raises ValueError """
+        seed, sep, index = text.rpartition(':')
+        if (not sep or not index.isdigit()):
+            raise ValueError(f'Invalid soup {text!r}, expected seed:index')
+        return seed, int(index)
+
+    @staticmethod
+    def normalize(cells):
+        """ Returns the cells moved so that their bounding box starts at (0, 0) """
+        xmin = min(x for (x, y) in cells)
+        ymin = min(y for (x, y) in cells)
+        return frozenset((x - xmin, y - ymin) for (x, y) in cells)
+
+    @staticmethod
+    def wechsler(cells):
+        """ Returns the extended Wechsler code of the cells moved to (0, 0) """
+        width = max(x for (x, y) in cells) + 1
+        height = max(y for (x, y) in cells) + 1
+        strips = []
+        for top in range(0, height, 5):
+            columns = [0] * width
+            for (x, y) in cells:
+                if (top <= y < top + 5):
+                    columns[x] |= 1 << (y - top)
+            strip = ''.join(WECHSLER_DIGITS[column] for column in columns).rstrip('0')
+            # Runs of empty columns: w = 2, x = 3, y0 ... yz = 4 ... 39
+            code = []
+            i = 0
+            while (i < len(strip)):
+                if (strip[i] != '0'):
+                    code.append(strip[i])
+                    i += 1
+                    continue
+                run = 1
+                while (i + run < len(strip) and strip[i + run] == '0' and run < 39):
+                    run += 1
+                code.append('0' if (run == 1) else 'w' if (run == 2) else 'x' if (run == 3)
+                            else 'y' + RUN_DIGITS[run - 4])
+                i += run
+            strips.append(''.join(code))
+        return 'z'.join(strips)
+
+    @staticmethod
+    def canonical(phases):
+        """
+        Returns the Wechsler code of an object given by the cells of its
+        phases: the shortest, then first in alphabetical order, over all the
+        phases and orientations
+        """
+        codes = [
+            SoupSearch.wechsler(SoupSearch.normalize([symmetry(x, y) for (x, y) in cells]))
+            for cells in phases for symmetry in SYMMETRIES
+        ]
+        return min(codes, key=lambda code: (len(code), code))
+
+    @staticmethod
+    def classify(cells, rule, max_period=60):
+        """
+        Runs the object made of cells alone until it comes back to itself
+        Returns (code, description), None if it doesn't within max_period
+        generations
+        """
+        start = SoupSearch.normalize(cells)
+        memo = SoupSearch.MEMO
+        known = memo.get((rule, start))
+        if (known is not None):
+            memo.move_to_end((rule, start))
+            return known
+        engine = SparseEngine(cells, rule=rule)
+        phases = [cells]
+        for period in range(1, max_period + 1):
+            engine.step()
+            current = engine.get_cells()
+            if (not current):
+                return None
+            if (len(current) == len(start) and SoupSearch.normalize(current) == start):
+                break
+            phases.append(set(current))
+        else:
+            return None
+        code = SoupSearch.canonical(phases)
+        xmin, ymin = min(x for (x, y) in cells), min(y for (x, y) in cells)
+        moved = (min(x for (x, y) in current) != xmin or min(y for (x, y) in current) != ymin)
+        if (moved):
+            known = (f'xq{period}_{code}', f'spaceship, period {period}')
+        elif (period == 1):
+            known = (f'xs{len(cells)}_{code}', f'still life, {len(cells)} cells')
+        else:
+            known = (f'xp{period}_{code}', f'oscillator, period {period}')
+        # Every phase and orientation of the object is now known
+        for phase in phases:
+            for symmetry in SYMMETRIES:
+                key = (rule, SoupSearch.normalize([symmetry(x, y) for (x, y) in phase]))
+                memo[key] = known
+                memo.move_to_end(key)
+        while (len(memo) > SoupSearch.MAX_MEMO):
+            memo.popitem(last=False)
+        return known
+
+    @staticmethod
+    def clusters(cells, distance):
+        """
+        Returns {cell: cluster number} of the cells, two cells closer than
+        distance (in both directions) being in the same cluster
+        """
+        offsets = [
+            (dx, dy) for dx in range(-distance, distance + 1)
+            for dy in range(-distance, distance + 1) if (dx or dy)
+        ]
+        labels = {}
+        for cell in cells:
+            if (cell in labels):
+                continue
+            label = len(labels)
+            labels[cell] = label
+            stack = [cell]
+            while (stack):
+                x, y = stack.pop()
+                for (dx, dy) in offsets:
+                    other = (x + dx, y + dy)
+                    if (other in cells and other not in labels):
+                        labels[other] = label
+                        stack.append(other)
+        return labels
+
+    @staticmethod
+    def separate(parts, rule, generations):
+        """
+        Returns the parts of a group of close objects (traffic light, ...)
+        if they don't interact during generations, else the whole group
+        """
+        if (len(parts) == 1):
+            return parts
+        group = [cell for part in parts for cell in part]
+        whole = SparseEngine(group, rule=rule)
+        engines = [SparseEngine(part, rule=rule) for part in parts]
+        for _ in range(generations):
+            whole.step()
+            cells = set()
+            for engine in engines:
+                engine.step()
+                cells.update(engine.get_cells())
+            if (cells != whole.get_cells()):
+                return [group]
+        return parts
+
+    @staticmethod
+    def periodic(populations, max_period):
+        """ Returns the period of the last populations, None if they aren't periodic """
+        window = populations[-3 * max_period:]
+        for period in range(1, max_period + 1):
+            if (all(window[i] == window[i - period] for i in range(period, len(window)))):
+                return period
+        return None
+
+    @staticmethod
+    def run_soup(cells, rule, engine_name='sparse', max_generations=10000, max_period=60):
+        """
+        Runs the soup cells until it stabilizes
+        Returns (generations, objects), objects being the list of the
+        (code, description) of its ash, None if still unstable after
+        max_generations
+        """
+        engine = ENGINES[engine_name](cells, rule=rule)
+        populations = [engine.population()]
+        generation = 0
+        while (generation < max_generations):
+            engine.step()
+            generation += 1
+            populations.append(engine.population())
+            if (generation % max_period or generation < 3 * max_period):
+                continue
+            period = SoupSearch.periodic(populations, max_period)
+            if (period is None):
+                continue
+            # The objects are grouped over a whole period, so that the ones
+            # touching in some phase only are kept together
+            seen = set(engine.get_cells())
+            for _ in range(period):
+                engine.step()
+                generation += 1
+                populations.append(engine.population())
+                seen.update(engine.get_cells())
+            labels = SoupSearch.clusters(seen, 2 * rule.radius)
+            part_labels = SoupSearch.clusters(seen, rule.radius)
+            groups = {}
+            for cell in engine.get_cells():
+                groups.setdefault(labels[cell], {}).setdefault(part_labels[cell], []).append(cell)
+            objects = []
+            for parts in groups.values():
+                for part in SoupSearch.separate(list(parts.values()), rule, period):
+                    known = SoupSearch.classify(part, rule, max_period)
+                    if (known is None):
+                        break
+                    objects.append(known)
+                else:
+                    continue
+                break
+            else:
+                engine.close()
+                return generation, objects
+        engine.close()
+        return generation, None
+
+    @staticmethod
+    def run_chunk(seed, start, count, rule='B3/S23', engine_name='sparse', width=16, height=16,
+                  density=0.5, max_generations=10000, max_period=60, samples=3):
+        """
+        Runs the soups start ... start + count - 1 of seed
+        Returns the census of their objects: {code: entry}, see SoupSearch.add
+        """
+        rule = Rule.parse(rule)
+        census = {}
+        generations = 0
+        for index in range(start, start + count):
+            cells = SoupSearch.soup(seed, index, width, height, density)
+            steps, objects = SoupSearch.run_soup(cells, rule, engine_name, max_generations, max_period)
+            generations += steps
+            if (objects is None):
+                objects = [('unstable', f'not stable after {max_generations} generations')]
+            found = set()
+            for (code, description) in objects:
+                entry = census.get(code)
+                if (entry is None):
+                    entry = census[code] = {
+                        'code': code, 'description': description, 'count': 0, 'soup_count': 0, 'soups': [],
+                    }
+                entry['count'] += 1
+                found.add(code)
+            for code in found:
+                entry = census[code]
+                entry['soup_count'] += 1
+                if (len(entry['soups']) < samples):
+                    entry['soups'].append(f'{seed}:{index}')
+        return {'census': census, 'generations': generations}
+
+    @staticmethod
+    def merge(results, samples=3):
+        """ Returns the census of all the results of run_chunk, most common first """
+        census = {}
+        for result in results:
+            for code, entry in result['census'].items():
+                total = census.get(code)
+                if (total is None):
+                    census[code] = dict(entry, soups=list(entry['soups']))
+                    continue
+                total['count'] += entry['count']
+                total['soup_count'] += entry['soup_count']
+                total['soups'].extend(entry['soups'][:samples - len(total['soups'])])
+        return sorted(census.values(), key=lambda entry: (-entry['count'], entry['code']))
+
+    @staticmethod
+    def run(soups, seed, rule='B3/S23', engine_name='sparse', width=16, height=16, density=0.5,
+            max_generations=10000, max_period=60, jobs=None, samples=3, rare=1, chunk_size=16):
+        """
+        Runs soups soups of seed in a process pool
+        Returns the report: census, throughput and the rare finds (objects
+        seen in rare soups at most, and the unstable soups)
+        """
+        tasks = [
+            (seed, start, min(chunk_size, soups - start), rule, engine_name, width, height, density,
+             max_generations, max_period, samples)
+            for start in range(0, soups, chunk_size)
+        ]
+        jobs = min(jobs or os.cpu_count() or 1, len(tasks))
+        if (engine_name == 'parallel'):
+            # The engine already uses all the cores
+            jobs = 1
+        start = time.perf_counter()
+        if (jobs <= 1):
+            results = [run_task(task) for task in tasks]
+        else:
+            with Pool(jobs) as pool:
+                results = pool.map(run_task, tasks)
+        total_time = time.perf_counter() - start
+        census = SoupSearch.merge(results, samples)
+        generations = sum(result['generations'] for result in results)
+        return {
+            'seed': seed, 'rule': rule, 'engine': engine_name, 'soups': soups,
+            'size': [width, height], 'density': density,
+            'total_time': total_time,
+            'soups_per_second': soups / total_time if (total_time) else None,
+            'generations': generations,
+            'generations_per_second': generations / total_time if (total_time) else None,
+            'census': census,
+            'rare': [
+                entry for entry in census if (entry['code'] == 'unstable' or entry['soup_count'] <= rare)
+            ],
+        }
+
+    @staticmethod
+    def main(argv=None):
+        """ Command line entry point, returns the exit status """
+        parser = argparse.ArgumentParser(
+            description='Runs random soups until they stabilize and counts the objects left'
+        )
+        parser.add_argument('-n', '--soups', type=int, default=100, help='number of soups')
+        parser.add_argument('--seed', default=None,
+                            help='seed of the soups (default: the current time)')
+        parser.add_argument('--soup', default=None,
+                            help='only rebuild the soup seed:index (saved with -o)')
+        parser.add_argument('-o', '--output', default=None,
+                            help='file where the soup given by --soup is saved')
+        parser.add_argument('-e', '--engine', choices=sorted(ENGINES), default='sparse')
+        parser.add_argument('-j', '--jobs', type=int, default=None,
+                            help='number of processes (default: all the cores)')
+        parser.add_argument('-r', '--rule', default='B3/S23',
+                            help='2 states rule: B36/S23, R5,C0,M1,S34..58,B34..45,NM...')
+        parser.add_argument('--size', default='16x16', help='size of the soups (WxH)')
+        parser.add_argument('-d', '--density', type=float, default=0.5)
+        parser.add_argument('-g', '--max-generations', type=int, default=10000,
+                            help='generations after which a soup is reported unstable')
+        parser.add_argument('-p', '--max-period', type=int, default=60,
+                            help='longest period of the objects looked for')
+        parser.add_argument('--rare', type=int, default=1,
+                            help='objects seen in at most RARE soups are reported as rare finds')
+        parser.add_argument('-s', '--stats', default=None,
+                            help='JSON census file (default: stdout)')
+        args = parser.parse_args(argv)
+        try:
+            rule = Rule.parse(args.rule)
+            width, height = (int(side) for side in args.size.lower().split('x'))
+            if (rule.states != 2):
+                raise ValueError(f'The soup search runs the 2 states rules, not {rule}')
+            ENGINES[args.engine](rule=rule).close()
+        except ValueError as err:
+            parser.error(str(err))
+        if (args.soup):
+            try:
+                seed, index = SoupSearch.parse_soup_id(args.soup)
+            except ValueError as err:
+                parser.error(str(err))
+            if (not args.output):
+                parser.error('--soup needs an output file (-o)')
+            PatternFile.save(
+                args.output, SoupSearch.soup(seed, index, width, height, args.density), rule
+            )
+            return 0
+        seed = args.seed if (args.seed is not None) else str(int(time.time()))
+        report = SoupSearch.run(
+            args.soups, seed, args.rule, args.engine, width, height, args.density,
+            args.max_generations, args.max_period, args.jobs, rare=args.rare
+        )
+        if (args.stats):
+            with open(args.stats, 'w') as fd:
+                json.dump(report, fd, indent=1)
+        else:
+            json.dump(report, sys.stdout, indent=1)
+            sys.stdout.write('\n')
+        return 0
@@ -0,0 +1,240 @@
+"""
+Python - Game of life with tkinter
+06/06/2020
+Madipoupou
+"""
+
+from collections import Counter
+from .Engine import Engine
+
+# The activity is tracked by tiles of 2^TILE_SHIFT x 2^TILE_SHIFT cells
+TILE_SHIFT = 3
+TILE_MASK = (1 << TILE_SHIFT) - 1
+# The cell (dx, dy) from the corner of a tile is the bit dx * 8 + dy of its
+# mask, so each byte of the mask is a column: its set dy by byte value
+COLUMN_BITS = [tuple(dy for dy in range(8) if ((byte >> dy) & 1)) for byte in range(256)]
+
+class SparseEngine(Engine):
+    """
+    Stepping backend which stores the alive cells in a set
+    Neighbour counts are accumulated in a single pass over the alive cells,
+    so one generation costs O(n) in the number of alive cells
+    With Generations rules the dying cells are kept in a dict cell -> state
+    In a finite universe the neighbours come from the precomputed
+    coordinate tables of the topology
+    On the plane with 2 states rules the activity is tracked: only the tiles
+    with a cell changed in or around them last generation are stepped, the
+    ash (still lifes) of the other tiles is carried over as it is
+    The tiles only keep a 64 bits mask of their alive cells, not the cells
+    """
+    name = 'sparse'
+    # Past this fraction of changed cells the whole universe is stepped
+    ACTIVE_RATIO = 0.3
+
+    def load(self, cells):
+        """ Replaces the current state by the given (x, y) cells """
+        self.cells = self.topology.normalize_all(cells)
+        self.dying = {}
+        # Masks of the alive cells by tile (built by the first tracked step),
+        # cells changed since the last step (None: all of them), last changes
+        self.tiles = None
+        self.changed = None
+        self.born = self.dead = None
+
+    def tracks_activity(self):
+        """ True if the changes tell which tiles can change next """
+        rule = self.rule
+        return (
+            rule.states == 2 and not self.topology.finite
+            and rule.radius <= (1 << TILE_SHIFT)
+        )
+
+    def active_tiles(self):
+        """
+        Returns the set of tiles in which a cell can change: the ones within
+        rule.radius of a cell changed since the last step
+        """
+        r = self.rule.radius
+        active = set()
+        for (x, y) in self.changed:
+            x0, x1 = (x - r) >> TILE_SHIFT, (x + r) >> TILE_SHIFT
+            y0, y1 = (y - r) >> TILE_SHIFT, (y + r) >> TILE_SHIFT
+            if (x0 == x1 and y0 == y1):
+                active.add((x0, y0))
+            else:
+                active.update(
+                    (tx, ty) for tx in range(x0, x1 + 1) for ty in range(y0, y1 + 1)
+                )
+        return active
+
+    def count_neighbors(self):
+        """ Returns a Counter mapping each cell to its number of alive neighbours """
+        if (self.topology.finite):
+            r = self.rule.radius
+            x_tables, ys, dead = self.topology.coordinate_tables(r)
+            counts = Counter(
+                (x_tables[y + dy][x + dx], ys[y + dy])
+                for (x, y) in self.cells
+                for (dx, dy) in self.rule.shifted_offsets
+            )
+            for cell in dead:
+                counts.pop(cell, None)
+            return counts
+        return Counter(
+            (x + dx, y + dy)
+            for (x, y) in self.cells
+            for (dx, dy) in self.rule.offsets
+        )
+
+    def step(self):
+        """ Computes the next generation, with the rule count sets """
+        if (self.tracks_activity()):
+            self.step_tracked()
+            return
+        self.cells = self.next_cells()
+
+    def next_cells(self):
+        """
+        Returns the next generation of the whole universe, the next state of
+        each cell looked up in rule.table[state][count]
+        """
+        cells = self.cells
+        counts = self.count_neighbors()
+        rule = self.rule
+        table = rule.table
+        # Next state of the alive cells without any alive neighbour (not in
+        # the counts): alive with S0
+        lonely = table[1][0]
+        if (rule.states == 2):
+            new_cells = {cell for cell, count in counts.items() if (table[cell in cells][count])}
+            if (lonely):
+                new_cells.update(cell for cell in cells if (cell not in counts))
+            return new_cells
+        dying = self.dying
+        birth, survive = table[0], table[1]
+        new_cells = {
+            cell for cell, count in counts.items()
+            if ((survive[count] == 1) if (cell in cells) else (birth[count] and cell not in dying))
+        }
+        if (lonely == 1):
+            new_cells.update(cell for cell in cells if (cell not in counts))
+        # The dying cells get older (their next state doesn't depend on the
+        # count), the alive ones which didn't survive start dying (state 2)
+        self.dying = {cell: table[state][0] for cell, state in dying.items() if (table[state][0])}
+        self.dying.update((cell, 2) for cell in cells if (cell not in new_cells))
+        return new_cells
+
+    def step_tracked(self):
+        """
+        Computes the next generation keeping its changes: while most of the
+        universe changes it is all stepped, then only the active tiles
+        """
+        cells = self.cells
+        changed = self.changed
+        if (changed is None or len(changed) > self.ACTIVE_RATIO * len(cells)):
+            # The tiles would cost more than they save
+            self.tiles = None
+            new_cells = self.next_cells()
+            born, dead = new_cells - cells, cells - new_cells
+        else:
+            if (self.tiles is None):
+                self.tiles = {}
+                self.flip_tiles(cells)
+            born, dead = self.active_changes()
+            # Updated in place: the changes are given by changes(), callers
+            # keeping a generation copy it
+            new_cells = cells
+            new_cells -= dead
+            new_cells |= born
+            self.flip_tiles(born)
+            self.flip_tiles(dead)
+        self.cells = new_cells
+        self.born, self.dead = born, dead
+        self.changed = born | dead
+
+    def active_changes(self):
+        """
+        Returns the (born, dead) cells of the next generation, looked for in
+        the active tiles only: the neighbours are counted from the alive
+        cells of the active tiles and of the ones around
+        """
+        cells = self.cells
+        birth, survive = self.rule.table
+        active = self.active_tiles()
+        around = {
+            (tx + i, ty + j) for (tx, ty) in active for i in (-1, 0, 1) for j in (-1, 0, 1)
+        }
+        tiles = {key: self.tile_cells(key) for key in around if (key in self.tiles)}
+        counts = Counter(
+            (x + dx, y + dy)
+            for cells_list in tiles.values() for (x, y) in cells_list
+            for (dx, dy) in self.rule.offsets
+        )
+        born = {
+            cell for cell, count in counts.items()
+            if (birth[count] and cell not in cells
+                and (cell[0] >> TILE_SHIFT, cell[1] >> TILE_SHIFT) in active)
+        }
+        dead = {
+            cell for key in active if (key in tiles) for cell in tiles[key]
+            if (not survive[counts.get(cell, 0)])
+        }
+        return born, dead
+
+    def tile_cells(self, key):
+        """ Returns the alive cells of the tile key, decoded from its mask """
+        mask = self.tiles[key]
+        x0, y0 = key[0] << TILE_SHIFT, key[1] << TILE_SHIFT
+        res = []
+        for dx in range(8):
+            column = (mask >> (dx << 3)) & 255
+            if (column):
+                x = x0 + dx
+                res.extend([(x, y0 + dy) for dy in COLUMN_BITS[column]])
+        return res
+
+    def flip_tiles(self, cells):
+        """ Flips the bits of the given cells in the masks of their tiles """
+        tiles = self.tiles
+        for (x, y) in cells:
+            key = (x >> TILE_SHIFT, y >> TILE_SHIFT)
+            mask = tiles.get(key, 0) ^ (1 << (((x & TILE_MASK) << 3) | (y & TILE_MASK)))
+            if (mask):
+                tiles[key] = mask
+            else:
+                del tiles[key]
+
+    def changes(self):
+        """ Returns the (born, dead) cells of the last step, None if unknown """
+        return (self.born, self.dead) if (self.born is not None) else None
+
+    def tracks_changes(self):
+        """ True when the steps keep their changes (2 states rules on the plane) """
+        return self.tracks_activity()
+
+    def get_cells(self):
+        """
+        Returns the alive cells: the set itself, do not modify it, the steps
+        may update it in place
+        """
+        return self.cells
+
+    def toggle(self, cell):
+        """ Makes a dead (or dying) cell alive and an alive cell dead """
+        cell = self.topology.normalize(cell)
+        if (cell is None):
+            return
+        if (cell in self.cells):
+            self.cells.remove(cell)
+        else:
+            self.cells.add(cell)
+            self.dying.pop(cell, None)
+        if (self.tiles is not None):
+            self.flip_tiles((cell,))
+        if (self.changed is not None):
+            self.changed.add(cell)
+        self.born = self.dead = None
+
+    def population(self):
+        """ Returns the number of alive cells """
+        return len(self.cells)
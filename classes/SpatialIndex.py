@@ -0,0 +1,77 @@
+"""
+Python - Game of life with tkinter
+06/06/2020
+Madipoupou
+"""
+
+class SpatialIndex(object):
+    """
+    Chunked index of cells: each cell is stored in the bucket of the square
+    of size x size cells containing it, keyed by (x // size, y // size)
+    A rectangle query only looks at the buckets overlapping the rectangle
+    """
+    def __init__(self, cells=(), size=32):
+        """ SpatialIndex constructor """
+        self.size = size
+        self.rebuild(cells)
+
+    def rebuild(self, cells):
+        """ Replaces the content of the index by cells """
+        self.buckets = {}
+        for cell in cells:
+            self.add(cell)
+
+    def add(self, cell):
+        """ Adds a cell to its bucket """
+        key = (cell[0] // self.size, cell[1] // self.size)
+        bucket = self.buckets.get(key)
+        if (bucket is None):
+            self.buckets[key] = {cell}
+        else:
+            bucket.add(cell)
+
+    def remove(self, cell):
+        """ Removes a cell from its bucket, empty buckets are dropped """
+        key = (cell[0] // self.size, cell[1] // self.size)
+        bucket = self.buckets[key]
+        bucket.discard(cell)
+        if (not bucket):
+            del self.buckets[key]
+
+    def update(self, born, dead):
+        """ Applies the changes of a generation """
+        for cell in dead:
+            self.remove(cell)
+        for cell in born:
+            self.add(cell)
+
+    def query(self, xmin, ymin, xmax, ymax):
+        """ Returns the set of cells with xmin <= x <= xmax and ymin <= y <= ymax """
+        size = self.size
+        res = set()
+        bxmin, bxmax = xmin // size, xmax // size
+        bymin, bymax = ymin // size, ymax // size
+        # Fewer buckets than the rectangle covers: no need to look for the others
+        if (len(self.buckets) < (bxmax - bxmin + 1) * (bymax - bymin + 1)):
+            keys = [
+                key for key in self.buckets
+                if (bxmin <= key[0] <= bxmax and bymin <= key[1] <= bymax)
+            ]
+        else:
+            keys = [
+                (bx, by)
+                for bx in range(bxmin, bxmax + 1)
+                for by in range(bymin, bymax + 1)
+                if ((bx, by) in self.buckets)
+            ]
+        for (bx, by) in keys:
+            bucket = self.buckets[(bx, by)]
+            if (bxmin < bx < bxmax and bymin < by < bymax):
+                # Inner bucket: all its cells are inside the rectangle
+                res.update(bucket)
+            else:
+                res.update(
+                    cell for cell in bucket
+                    if (xmin <= cell[0] <= xmax and ymin <= cell[1] <= ymax)
+                )
+        return res
@@ -0,0 +1,267 @@
+"""
+Python - Game of life with tkinter
+06/06/2020
+Madipoupou
+"""
+
+from collections import OrderedDict
+from .Engine import Engine
+
+# Position (x, y) inside a 4x4 tile of each bit of its 16 bits code: the
+# code is made of 4 nibbles, the 2x2 blocks a b / c d, each nibble is a
+# 2x2 block too (bit 0 top left, 1 top right, 2 bottom left, 3 bottom right)
+TILE_BITS = tuple(
+    (2 * (nibble & 1) + (bit & 1), 2 * (nibble >> 1) + (bit >> 1))
+    for nibble in range(4) for bit in range(4)
+)
+# Bit of the code for the cell (x, y) of a tile: BIT_INDEX[y][x]
+BIT_INDEX = tuple(
+    tuple(TILE_BITS.index((x, y)) for x in range(4)) for y in range(4)
+)
+
+def window_table(qx, qy, nibble):
+    """
+    Returns the bits given by each value of a nibble of the tile (qx, qy) of
+    the 8x8 square a b / c d to the 4x4 square seen from (1, 1): the cells
+    the tile made from the square covered before its step
+    """
+    table = []
+    for value in range(16):
+        res = 0
+        for bit in range(4):
+            if ((value >> bit) & 1):
+                x, y = TILE_BITS[4 * nibble + bit]
+                x, y = 4 * qx + x - 1, 4 * qy + y - 1
+                if (0 <= x < 4 and 0 <= y < 4):
+                    res |= 1 << BIT_INDEX[y][x]
+        table.append(res)
+    return tuple(table)
+
+# The nibbles of a b / c d which reach the square seen from (1, 1): the 4 of
+# a, the left ones of b, the top ones of c, the top left one of d
+WINDOW_TABLES = tuple(
+    window_table(qx, qy, nibble) for (qx, qy, nibble) in (
+        (0, 0, 0), (0, 0, 1), (0, 0, 2), (0, 0, 3),
+        (1, 0, 0), (1, 0, 2), (0, 1, 0), (0, 1, 1), (1, 1, 0)
+    )
+)
+
+class TileEngine(Engine):
+    """
+    Block lookup engine, between SparseEngine and HashLife for medium
+    patterns: the alive cells are packed into 4x4 tiles, 16 bits codes kept
+    in a dict {(tx, ty): code} without the empty tiles
+    The rule gives a 65536 entries table: the 2x2 centre of any 4x4 square
+    one generation later. So a generation shifts the tiles by one cell: the
+    next tile (tx, ty) is the centre of the 8x8 square made of the tiles
+    (tx, ty) ... (tx + 1, ty + 1), computed with 4 lookups
+    The 8x8 squares seen are kept in a LRU cache of max_transitions entries,
+    oscillating regions (windmill.grid) then cost one lookup per tile
+    Runs the 2 states rules of radius 1 on the unbounded plane
+    """
+    name = 'tile'
+    # 4x4 -> 2x2 tables of the rules used so far, built once per rule
+    TABLES = {}
+
+    def __init__(self, cells=(), rule=None, topology=None, max_transitions=1 << 16):
+        """ TileEngine constructor """
+        self.max_transitions = max_transitions
+        self.transitions = OrderedDict()
+        self.decoded = {}
+        self.cache = None
+        Engine.__init__(self, cells, rule, topology)
+
+    def check_rule(self, rule):
+        """ Raises ValueError if the rule isn't a 2 states, radius 1 rule """
+        if (rule.mask_table is None):
+            raise ValueError(f'TileEngine can\'t run the rule {rule}')
+
+    def check_topology(self, topology):
+        """ Raises ValueError for the finite universes """
+        if (topology.finite):
+            raise ValueError('TileEngine only runs on the unbounded plane')
+
+    def set_rule(self, rule):
+        """ Changes the rule, the cached transitions are forgotten """
+        Engine.set_rule(self, rule)
+        self.transitions.clear()
+
+    @staticmethod
+    def tile_table(rule):
+        """
+        Returns the table of rule indexed by the code of a 4x4 square: the
+        nibble of its 2x2 centre one generation later
+        """
+        table = TileEngine.TABLES.get(rule)
+        if (table is not None):
+            return table
+        mask_table = rule.mask_table
+        # Bits of the code making the 3x3 neighbourhood (as a mask_table
+        # index, bit 8 first) of each cell of the centre
+        neighbourhoods = [
+            [BIT_INDEX[y + dy][x + dx] for dy in (-1, 0, 1) for dx in (-1, 0, 1)]
+            for (x, y) in ((1, 1), (2, 1), (1, 2), (2, 2))
+        ]
+        table = bytearray(1 << 16)
+        for code in range(1 << 16):
+            bits = [(code >> i) & 1 for i in range(16)]
+            res = 0
+            for (i, neighbourhood) in enumerate(neighbourhoods):
+                mask = 0
+                for bit in neighbourhood:
+                    mask = (mask << 1) | bits[bit]
+                res |= mask_table[mask] << i
+            table[code] = res
+        table = TileEngine.TABLES[rule] = bytes(table)
+        return table
+
+    def load(self, cells):
+        """ Packs the given (x, y) cells into tiles """
+        self.table = TileEngine.tile_table(self.rule)
+        # The tile (tx, ty) covers the cells from (4 tx + offset, 4 ty + offset)
+        self.offset = 0
+        self.tiles = {}
+        self.cache = None
+        self.last_step = None
+        for cell in set(cells):
+            self.toggle(cell)
+
+    def locate(self, cell):
+        """ Returns the key of the tile of cell and the bit of cell in it """
+        x, y = cell[0] - self.offset, cell[1] - self.offset
+        return (x >> 2, y >> 2), BIT_INDEX[y & 3][x & 3]
+
+    def toggle(self, cell):
+        """ Makes a dead cell alive and an alive cell dead """
+        key, bit = self.locate(cell)
+        code = self.tiles.get(key, 0) ^ (1 << bit)
+        if (code):
+            self.tiles[key] = code
+        else:
+            del self.tiles[key]
+        if (self.cache is not None):
+            if (code >> bit & 1):
+                self.cache.add(cell)
+            else:
+                self.cache.discard(cell)
+        self.last_step = None
+
+    def transition(self, a, b, c, d):
+        """
+        Returns the code of the centre tile, one generation later, of the
+        8x8 square made of the tiles a b / c d
+        Only their 3x3 top left nibbles are used
+        """
+        table = self.table
+        b0, b2 = b & 15, (b >> 8) & 15
+        c0, c1 = c & 15, (c >> 4) & 15
+        d0 = d & 15
+        return (
+            table[a]
+            | table[(a >> 4) & 15 | b0 << 4 | (a >> 12) << 8 | b2 << 12] << 4
+            | table[(a >> 8) & 15 | (a >> 12) << 4 | c0 << 8 | c1 << 12] << 8
+            | table[a >> 12 | b2 << 4 | c1 << 8 | d0 << 12] << 12
+        )
+
+    def step(self):
+        """ Computes the next generation, moving the tiles by one cell """
+        tiles = self.tiles
+        get = tiles.get
+        transitions = self.transitions
+        # Once the offset is back to 0 the tile keys move by one
+        shift = 1 if (self.offset == 3) else 0
+        candidates = set()
+        for (tx, ty) in tiles:
+            candidates.update((
+                (tx - 1, ty - 1), (tx, ty - 1), (tx - 1, ty), (tx, ty)
+            ))
+        new_tiles = {}
+        for (tx, ty) in candidates:
+            a = get((tx, ty), 0)
+            b = get((tx + 1, ty), 0)
+            c = get((tx, ty + 1), 0)
+            d = get((tx + 1, ty + 1), 0)
+            # The bits the centre depends on: the 8x8 square minus its
+            # last row and column of nibbles
+            key = a | (b & 0x0F0F) << 16 | (c & 0x00FF) << 32 | (d & 15) << 48
+            code = transitions.get(key)
+            if (code is None):
+                code = transitions[key] = self.transition(a, b, c, d)
+                if (len(transitions) > self.max_transitions):
+                    transitions.popitem(last=False)
+            else:
+                transitions.move_to_end(key)
+            if (code):
+                new_tiles[(tx + shift, ty + shift)] = code
+        self.last_step = (tiles, self.offset, None)
+        self.tiles = new_tiles
+        self.offset = (self.offset + 1) & 3
+        self.cache = None
+
+    def changes(self):
+        """
+        Returns the (born, dead) cells of the last step, None if the cells
+        were edited since: each new tile is compared with the cells it
+        covered before, read from the 4 old tiles around
+        """
+        if (self.last_step is None):
+            return None
+        tiles, offset, delta = self.last_step
+        if (delta is not None):
+            return delta
+        get = tiles.get
+        new_get = self.tiles.get
+        decoded = self.decoded
+        shift = 1 if (offset == 3) else 0
+        a0, a1, a2, a3, b0, b2, c0, c1, d0 = WINDOW_TABLES
+        candidates = set()
+        for (tx, ty) in tiles:
+            candidates.update((
+                (tx - 1, ty - 1), (tx, ty - 1), (tx - 1, ty), (tx, ty)
+            ))
+        born, dead = set(), set()
+        for (tx, ty) in candidates:
+            a = get((tx, ty), 0)
+            b = get((tx + 1, ty), 0)
+            c = get((tx, ty + 1), 0)
+            d = get((tx + 1, ty + 1), 0)
+            before = (
+                a0[a & 15] | a1[(a >> 4) & 15] | a2[(a >> 8) & 15] | a3[a >> 12]
+                | b0[b & 15] | b2[(b >> 8) & 15] | c0[c & 15] | c1[(c >> 4) & 15] | d0[d & 15]
+            )
+            key = (tx + shift, ty + shift)
+            after = new_get(key, 0)
+            if (before == after):
+                continue
+            x, y = 4 * key[0] + self.offset, 4 * key[1] + self.offset
+            for (code, cells) in ((after & ~before, born), (before & ~after, dead)):
+                if (code):
+                    offsets = decoded.get(code)
+                    if (offsets is None):
+                        offsets = decoded[code] = tuple(
+                            TILE_BITS[i] for i in range(16) if ((code >> i) & 1)
+                        )
+                    cells.update([(x + dx, y + dy) for (dx, dy) in offsets])
+        delta = (born, dead)
+        self.last_step = (None, offset, delta)
+        return delta
+
+    def tracks_changes(self):
+        """ The tiles of each step give its changes """
+        return True
+
+    def get_cells(self):
+        """ Returns the alive cells as a set of (x, y) tuples (cached) """
+        if (self.cache is None):
+            decoded = self.decoded
+            cells = set()
+            for ((tx, ty), code) in self.tiles.items():
+                offsets = decoded.get(code)
+                if (offsets is None):
+                    offsets = decoded[code] = tuple(
+                        TILE_BITS[i] for i in range(16) if ((code >> i) & 1)
+                    )
+                x, y = 4 * tx + self.offset, 4 * ty + self.offset
+                cells.update([(x + dx, y + dy) for (dx, dy) in offsets])
+            self.cache = cells
+        return self.cache
@@ -0,0 +1,140 @@
+"""
+Python - Game of life with tkinter
+06/06/2020
+Madipoupou
+"""
+
+import re
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class Topology(object):
+    """
+    Shape of the universe: the unbounded plane, or a width x height one
+    which is a torus (the edges wrap), a Klein bottle (the left/right edges
+    wrap, the top/bottom ones wrap mirrored) or a bounded plane (dead cells
+    past the edges)
+    The wraparound is precomputed once per radius: coordinate tables for
+    the sparse engine, a gather index map for the dense one
+    """
+    KINDS = ('plane', 'torus', 'klein', 'bounded')
+    TEXT = re.compile(r'(plane|torus|klein|bounded)(?::(\d+)x(\d+))?$', re.IGNORECASE)
+
+    def __init__(self, kind='plane', width=None, height=None):
+        """
+        Topology constructor
+        Raises ValueError if a finite universe has no valid size
+        """
+        if (kind not in self.KINDS):
+            raise ValueError(f'Unknown topology {kind!r}')
+        self.kind = kind
+        self.finite = kind != 'plane'
+        if (self.finite and not (width and height and width > 0 and height > 0)):
+            raise ValueError(f'A {kind} needs a width and a height')
+        self.width = width if (self.finite) else None
+        self.height = height if (self.finite) else None
+        self.tables = {}
+        self.index_maps = {}
+
+    @staticmethod
+    def parse(text):
+        """
+        Returns the Topology described by text: 'plane', 'torus:200x100',
+        'klein:64x64', 'bounded:500x300'
+        Raises ValueError if text isn't valid
+        """
+        match = Topology.TEXT.match(text.strip())
+        if (not match):
+            raise ValueError(f'Unknown topology {text!r}')
+        kind, width, height = match.groups()
+        return Topology(kind.lower(), width and int(width), height and int(height))
+
+    def __str__(self):
+        """ Topology string converter, as parsed """
+        return f'{self.kind}:{self.width}x{self.height}' if (self.finite) else self.kind
+
+    def __eq__(self, other):
+        """ Same kind and size """
+        return isinstance(other, Topology) and str(self) == str(other)
+
+    def __hash__(self):
+        """ Hash consistent with __eq__ """
+        return hash(str(self))
+
+    def normalize(self, cell):
+        """
+        Returns the cell of the universe at the coordinates of cell (wrapped
+        around), None if it is outside a bounded plane
+        """
+        if (not self.finite):
+            return cell
+        x, y = cell
+        if (self.kind == 'bounded'):
+            if (0 <= x < self.width and 0 <= y < self.height):
+                return cell
+            return None
+        if (self.kind == 'klein' and (y // self.height) % 2):
+            x = -1 - x
+        return (x % self.width, y % self.height)
+
+    def normalize_all(self, cells):
+        """ Returns the set of the cells of the universe at the coordinates of cells """
+        if (not self.finite):
+            return set(cells)
+        res = {self.normalize(cell) for cell in cells}
+        res.discard(None)
+        return res
+
+    def coordinate_tables(self, radius):
+        """
+        Returns (x_tables, ys, dead) for neighbourhoods of the given radius:
+        the neighbour (x + dx, y + dy) of a cell of the universe is
+        (x_tables[y + dy + radius][x + dx + radius], ys[y + dy + radius])
+        Past the edges of a bounded plane the coordinates are -1, and the
+        cells of the set dead must be removed from the results
+        """
+        tables = self.tables.get(radius)
+        if (tables is not None):
+            return tables
+        r = radius
+        if (self.kind == 'bounded'):
+            xs = [i - r if (0 <= i - r < self.width) else -1 for i in range(self.width + 2 * r)]
+            ys = [j - r if (0 <= j - r < self.height) else -1 for j in range(self.height + 2 * r)]
+            dead = {(-1, y) for y in range(-1, self.height)} | {(x, -1) for x in range(self.width)}
+        else:
+            xs = [(i - r) % self.width for i in range(self.width + 2 * r)]
+            ys = [(j - r) % self.height for j in range(self.height + 2 * r)]
+            dead = set()
+        x_tables = [xs] * (self.height + 2 * r)
+        if (self.kind == 'klein'):
+            # Crossing the top/bottom edges mirrors the x coordinates
+            mirrored = [self.width - 1 - x for x in xs]
+            for j in range(self.height + 2 * r):
+                if (not 0 <= j - r < self.height):
+                    x_tables[j] = mirrored
+        tables = self.tables[radius] = (x_tables, ys, frozenset(dead))
+        return tables
+
+    def index_map(self, radius):
+        """
+        Returns the NumPy index array which gathers the universe array padded
+        with radius cells: padded = flat.take(index_map), flat being the
+        array flattened with one dead cell appended (the index of the cells
+        past the edges of a bounded plane)
+        """
+        index_map = self.index_maps.get(radius)
+        if (index_map is not None):
+            return index_map
+        x_tables, ys, dead = self.coordinate_tables(radius)
+        xs = np.array(x_tables, dtype=np.intp).T
+        ys = np.array(ys, dtype=np.intp)[np.newaxis, :]
+        index_map = xs * self.height + ys
+        index_map[(xs < 0) | (ys < 0)] = self.width * self.height
+        self.index_maps[radius] = index_map
+        return index_map
+
+# The default topology
+PLANE = Topology()
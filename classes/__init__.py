@@ -1,4 +1,37 @@
-from .App import App
-from .GridCanvas import GridCanvas
+# The GUI classes need tkinter, the headless ones can run without it
+# (any other import error is a real one)
+try:
+    from .App import App
+    from .GridCanvas import GridCanvas
+    from .Interface import Interface
+except ModuleNotFoundError as err:
+    if (err.name not in ('tkinter', '_tkinter')):
+        raise
 from .CellGrid import CellGrid
-from .Interface import Interface
\ No newline at end of file
+from .Brush import Brush
+from .Engine import Engine
+from .SparseEngine import SparseEngine
+from .DenseEngine import DenseEngine
+from .AdaptiveEngine import AdaptiveEngine
+from .HashLife import HashLife
+from .TileEngine import TileEngine
+from .ParallelEngine import ParallelEngine
+from .SpatialIndex import SpatialIndex
+from .History import History
+from .PackedCells import PackedCells
+from .Profiler import Profiler
+from .Rule import Rule
+from .Topology import Topology
+from .CycleDetector import CycleDetector
+from .SimulationWorker import SimulationWorker
+from .GridFile import GridFile
+from .GridbFile import GridbFile
+from .RleFile import RleFile
+from .Life106File import Life106File
+from .CellsFile import CellsFile
+from .PatternFile import PatternFile
+from .PatternLibrary import PatternLibrary
+from .HeadlessRunner import HeadlessRunner
+from .SoupSearch import SoupSearch
+from .MockCanvas import MockCanvas
+from .Benchmark import Benchmark
@@ -0,0 +1,12 @@
+"""
+Python - Game of life with tkinter
+06/06/2020
+Madipoupou
+"""
+
+import sys
+from classes.HeadlessRunner import HeadlessRunner
+
+# --- Headless program (no Tk window) --- #
+if (__name__ == '__main__'):
+    sys.exit(HeadlessRunner.main(sys.argv[1:]))
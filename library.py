@@ -0,0 +1,12 @@
+"""
+Python - Game of life with tkinter
+06/06/2020
+Madipoupou
+"""
+
+import sys
+from classes.PatternLibrary import PatternLibrary
+
+# --- Pattern library index (no Tk window) --- #
+if (__name__ == '__main__'):
+    sys.exit(PatternLibrary.main(sys.argv[1:]))
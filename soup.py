@@ -0,0 +1,12 @@
+"""
+Python - Game of life with tkinter
+06/06/2020
+Madipoupou
+"""
+
+import sys
+from classes.SoupSearch import SoupSearch
+
+# --- Soup search (no Tk window), JSON census --- #
+if (__name__ == '__main__'):
+    sys.exit(SoupSearch.main(sys.argv[1:]))